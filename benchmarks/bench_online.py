@@ -0,0 +1,74 @@
+"""
+Benchmark della latenza del GP online: punti di un DataGenerator (add_datapoint) assorbiti uno alla
+volta con add_observation, riportando per ogni finestra di punti la latenza mediana e al 99° percentile
+e, per confronto, quella dell'aggiornamento O(n²) del GP esatto. Con budget fisso la latenza del
+GP online resta costante al crescere dei punti osservati.
+
+    python benchmarks/bench_online.py --points 100000 --budget 30 --window 10000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from data_generator import DataGenerator
+from gaussian_process import GaussianProcessRegressor
+from kernels import RBFKernel
+from online_gp import OnlineGaussianProcessRegressor
+
+
+def stream_latencies(model, generator, n_points):
+    latencies = np.empty(n_points)
+    for i in range(n_points):
+        generator.add_datapoint()
+        start = time.perf_counter()
+        model.add_observation(generator.x_data[-1], generator.y_data[-1])
+        latencies[i] = time.perf_counter() - start
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=50000)
+    parser.add_argument("--budget", type=int, default=30)
+    parser.add_argument("--window", type=int, default=10000)
+    parser.add_argument("--exact-points", type=int, default=3000, help="points streamed into the exact GP")
+    parser.add_argument("--lengthscale", type=float, default=0.02, help="short lengthscales fill the budget")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = {
+        "function_family": "periodic",
+        "polynomial_degree": 0,
+        "data_size": 1,
+        "noise_level": 0.1,
+        "seed": args.seed,
+        "x_range": (0, 1),
+        "y_range": (0, 1),
+    }
+    kernel = RBFKernel(lengthscale=args.lengthscale, signal_variance=0.1)
+    models = (("online", OnlineGaussianProcessRegressor(kernel=kernel, noise_variance=0.01, budget=args.budget),
+               args.points),
+              ("exact", GaussianProcessRegressor(kernel=kernel, noise_variance=0.01), args.exact_points))
+
+    print(f"\n{'model':<8}{'points':>16}{'median [us]':>14}{'p99 [us]':>12}")
+    for name, model, n_points in models:
+        generator = DataGenerator(config=dict(config))
+        generator.generate_datapoints()
+        model.fit(generator.x_data, generator.y_data)
+        latencies = stream_latencies(model, generator, n_points)
+        window = min(args.window, max(n_points // 4, 1))
+        for start in range(0, n_points, window):
+            chunk = latencies[start:start + window] * 1e6
+            print(f"{name:<8}{f'{start}-{start + len(chunk)}':>16}{np.median(chunk):>14.1f}"
+                  f"{np.percentile(chunk, 99):>12.1f}")
+        if name == "online":
+            print(f"{'':<8}basis points {model.size}, evicted {model.n_evicted}")
+
+
+if __name__ == "__main__":
+    main()
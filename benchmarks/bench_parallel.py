@@ -0,0 +1,82 @@
+"""
+Benchmark di scalabilità del livello parallelo (parallel.py): tempo delle ripartenze
+dell'ottimizzazione degli iperparametri e della validazione incrociata al variare del numero
+di processi, con speedup ed efficienza rispetto a un solo processo.
+
+Con un task per processo lo speedup atteso è lineare finché n_tasks >= workers.
+Conviene limitare i thread BLAS per processo, altrimenti i processi si contendono i core:
+
+    OMP_NUM_THREADS=1 OPENBLAS_NUM_THREADS=1 MKL_NUM_THREADS=1 python benchmarks/bench_parallel.py
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from data_generator import DataGenerator
+from gaussian_process import GaussianProcessRegressor
+from kernels import RBFKernel
+from parallel import parallel_cross_validation, parallel_optimize_hyperparameters
+
+
+def worker_counts(max_workers):
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-size", type=int, default=1000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generator = DataGenerator(config={
+        "polynomial_degree": 3,
+        "data_size": args.data_size,
+        "noise_level": 0.1,
+        "seed": args.seed,
+        "x_range": (0, 1),
+        "y_range": (0, 1),
+    })
+    generator.generate_datapoints()
+    x, y = generator.x_data.copy(), generator.y_data.copy()
+
+    counts = worker_counts(args.max_workers)
+    # Un task per processo al massimo grado di parallelismo
+    n_tasks = counts[-1]
+
+    print(f"\n{'task':<14}{'workers':>8}{'time [s]':>12}{'speedup':>10}{'efficiency':>12}")
+    reference_theta = None
+    for name in ("restarts", "cv_folds"):
+        baseline = None
+        for workers in counts:
+            gp = GaussianProcessRegressor(kernel=RBFKernel(0.1, 0.1), noise_variance=0.01)
+            start = time.perf_counter()
+            if name == "restarts":
+                parallel_optimize_hyperparameters(gp, x, y, n_restarts=n_tasks - 1, max_workers=workers,
+                                                  seed=args.seed)
+                # Stesso seed: stesso risultato con qualsiasi numero di processi
+                if reference_theta is None:
+                    reference_theta = gp.theta
+                elif not np.array_equal(reference_theta, gp.theta):
+                    print("WARNING: result depends on the number of workers")
+            else:
+                parallel_cross_validation(gp, x, y, n_folds=max(n_tasks, 2), optimize_hyperparameters=True,
+                                          max_workers=workers, seed=args.seed)
+            elapsed = time.perf_counter() - start
+            baseline = baseline if baseline is not None else elapsed
+            speedup = baseline / elapsed
+            print(f"{name:<14}{workers:>8}{elapsed:>12.3f}{speedup:>10.2f}{speedup / workers:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
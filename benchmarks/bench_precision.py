@@ -0,0 +1,84 @@
+"""
+Benchmark della politica di precisione: per ogni modello e dimensione confronta kernel e prodotti
+in float64 e float32 (Cholesky, CG e log-determinante restano in float64), riportando tempo,
+memoria della matrice del kernel, jitter usato ed errore massimo di media e deviazione standard
+predittive rispetto al riferimento float64.
+
+    python benchmarks/bench_precision.py --sizes 1000 2000 4000 --iterative-sizes 10000 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from data_generator import DataGenerator
+from gaussian_process import GaussianProcessRegressor
+from iterative_gp import IterativeGaussianProcessRegressor
+from kernels import RBFKernel
+
+
+def make_data(data_size, seed):
+    generator = DataGenerator(config={
+        "polynomial_degree": 3,
+        "data_size": data_size,
+        "noise_level": 0.1,
+        "seed": seed,
+        "x_range": (0, 1),
+        "y_range": (0, 1),
+    })
+    generator.generate_datapoints()
+    return generator.x_data.copy(), generator.y_data.copy()
+
+
+def create_model(name, dtype):
+    kernel = RBFKernel(lengthscale=0.1, signal_variance=0.1)
+    if name == "exact":
+        return GaussianProcessRegressor(kernel=kernel, noise_variance=0.01, dtype=dtype)
+    return IterativeGaussianProcessRegressor(kernel=kernel, noise_variance=0.01, cg_tol=1e-5, seed=0, dtype=dtype)
+
+
+def run(name, x, y, x_test, dtype):
+    model = create_model(name, dtype)
+    start = time.perf_counter()
+    model.fit(x, y)
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    mean, std = model.predict(x_test, return_std=True)
+    predict_time = time.perf_counter() - start
+    return model, fit_time, predict_time, mean, std
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 4000])
+    parser.add_argument("--iterative-sizes", type=int, nargs="+", default=[10000])
+    parser.add_argument("--test-points", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    x_test = np.linspace(0, 1, args.test_points)
+    print(f"\n{'model':<10}{'n':>8}{'dtype':>9}{'K [MiB]':>10}{'fit [s]':>10}{'predict [s]':>13}"
+          f"{'jitter':>10}{'max |Δmean|':>13}{'max |Δstd|':>12}")
+    for name, sizes in (("exact", args.sizes), ("iterative", args.iterative_sizes)):
+        for n in sizes:
+            x, y = make_data(n, args.seed)
+            reference = None
+            for dtype in (np.float64, np.float32):
+                model, fit_time, predict_time, mean, std = run(name, x, y, x_test, dtype)
+                if reference is None:
+                    reference = (mean, std)
+                # Exact: matrice n x n; iterativo: un blocco di righe del prodotto matrice-vettore
+                rows = n if name == "exact" else model.block_size
+                kernel_mib = rows * n * np.dtype(dtype).itemsize / 2 ** 20
+                jitter = getattr(model, "jitter", 0.0)
+                print(f"{name:<10}{n:>8}{np.dtype(dtype).name:>9}{kernel_mib:>10.1f}{fit_time:>10.3f}"
+                      f"{predict_time:>13.3f}{jitter:>10.1e}{np.max(np.abs(mean - reference[0])):>13.2e}"
+                      f"{np.max(np.abs(std - reference[1])):>12.2e}")
+
+
+if __name__ == "__main__":
+    main()
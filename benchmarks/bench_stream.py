@@ -0,0 +1,70 @@
+"""
+Benchmark della generazione a blocchi: scrive su disco un dataset di --size punti (solo x_data e
+y_data, nel dtype scelto) con DataGenerator.stream_to_dataset, opzionalmente addestrando anche un GP
+sparso sugli stessi blocchi, e riporta throughput e picco di RSS. Il picco dipende da --chunk-size,
+non da --size.
+
+    python benchmarks/bench_stream.py --size 100000000 --chunk-size 1048576 --dtype float32 --sparse-gp
+"""
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from data_generator import DataGenerator
+from data_stream import SparseGPSink
+from sparse_gp import SparseGaussianProcessRegressor
+
+
+def peak_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux riporta KiB, macOS byte
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10_000_000)
+    parser.add_argument("--chunk-size", type=int, default=1 << 20)
+    parser.add_argument("--dtype", default="float32")
+    parser.add_argument("--degree", type=int, default=3)
+    parser.add_argument("--sparse-gp", action="store_true", help="also fit a sparse GP on the stream")
+    parser.add_argument("--output", help="dataset directory (default: temporary, removed at the end)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generator = DataGenerator(config={
+        "polynomial_degree": args.degree,
+        "data_size": args.size,
+        "noise_level": 0.1,
+        "seed": args.seed,
+        "x_range": (0, 1),
+        "y_range": (0, 1),
+        "dtype": args.dtype,
+    })
+    path = args.output or os.path.join(tempfile.mkdtemp(), "stream")
+    sinks = ()
+    if args.sparse_gp:
+        sinks = (SparseGPSink(SparseGaussianProcessRegressor(), x_range=(0, 1)),)
+
+    rss_before = peak_rss_mib()
+    start = time.perf_counter()
+    statistics = generator.stream_to_dataset(path, chunk_size=args.chunk_size, columns=("x_data", "y_data"),
+                                             sinks=sinks)
+    elapsed = time.perf_counter() - start
+
+    print(f"points:      {statistics.count}")
+    print(f"time:        {elapsed:.2f} s ({statistics.count / elapsed / 1e6:.1f} M points/s)")
+    print(f"peak RSS:    {peak_rss_mib():.1f} MiB (before streaming: {rss_before:.1f} MiB)")
+    print(f"statistics:  {statistics.as_dict()}")
+    if args.output is None:
+        shutil.rmtree(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    main()
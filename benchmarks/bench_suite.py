@@ -0,0 +1,213 @@
+"""
+Benchmark riproducibile della pipeline: generazione dei dati, aggiunta/rimozione di punti, fit e
+predizione del GP e ridisegno headless di plot_data, per ogni combinazione di dimensione n e grado
+del polinomio.
+
+Ogni caso gira in un processo nuovo (spawn), così il picco di RSS misurato è solo il suo. Il tempo
+è il minimo su --repeat esecuzioni; le allocazioni (picco durante l'esecuzione e memoria ancora
+allocata alla fine, da tracemalloc) sono misurate in un'esecuzione separata, perché il tracciamento
+rallenta il codice. I risultati sono scritti in JSON; con --baseline si confrontano con un file
+salvato in precedenza e il processo termina con codice 1 se un caso è peggiorato oltre --tolerance
+(i tempi sotto --min-time sono dominati dal rumore del timer e non vengono segnalati).
+
+    python benchmarks/bench_suite.py --output results.json
+    python benchmarks/bench_suite.py --baseline results.json --sizes 100 1000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+CASES = ("generate", "add_remove", "gp_fit", "gp_predict", "plot_data")
+# Metriche confrontate con la baseline
+METRICS = ("wall_time", "alloc_peak_mib")
+
+
+def data_config(data_size, degree, seed):
+    return {
+        "polynomial_degree": degree,
+        "data_size": data_size,
+        "noise_level": 0.1,
+        "seed": seed,
+        "x_range": (0, 1),
+        "y_range": (0, 1),
+    }
+
+
+def setup_case(case, data_size, degree, options):
+    """
+    Prepara lo stato del caso fuori dalla misura e restituisce (funzione da misurare, info extra)
+    """
+    from gp_session import GPSession
+
+    session = GPSession(data_config=data_config(data_size, degree, options["seed"]))
+    session.learn_hyperparameters = False
+    # Oltre max_exact_size il GP esatto (O(n²) memoria, O(n³) tempo) è sostituito da quello sparso
+    if data_size > options["max_exact_size"]:
+        session.gp_mode_index = session.GP_MODES.index("Sparse")
+    info = {"gp_mode": session.gp_mode}
+    generator = session.data_generator
+
+    if case == "generate":
+        return generator.generate_datapoints, info
+
+    session.generate_data()
+    if case == "add_remove":
+        rng = np.random.default_rng(options["seed"])
+        clicks = rng.uniform(0, 1, size=(options["ops"], 2))
+        info["ops"] = options["ops"]
+
+        def add_remove():
+            # Punti casuali in coda (O(1)) e click dell'utente, che riadattano la funzione
+            for _ in range(options["ops"]):
+                generator.add_datapoint()
+                generator.remove_datapoint()
+            for x, y in clicks:
+                generator.add_selected_point(x, y)
+                generator.remove_selected_point(x, y)
+        return add_remove, info
+
+    if case == "gp_fit":
+        return session.fit_gp, info
+
+    session.fit_gp()
+    if case == "gp_predict":
+        return session.predict_gp, info
+
+    if case == "plot_data":
+        import matplotlib
+        matplotlib.use("Agg")
+        session.predict_gp()
+        plotter = session.attach_view(show=False)
+        # Primo disegno completo: salva gli sfondi, poi plot_data usa il percorso con blitting
+        plotter.fig.canvas.draw()
+        return plotter.plot_data, info
+
+    raise ValueError(f"Unknown benchmark case: {case}")
+
+
+def peak_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux riporta KiB, macOS byte
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def measure(case, data_size, degree, options):
+    """
+    Esegue un caso nel processo corrente (un worker appena creato) e ne restituisce le metriche
+    """
+    # I messaggi del generatore non devono finire nell'output del benchmark né pesare sui tempi
+    with contextlib.redirect_stdout(io.StringIO()):
+        run, info = setup_case(case, data_size, degree, options)
+        times = []
+        for _ in range(options["repeat"]):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        run()
+        retained, alloc_peak = tracemalloc.get_traced_memory()
+        retained_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+        tracemalloc.stop()
+
+    return dict(info, case=case, data_size=data_size, degree=degree,
+                wall_time=min(times), wall_time_mean=float(np.mean(times)),
+                peak_rss_mib=peak_rss_mib(), alloc_peak_mib=alloc_peak / 2 ** 20,
+                retained_mib=retained / 2 ** 20, retained_blocks=retained_blocks)
+
+
+def result_key(result):
+    return (result["case"], result["data_size"], result["degree"])
+
+
+def compare(results, baseline, tolerance, min_time):
+    """
+    Rapporto corrente / baseline per ogni metrica dei casi presenti in entrambi; restituisce le regressioni
+    """
+    reference = {result_key(r): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'case':<12}{'n':>8}{'degree':>8}" + "".join(f"{name + ' ratio':>22}" for name in METRICS))
+    for result in results:
+        old = reference.get(result_key(result))
+        if old is None:
+            continue
+        line = f"{result['case']:<12}{result['data_size']:>8}{result['degree']:>8}"
+        for name in METRICS:
+            ratio = result[name] / old[name] if old[name] > 0 else 1.0
+            regressed = ratio > 1 + tolerance and not (name == "wall_time" and result[name] < min_time)
+            line += f"{ratio:>20.2f}{' !' if regressed else '  '}"
+            if regressed:
+                regressions.append((result_key(result), name, ratio))
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--degrees", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--ops", type=int, default=100, help="add/remove operations per run")
+    parser.add_argument("--max-exact-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file for the results")
+    parser.add_argument("--baseline", help="JSON file from a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--min-time", type=float, default=0.005, help="seconds below which timings are not compared")
+    args = parser.parse_args()
+
+    options = {"repeat": args.repeat, "ops": args.ops, "max_exact_size": args.max_exact_size, "seed": args.seed}
+    results = []
+    print(f"\n{'case':<12}{'n':>8}{'degree':>8}{'gp':>8}{'time [s]':>12}{'RSS [MiB]':>11}"
+          f"{'alloc [MiB]':>13}{'retained [MiB]':>16}")
+    for data_size in args.sizes:
+        for degree in args.degrees:
+            for case in args.cases:
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                    result = executor.submit(measure, case, data_size, degree, options).result()
+                results.append(result)
+                print(f"{case:<12}{data_size:>8}{degree:>8}{result['gp_mode']:>8}{result['wall_time']:>12.4f}"
+                      f"{result['peak_rss_mib']:>11.1f}{result['alloc_peak_mib']:>13.2f}{result['retained_mib']:>16.2f}")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "options": options,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_time)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,43 @@
+import logging
+
 import numpy as np
 
+from data_stream import DEFAULT_CHUNK_SIZE, STREAM_COLUMNS, DataStream, StreamStatistics
+from dataset_io import DatasetWriter, load_dataset, save_dataset
+from function_families import IncrementalLeastSquares, get_function_family
+from instrumentation import Instrumentation
+from point_buffer import BufferField, PointBuffer
+from spatial_index import SortedPointIndex
+
+
+logger = logging.getLogger(__name__)
 
 
+# Grado massimo raggiungibile con increase_poly_degree
+MAX_POLYNOMIAL_DEGREE = 10
+
 
 
 class DataGenerator:
+    # Messaggi, eventi e statistiche passano da self.instrumentation (vedi instrumentation.py):
+    # nulla viene stampato né calcolato se non ci sono logger abilitati o listener registrati
+    # I dati vivono in un PointBuffer (struct-of-arrays con capacità preallocata):
+    # questi attributi sono viste senza copia sulle sue colonne
+    # point_id è un identificatore stabile e crescente (le rimozioni mantengono l'ordine)
+    # y_data_clean e noises derivano dalla funzione corrente e sono ricalcolati solo quando letti;
+    # assegnare x_data o y_data invalida le statistiche del fit incrementale
+    # standard_noise è l'estrazione N(0, 1) di ogni punto: il rumore vale noise_level * standard_noise,
+    # così cambiare il livello di rumore riscala i dati senza nuove estrazioni casuali
+    POINT_FIELDS = ("x_data", "y_data", "y_data_clean", "noises", "standard_noise", ("point_id", np.int64))
+    x_data = BufferField(on_assign="invalidate_fit_statistics")
+    y_data = BufferField(on_assign="invalidate_fit_statistics")
+    y_data_clean = BufferField(before_access="refresh_derived_fields")
+    noises = BufferField(before_access="refresh_derived_fields")
+    standard_noise = BufferField()
+
+    # Punti elaborati per blocco da set_noise_level: moltiplicazione, somma e clip restano in cache
+    NOISE_CHUNK_SIZE = 65536
+
     def __init__(self, config = {
         "polynomial_degree": 0,
         "data_size": 100,
@@ -12,110 +45,214 @@ class DataGenerator:
         "seed": 42,
         "x_range": (0,1),
         "y_range": (0,1)
-        }):
+        }, instrumentation=None):
 
         self.config = config
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation(logger)
+
+        # Precisione delle colonne numeriche (config["dtype"], float64 di default): con float32
+        # il dataset occupa metà memoria; i calcoli che ne hanno bisogno risalgono a float64
+        self.dtype = np.dtype(self.config.get("dtype", float))
+        self.points = PointBuffer(self.POINT_FIELDS, dtype=self.dtype)
+        self.next_point_id = 0
 
-        self.x_data = []
-        self.y_data = []
-        self.noises = []
+        # Indice spaziale sulle x ordinate, aggiornato a ogni aggiunta/rimozione
+        self.spatial_index = SortedPointIndex()
 
-        self.k = None
+        # Parametri della funzione generatrice (dipendono dalla famiglia, vedi function_families.py)
+        self.function_params = None
+        # Vero se function_params è cambiato dopo l'ultimo calcolo di y_data_clean e noises
+        self.derived_stale = False
+        # Equazioni normali del fit (IncrementalLeastSquares) e chiave della base su cui sono calcolate
+        self.fit_statistics = None
+        self.fit_basis_key = None
 
-        self.q = None
-        self.m = None
+        # Indice dell'ultimo punto rimosso (usato per aggiornare il GP in modo incrementale)
+        self.last_removed_index = None
+        # Coordinate (x, y) dei punti tolti dall'ultima rimozione
+        self.last_removed_points = None
+
+        # Generatore indipendente per generate_batch (creato alla prima chiamata)
+        self.batch_rng = None
 
         if self.config.get("seed") is not None:
             np.random.seed(self.config["seed"])
 
-    def generate_datapoints(self):
-        print(f"Generating data with config: {self.config} ")
+    def function_family(self):
+        """
+        Famiglia di funzioni corrente (config["function_family"], di default "polynomial")
+        """
+        return get_function_family(self.config.get("function_family", "polynomial"))
 
+    def evaluate_function(self, x):
+        """
+        Valuta la funzione corrente su x in un'unica passata vettoriale (None se non definita)
+        """
+        if self.function_params is None:
+            return None
+        return self.function_family().evaluate(np.asarray(x, dtype=float), self.function_params)
+
+    def generate_datapoints(self):
         # Validazione input
         if self.config["data_size"] <= 0:
             raise ValueError("Data size must be positive")
         if self.config["polynomial_degree"] < 0:
             raise ValueError("Polynomial degree must be non-negative")
-        
-        # Log iniziale con info essenziali
-        print(f"\n{'='*50}")
-        print(f"Generating {self.config['data_size']} datapoints")
-        print(f"Polynomial degree: {self.config['polynomial_degree']}")
-        print(f"Noise level: {self.config['noise_level']:.3f}")
-        print(f"X range: [{self.config['x_range'][0]:.2f}, {self.config['x_range'][1]:.2f}]")
-        print(f"Y range: [{self.config['y_range'][0]:.2f}, {self.config['y_range'][1]:.2f}]")
-        if self.config.get("seed") is not None:
-            print(f"Using seed: {self.config['seed']}")
-        
-        self.x_data = np.random.uniform(
-        self.config["x_range"][0], 
-        self.config["x_range"][1], 
-        self.config["data_size"]
-        )
-        self.noises = np.random.normal(0.0, self.config["noise_level"], self.config["data_size"])
 
-        if self.config["polynomial_degree"] < 0:
-            raise ValueError("Polynomial degree must be non-negative")
-        
-        elif self.config["polynomial_degree"] == 0:
-            self.k = np.random.uniform(self.config["y_range"][0], self.config["y_range"][1], 1)
-            self.y_data_clean = np.ones(len(self.x_data)) * self.k
-            self.y_data = self.k + self.noises
-            self.y_data = np.clip(self.y_data, self.config["y_range"][0], self.config["y_range"][1])
-            print(f"Generated constant function: y = {self.k[0]:.3f}")
+        instrumentation = self.instrumentation
+        if instrumentation.enabled(logging.DEBUG):
+            instrumentation.emit("generate_config", "Generating data with config: %s", self.config,
+                                 level=logging.DEBUG, config=dict(self.config))
+
+        with instrumentation.stage("generate.sample"):
+            x_data = np.random.uniform(
+            self.config["x_range"][0],
+            self.config["x_range"][1],
+            self.config["data_size"]
+            )
+            # Stessi valori di np.random.normal(0, noise_level, n), ma si conserva l'estrazione standard
+            standard_noise = np.random.standard_normal(self.config["data_size"])
+            noises = self.config["noise_level"] * standard_noise
+
+            # Parametri casuali della famiglia e valutazione vettoriale su tutti i punti
+            family = self.function_family()
+            self.function_params = family.sample_parameters(np.random, self.config)
+            y_data_clean = family.evaluate(x_data, self.function_params)
+            y_data = np.clip(y_data_clean + noises, self.config["y_range"][0], self.config["y_range"][1])
+
+        with instrumentation.stage("generate.store"):
+            point_ids = np.arange(self.next_point_id, self.next_point_id + len(x_data))
+            self.next_point_id += len(x_data)
+            self.points.reset(x_data=x_data, y_data=y_data, y_data_clean=y_data_clean, noises=noises,
+                              standard_noise=standard_noise, point_id=point_ids)
+            self.derived_stale = False
+            self.invalidate_fit_statistics()
+            # L'indice usa i valori memorizzati (arrotondati se dtype è float32)
+            self.spatial_index.build(self.x_data, point_ids)
+        instrumentation.count("datasets_generated")
+
+        if instrumentation.enabled(logging.INFO):
+            instrumentation.emit("generated",
+                                 "Generated %d datapoints (%s, degree %d, noise %.3f): %s",
+                                 self.config["data_size"], self.config.get("function_family", "polynomial"),
+                                 self.config["polynomial_degree"], self.config["noise_level"],
+                                 family.describe(self.function_params),
+                                 data_size=self.config["data_size"], function_params=self.function_params)
+
+        # Statistiche dei dati (O(n)) solo se qualcuno le riceve
+        if instrumentation.enabled(logging.DEBUG):
+            stats = StreamStatistics.from_data(self.x_data, self.y_data, self.config["y_range"]).as_dict()
+            self.emit_data_statistics(stats)
+
+    def emit_data_statistics(self, stats):
+        self.instrumentation.emit("data_statistics",
+                                  "Data statistics: X min=%(x_min).3f max=%(x_max).3f mean=%(x_mean).3f, "
+                                  "Y min=%(y_min).3f max=%(y_max).3f mean=%(y_mean).3f, points clipped: %(clipped)d",
+                                  stats, level=logging.DEBUG, **stats)
+
+    def generate_stream(self, data_size=None, chunk_size=DEFAULT_CHUNK_SIZE, seed=None):
+        """
+        Generazione a blocchi (vedi data_stream.DataStream) con la configurazione e il dtype correnti:
+        la memoria è quella di un blocco per qualsiasi data_size, e i dati non entrano nel buffer.
+        Il generatore non cambia stato (né dati né function_params né np.random globale).
+        """
+        return DataStream(self.config, data_size=data_size, chunk_size=chunk_size, seed=seed, dtype=self.dtype,
+                          instrumentation=self.instrumentation)
 
-        elif self.config["polynomial_degree"] == 1:
+    def stream_to_dataset(self, path, data_size=None, chunk_size=DEFAULT_CHUNK_SIZE, seed=None,
+                          columns=STREAM_COLUMNS, sinks=()):
+        """
+        Scrive direttamente su disco (formato di dataset_io) un dataset di data_size punti generato a
+        blocchi, passando ogni blocco anche agli altri sink dati (es. data_stream.SparseGPSink).
+        columns sceglie le colonne salvate: con solo x_data e y_data un dataset di 10^9 punti in
+        float32 occupa 8 GB su disco e un blocco in memoria. Restituisce le statistiche dei dati.
+        """
+        stream = self.generate_stream(data_size, chunk_size, seed)
+        config = dict(self.config, data_size=len(stream))
+        writer = DatasetWriter(path, {name: self.dtype for name in columns}, config, stream.function_params)
+        statistics = stream.write_to(writer, *sinks)
+
+        self.instrumentation.emit("dataset_streamed", "Dataset di %d punti scritto a blocchi in %s",
+                                  statistics.count, path, path=path, size=statistics.count)
+        if self.instrumentation.enabled(logging.DEBUG):
+            self.emit_data_statistics(statistics.as_dict())
+        return statistics
+
+    def generate_batch(self, n_datasets, data_size=None, rng=None):
+        """
+        Genera n_datasets dataset indipendenti con la configurazione corrente.
 
-            self.q = np.random.uniform(self.config["y_range"][0], self.config["y_range"][1])
+        Tutto il batch è prodotto con poche operazioni vettoriali da un np.random.Generator
+        indipendente dallo stato globale di np.random (nessun ciclo sui dataset).
+        Ogni dataset ha i propri parametri, estratti dalla famiglia di funzioni corrente
+        (per i polinomi: degree + 1 nodi equispaziati in x_range con valori casuali in y_range).
 
-            # Genera due punti casuali nel range e calcola la retta che li collega
-            x1, x2 = self.config["x_range"]
-            y1 = np.random.uniform(self.config["y_range"][0], self.config["y_range"][1])
-            y2 = np.random.uniform(self.config["y_range"][0], self.config["y_range"][1])
-            
-            # Calcola m e q dalla retta passante per (x1,y1) e (x2,y2)
-            self.m = (y2 - y1) / (x2 - x1) if x2 != x1 else 0
-            self.q = y1 - self.m * x1
-
-            self.y_data_clean = self.m * self.x_data + self.q
-            self.y_data = self.m * self.x_data + self.q + self.noises
-            self.y_data = np.clip(self.y_data, self.config["y_range"][0], self.config["y_range"][1])
-            print(f"Generated linear function: y = {self.m:.3f}x + {self.q:.3f}")
-
-        elif self.config["polynomial_degree"] == 2:
-            """
-            Genera una parabola che passa per tre punti nel dominio
-            """
-            x_min, x_max = self.config["x_range"]
-            y_min, y_max = self.config["y_range"]
-            
-            # Prendi tre punti x: inizio, metà e fine del dominio
-            x_points = np.array([x_min, (x_min + x_max)/2, x_max])
-            
-            # Genera tre valori y casuali nel range valido
-            y_points = np.random.uniform(y_min, y_max, 3)
-            
-            # Calcola i coefficienti a, b, c che fanno passare la parabola per questi tre punti
-            # Sistema: y = ax^2 + bx + c per tre punti
-            A = np.vstack([x_points**2, x_points, np.ones(3)]).T
-            coeffs = np.linalg.solve(A, y_points)
-            self.a, self.b, self.c = coeffs
-            
-            # Genera i dati
-            self.y_data_clean = self.a * self.x_data**2 + self.b * self.x_data + self.c
-            self.y_data = self.a * self.x_data**2 + self.b * self.x_data + self.c + self.noises
-            self.y_data = np.clip(self.y_data, y_min, y_max)
-            print(f"Generated quadratic function: y = {self.a:.3f}x² + {self.b:.3f}x + {self.c:.3f}")
+        Restituisce un dizionario con array contigui di forma (B, N) e tipo self.dtype: x_data, y_data,
+        y_data_clean, noises, e function_params con i parametri per dataset
+        (per i polinomi, coefficients di forma (B, degree + 1) in potenze crescenti).
+        """
+        if n_datasets <= 0:
+            raise ValueError("Number of datasets must be positive")
+        data_size = self.config["data_size"] if data_size is None else data_size
+        if data_size <= 0:
+            raise ValueError("Data size must be positive")
 
-        else:
-            raise ValueError(f"{self.config['polynomial_degree']} degree not implemented yet")
-        
-        # Statistiche finali
-        print(f"\nData statistics:")
-        print(f"  X: min={np.min(self.x_data):.3f}, max={np.max(self.x_data):.3f}, mean={np.mean(self.x_data):.3f}")
-        print(f"  Y: min={np.min(self.y_data):.3f}, max={np.max(self.y_data):.3f}, mean={np.mean(self.y_data):.3f}")
-        print(f"  Points clipped: {np.sum((self.y_data == self.config['y_range'][0]) | (self.y_data == self.config['y_range'][1]))}")
-        print(f"{'='*50}\n")
+        if rng is None:
+            # Stream indipendente, creato una volta sola e poi riusato tra chiamate successive
+            if self.batch_rng is None:
+                self.batch_rng = np.random.default_rng(self.config.get("seed"))
+            rng = self.batch_rng
+        elif not isinstance(rng, np.random.Generator):
+            rng = np.random.default_rng(rng)
+
+        x_min, x_max = self.config["x_range"]
+        y_min, y_max = self.config["y_range"]
+        shape = (n_datasets, data_size)
+
+        x_data = rng.uniform(x_min, x_max, shape)
+        noises = rng.normal(0.0, self.config["noise_level"], shape)
+
+        family = self.function_family()
+        function_params = family.sample_parameters(rng, self.config, size=n_datasets)
+        y_data_clean = family.evaluate(x_data, function_params)
+        y_data = np.clip(y_data_clean + noises, y_min, y_max)
+
+        return {
+            "x_data": np.ascontiguousarray(x_data, dtype=self.dtype),
+            "y_data": np.ascontiguousarray(y_data, dtype=self.dtype),
+            "y_data_clean": np.ascontiguousarray(y_data_clean, dtype=self.dtype),
+            "noises": np.ascontiguousarray(noises, dtype=self.dtype),
+            "function_params": function_params,
+        }
+
+    def append_point(self, x, y, y_clean, noise, standard_noise=0.0):
+        """
+        Aggiunge un punto in coda al buffer e all'indice spaziale
+        """
+        point_id = self.next_point_id
+        self.next_point_id += 1
+        self.points.append(x_data=x, y_data=y, y_data_clean=y_clean, noises=noise,
+                           standard_noise=standard_noise, point_id=point_id)
+        self.spatial_index.add(self.x_data[-1], point_id)
+        self.track_fit_statistics(self.x_data[-1:], self.y_data[-1:], remove=False)
+
+    def remove_point(self, index):
+        """
+        Rimuove il punto in posizione index dal buffer (mantenendo l'ordine) e dall'indice spaziale
+        """
+        self.last_removed_points = (self.x_data[index:index + 1].copy(), self.y_data[index:index + 1].copy())
+        self.track_fit_statistics(*self.last_removed_points, remove=True)
+        self.spatial_index.remove(self.x_data[index], self.points.view("point_id")[index])
+        self.points.remove(index)
+
+    def positions_of(self, point_ids):
+        """
+        Posizioni nel dataset dei punti con gli id dati (bisezione: gli id sono crescenti)
+        """
+        return np.searchsorted(self.points.view("point_id"), point_ids)
+
+    def y_of(self, point_ids):
+        return self.y_data[self.positions_of(point_ids)]
 
     def add_selected_point(self, x_coord, y_coord, noise=0.0):
         """
@@ -125,24 +262,17 @@ class DataGenerator:
         x_coord = np.clip(x_coord, self.config["x_range"][0], self.config["x_range"][1])
         y_coord = np.clip(y_coord, self.config["y_range"][0], self.config["y_range"][1])
         
-        # Inizializza gli array se non esistono
-        if not hasattr(self, 'x_data') or self.x_data is None or len(self.x_data) == 0:
-            self.x_data = np.array([x_coord])
-            self.y_data = np.array([y_coord])
-            self.y_data_clean = np.array([y_coord])
-            self.noises = np.array([0.0])
-        else:
-            # Aggiungi il punto agli array esistenti
-            self.x_data = np.append(self.x_data, x_coord)
-            self.y_data = np.append(self.y_data, y_coord)
-            # Aggiungi valori temporanei che verranno ricalcolati
-            self.y_data_clean = np.append(self.y_data_clean, y_coord)
-            self.noises = np.append(self.noises, 0.0)
+        # Aggiungi il punto (y_data_clean e noises sono temporanei e verranno ricalcolati);
+        # l'estrazione standard serve se in seguito il rumore viene riscalato o ricampionato
+        self.append_point(x_coord, y_coord, y_coord, 0.0, np.random.standard_normal())
         
         # Ricalcola i parametri della funzione con tutti i punti
         self.update_function_parameters()
-        
-        print(f"Punto aggiunto: ({x_coord:.3f}, {y_coord:.3f})")
+
+        self.instrumentation.count("points_added")
+        if self.instrumentation.enabled(logging.INFO):
+            self.instrumentation.emit("point_added", "Punto aggiunto: (%.3f, %.3f)", x_coord, y_coord,
+                                      x=float(x_coord), y=float(y_coord))
         return True
 
     def remove_selected_point(self, x_coord, y_coord, tolerance=0.05):
@@ -150,37 +280,64 @@ class DataGenerator:
         Rimuove il punto più vicino alle coordinate specificate
         """
         if not hasattr(self, 'x_data') or self.x_data is None or len(self.x_data) == 0:
-            print("Nessun punto da rimuovere")
+            self.instrumentation.emit("nothing_to_remove", "Nessun punto da rimuovere", level=logging.WARNING)
             return False
         
-        # Calcola le distanze da tutti i punti
-        distances = np.sqrt((self.x_data - x_coord)**2 + (self.y_data - y_coord)**2)
-        
-        # Trova l'indice del punto più vicino
-        closest_index = np.argmin(distances)
+        # Punto più vicino entro la tolleranza tramite l'indice spaziale (O(log n) + candidati)
+        closest_id = self.spatial_index.nearest(x_coord, y_coord, tolerance, self.y_of)
         
-        # Verifica se il punto è abbastanza vicino (entro la tolleranza)
-        if distances[closest_index] <= tolerance:
+        if closest_id is not None:
+            closest_index = self.positions_of(closest_id)
             # Rimuovi il punto
             removed_x = self.x_data[closest_index]
             removed_y = self.y_data[closest_index]
-            removed_y_clean = self.y_data_clean[closest_index]
+            self.last_removed_index = int(closest_index)
             
-            self.x_data = np.delete(self.x_data, closest_index)
-            self.y_data = np.delete(self.y_data, closest_index)
-            self.y_data_clean = np.delete(self.y_data_clean, closest_index)
-
-            self.noises = np.delete(self.noises, closest_index)
+            # Rimozione in place mantenendo l'ordine (gli indici restano allineati con il GP)
+            self.remove_point(self.last_removed_index)
             # Ricalcola i parametri della funzione dopo la rimozione
             if len(self.x_data) > 0:
                 self.update_function_parameters()
             
-            print(f"Punto rimosso: ({removed_x:.3f}, {removed_y:.3f})")
+            self.instrumentation.count("points_removed")
+            if self.instrumentation.enabled(logging.INFO):
+                self.instrumentation.emit("point_removed", "Punto rimosso: (%.3f, %.3f)", removed_x, removed_y,
+                                          x=float(removed_x), y=float(removed_y))
             return True
         else:
-            print("Nessun punto trovato nelle vicinanze")
+            self.instrumentation.emit("no_point_near", "Nessun punto trovato nelle vicinanze",
+                                      level=logging.WARNING, x=x_coord, y=y_coord)
             return False
         
+    def remove_points_in_rectangle(self, x_min, x_max, y_min, y_max):
+        """
+        Rimuove in una sola chiamata tutti i punti nel rettangolo selezionato.
+        Restituisce le posizioni (crescenti, riferite al dataset prima della rimozione) dei punti rimossi.
+        """
+        x_min, x_max = min(x_min, x_max), max(x_min, x_max)
+        y_min, y_max = min(y_min, y_max), max(y_min, y_max)
+        removed_ids = self.spatial_index.query_rectangle(x_min, x_max, y_min, y_max, self.y_of)
+        if len(removed_ids) == 0:
+            self.instrumentation.emit("no_point_in_rectangle", "Nessun punto nel rettangolo selezionato",
+                                      level=logging.WARNING)
+            return np.zeros(0, dtype=np.int64)
+
+        removed_positions = np.sort(self.positions_of(removed_ids))
+        mask = np.zeros(len(self.points), dtype=bool)
+        mask[removed_positions] = True
+        self.last_removed_points = (self.x_data[mask], self.y_data[mask])
+        self.track_fit_statistics(*self.last_removed_points, remove=True)
+        self.points.remove_mask(mask)
+        self.spatial_index.remove_ids(removed_ids)
+
+        if len(self.x_data) > 0:
+            self.update_function_parameters()
+
+        self.instrumentation.count("points_removed", len(removed_positions))
+        self.instrumentation.emit("points_removed", "Rimossi %d punti nel rettangolo", len(removed_positions),
+                                  count=len(removed_positions))
+        return removed_positions
+
     def remove_datapoint(self, event=None):
         """
         Rimuove il primo punto dati dai dati esistenti.
@@ -188,29 +345,26 @@ class DataGenerator:
         """
         # Controlla se ci sono dati da rimuovere
         if not hasattr(self, 'x_data') or self.x_data is None or len(self.x_data) == 0:
-            print("Nessun punto da rimuovere")
+            self.instrumentation.emit("nothing_to_remove", "Nessun punto da rimuovere", level=logging.WARNING)
             return False
-        
-        removed_x = self.x_data[0]
-        removed_y = self.y_data[0]
-        removed_x_clean = self.y_data_clean[0]
-        removed_noise = self.noises[0] 
-
-        if len(self.x_data) == 1:
-            # Se c'è solo un punto, rimuovi tutto
-            self.x_data = np.array([])
-            self.y_data = np.array([])
-            self.y_data_clean = np.array([])
-            self.noises = np.array([])
-            print(f"Ultimo punto rimosso: ({removed_x:.3f}, {removed_y:.3f}, noise: {removed_noise:.3f})")
+
+        # Operazione da ciclo caldo: valori letti e messaggio preparato solo se qualcuno li riceve
+        if self.instrumentation.enabled(logging.DEBUG):
+            # Il rumore di un solo punto, senza ricalcolare tutta la colonna se è da aggiornare
+            noise = (self.y_data[0] - self.evaluate_function(self.x_data[:1])[0] if self.derived_stale
+                     else self.noises[0])
+            removed = (float(self.x_data[0]), float(self.y_data[0]), float(noise))
         else:
-            # Rimuovi sempre il primo punto (indice 0)
-            self.x_data = self.x_data[1:] 
-            self.y_data = self.y_data[1:]  
-            self.y_data_clean = self.y_data_clean[1:]
-            self.noises = self.noises[1:]  # Rimuovi il primo elemento
-            print(f"Primo punto rimosso: ({removed_x:.3f}, {removed_y:.3f}, noise: {removed_noise:.3f})")
-        
+            removed = None
+        self.last_removed_index = 0
+
+        # Rimuovi sempre il primo punto (indice 0): O(1), sposta solo l'inizio della finestra valida
+        self.remove_point(0)
+        if removed is not None:
+            self.instrumentation.count("points_removed")
+            self.instrumentation.emit("point_removed", "%s punto rimosso: (%.3f, %.3f, noise: %.3f)",
+                                      "Ultimo" if len(self.points) == 0 else "Primo", *removed,
+                                      level=logging.DEBUG, x=removed[0], y=removed[1], noise=removed[2])
         return True
     
     def add_datapoint(self, event=None):
@@ -221,77 +375,42 @@ class DataGenerator:
         new_x = np.random.uniform(self.config["x_range"][0], self.config["x_range"][1])
         
         # Genera rumore
-        noise = np.random.normal(0.0, self.config["noise_level"])
+        standard_noise = np.random.standard_normal()
+        noise = self.config["noise_level"] * standard_noise
         
-        # Calcola y in base al grado del polinomio
-        if self.config["polynomial_degree"] == 0:
-            if self.k is None:
-                self.k = np.random.uniform(self.config["y_range"][0], self.config["y_range"][1], 1)
-            new_y_clean = self.k
-            new_y = self.k + noise
-        elif self.config["polynomial_degree"] == 1:
-            if self.q is None or self.m is None:
-                # Se non ci sono parametri, genera una retta casuale
-                x1, x2 = self.config["x_range"]
-                y1 = np.random.uniform(self.config["y_range"][0], self.config["y_range"][1])
-                y2 = np.random.uniform(self.config["y_range"][0], self.config["y_range"][1])
-                self.m = (y2 - y1) / (x2 - x1) if x2 != x1 else 0
-                self.q = y1 - self.m * x1
-            new_y_clean = self.m * new_x + self.q  
-            new_y = self.m * new_x + self.q + noise
-        elif self.config["polynomial_degree"] == 2:
-            if not hasattr(self, 'a') or not hasattr(self, 'b') or not hasattr(self, 'c'):
-                # Se non ci sono parametri, genera una parabola casuale
-                x_min, x_max = self.config["x_range"]
-                y_min, y_max = self.config["y_range"]
-                x_points = np.array([x_min, (x_min + x_max)/2, x_max])
-                y_points = np.random.uniform(y_min, y_max, 3)
-                A = np.vstack([x_points**2, x_points, np.ones(3)]).T
-                coeffs = np.linalg.solve(A, y_points)
-                self.a, self.b, self.c = coeffs
-            new_y_clean = self.a * new_x**2 + self.b * new_x + self.c 
-            new_y = self.a * new_x**2 + self.b * new_x + self.c + noise
-        else:
-            raise ValueError(f"{self.config['polynomial_degree']} degree not implemented yet")
+        # Calcola y con la famiglia di funzioni corrente (parametri casuali se non ancora definiti)
+        family = self.function_family()
+        if self.function_params is None:
+            self.function_params = family.sample_parameters(np.random, self.config)
+        new_y_clean = family.evaluate(np.array([new_x]), self.function_params)[0]
+        new_y = new_y_clean + noise
         
         # Applica clipping al valore y
         new_y = np.clip(new_y, self.config["y_range"][0], self.config["y_range"][1])
         
-        # Aggiungi il punto ai dati
-        if not hasattr(self, 'x_data') or self.x_data is None or len(self.x_data) == 0:
-            self.x_data = np.array([new_x])
-            self.y_data = np.array([new_y])
-            self.y_data_clean = np.array([new_y_clean])
-            self.noises = np.array([noise])
-        else:
-            self.x_data = np.append(self.x_data, new_x)
-            self.y_data = np.append(self.y_data, new_y)
-            self.y_data_clean = np.append(self.y_data_clean, new_y_clean)
-            self.noises = np.append(self.noises, noise)
-        
-        print(f"Nuovo punto aggiunto: ({float(new_x):.3f}, {float(new_y):.3f})")
+        # Aggiungi il punto ai dati (O(1) ammortizzato)
+        self.append_point(new_x, new_y, new_y_clean, noise, standard_noise)
+
+        if self.instrumentation.enabled(logging.DEBUG):
+            self.instrumentation.count("points_added")
+            self.instrumentation.emit("point_added", "Nuovo punto aggiunto: (%.3f, %.3f)", new_x, new_y,
+                                      level=logging.DEBUG, x=float(new_x), y=float(new_y))
         return True
     
     def increase_poly_degree(self):
         """
-        Aumenta il grado del polinomio di 1 (massimo 2)
+        Aumenta il grado del polinomio di 1 (massimo MAX_POLYNOMIAL_DEGREE)
         """
-        if self.config["polynomial_degree"] < 2:
+        if self.config["polynomial_degree"] < MAX_POLYNOMIAL_DEGREE:
             self.config["polynomial_degree"] += 1
             # Reset dei parametri della funzione
-            self.k = None
-            self.q = None
-            self.m = None
-            if hasattr(self, 'a'):
-                delattr(self, 'a')
-            if hasattr(self, 'b'):
-                delattr(self, 'b')
-            if hasattr(self, 'c'):
-                delattr(self, 'c')
-            print(f"Grado polinomio aumentato a: {self.config['polynomial_degree']}")
+            self.function_params = None
+            self.instrumentation.emit("degree_changed", "Grado polinomio aumentato a: %d",
+                                      self.config["polynomial_degree"], degree=self.config["polynomial_degree"])
             return True
         else:
-            print("Grado massimo raggiunto (2)")
+            self.instrumentation.emit("degree_limit", "Grado massimo raggiunto (%d)", MAX_POLYNOMIAL_DEGREE,
+                                      level=logging.WARNING, degree=MAX_POLYNOMIAL_DEGREE)
             return False
 
     def decrease_poly_degree(self):
@@ -301,19 +420,12 @@ class DataGenerator:
         if self.config["polynomial_degree"] > 0:
             self.config["polynomial_degree"] -= 1
             # Reset dei parametri della funzione
-            self.k = None
-            self.q = None
-            self.m = None
-            if hasattr(self, 'a'):
-                delattr(self, 'a')
-            if hasattr(self, 'b'):
-                delattr(self, 'b')
-            if hasattr(self, 'c'):
-                delattr(self, 'c')
-            print(f"Grado polinomio diminuito a: {self.config['polynomial_degree']}")
+            self.function_params = None
+            self.instrumentation.emit("degree_changed", "Grado polinomio diminuito a: %d",
+                                      self.config["polynomial_degree"], degree=self.config["polynomial_degree"])
             return True
         else:
-            print("Grado minimo raggiunto (0)")
+            self.instrumentation.emit("degree_limit", "Grado minimo raggiunto (0)", level=logging.WARNING, degree=0)
             return False
         
     def increase_noise_level(self, step=0.01):
@@ -321,11 +433,13 @@ class DataGenerator:
         Aumenta il livello di rumore di uno step (massimo 1.0)
         """
         if self.config["noise_level"] < 1.0:
-            self.config["noise_level"] = min(1.0, self.config["noise_level"] + step)
-            print(f"Livello di rumore aumentato a: {self.config['noise_level']:.3f}")
+            self.set_noise_level(min(1.0, self.config["noise_level"] + step))
+            self.instrumentation.emit("noise_changed", "Livello di rumore aumentato a: %.3f",
+                                      self.config["noise_level"], noise_level=self.config["noise_level"])
             return True
         else:
-            print("Livello di rumore massimo raggiunto (1.0)")
+            self.instrumentation.emit("noise_limit", "Livello di rumore massimo raggiunto (1.0)",
+                                      level=logging.WARNING, noise_level=1.0)
             return False
 
     def decrease_noise_level(self, step=0.01):
@@ -333,13 +447,53 @@ class DataGenerator:
         Diminuisce il livello di rumore di uno step (minimo 0.0)
         """
         if self.config["noise_level"] > 0.0:
-            self.config["noise_level"] = max(0.0, self.config["noise_level"] - step)
-            print(f"Livello di rumore diminuito a: {self.config['noise_level']:.3f}")
+            self.set_noise_level(max(0.0, self.config["noise_level"] - step))
+            self.instrumentation.emit("noise_changed", "Livello di rumore diminuito a: %.3f",
+                                      self.config["noise_level"], noise_level=self.config["noise_level"])
             return True
         else:
-            print("Livello di rumore minimo raggiunto (0.0)")
+            self.instrumentation.emit("noise_limit", "Livello di rumore minimo raggiunto (0.0)",
+                                      level=logging.WARNING, noise_level=0.0)
             return False
         
+    def set_noise_level(self, noise_level):
+        """
+        Imposta il livello di rumore e aggiorna i dati esistenti lasciando intatta la funzione pulita:
+        noises = noise_level * standard_noise e y_data = clip(y_data_clean + noises), scritti in place
+        nelle colonne del buffer a blocchi di NOISE_CHUNK_SIZE punti. Nessuna estrazione casuale e
+        nessuna allocazione grande come il dataset.
+        """
+        if noise_level < 0:
+            raise ValueError("Noise level must be non-negative")
+        self.config["noise_level"] = noise_level
+        if len(self.points) == 0:
+            return
+
+        with self.instrumentation.stage("set_noise_level"):
+            # La funzione pulita deve essere aggiornata prima di essere usata come base
+            self.refresh_derived_fields()
+            y_min, y_max = self.config["y_range"]
+            standard_noise = self.points.view("standard_noise")
+            y_data_clean = self.points.view("y_data_clean")
+            noises = self.points.view("noises")
+            y_data = self.points.view("y_data")
+            for start in range(0, len(self.points), self.NOISE_CHUNK_SIZE):
+                block = slice(start, start + self.NOISE_CHUNK_SIZE)
+                np.multiply(standard_noise[block], noise_level, out=noises[block])
+                np.add(y_data_clean[block], noises[block], out=y_data[block])
+                np.clip(y_data[block], y_min, y_max, out=y_data[block])
+        # y_data è cambiato in place, senza passare dal descrittore
+        self.invalidate_fit_statistics()
+
+    def resample_noise(self):
+        """
+        Nuova estrazione N(0, 1) per tutti i punti, poi riscalata al livello di rumore corrente
+        """
+        if len(self.points) == 0:
+            return
+        self.points.assign("standard_noise", np.random.standard_normal(len(self.points)))
+        self.set_noise_level(self.config["noise_level"])
+
     def update_function_parameters(self):
         """
         Ricalcola i parametri della funzione basandosi su tutti i punti presenti nel dataset
@@ -347,53 +501,122 @@ class DataGenerator:
         if not hasattr(self, 'x_data') or self.x_data is None or len(self.x_data) == 0:
             return
         
-        if self.config["polynomial_degree"] == 0:
-            # Per una costante, usa la media dei valori y
-            self.k = np.mean(self.y_data)
-            self.y_data_clean = np.ones(len(self.x_data)) * self.k
-            
-        elif self.config["polynomial_degree"] == 1:
-            # Regressione lineare con minimi quadrati
-            if len(self.x_data) >= 2:
-                # Calcola m e q con il metodo dei minimi quadrati
-                A = np.vstack([self.x_data, np.ones(len(self.x_data))]).T
-                self.m, self.q = np.linalg.lstsq(A, self.y_data, rcond=None)[0]
-                self.y_data_clean = self.m * self.x_data + self.q
-            elif len(self.x_data) == 1:
-                # Con un solo punto, mantieni i parametri esistenti o crea una retta orizzontale
-                if self.m is None or self.q is None:
-                    self.m = 0
-                    self.q = self.y_data[0]
-                self.y_data_clean = self.m * self.x_data + self.q
-                
-        elif self.config["polynomial_degree"] == 2:
-            # Regressione quadratica con minimi quadrati
-            if len(self.x_data) >= 3:
-                A = np.vstack([self.x_data**2, self.x_data, np.ones(len(self.x_data))]).T
-                coeffs = np.linalg.lstsq(A, self.y_data, rcond=None)[0]
-                self.a, self.b, self.c = coeffs
-                self.y_data_clean = self.a * self.x_data**2 + self.b * self.x_data + self.c
-            elif len(self.x_data) < 3:
-                # Con meno di 3 punti non possiamo determinare univocamente una parabola
-                if not hasattr(self, 'a'):
-                    self.a = 0
-                    self.b = 0
-                    self.c = np.mean(self.y_data) if len(self.y_data) > 0 else 0
-                self.y_data_clean = self.a * self.x_data**2 + self.b * self.x_data + self.c
-        
-        # Ricalcola i rumori come differenza tra dati e funzione pulita
-        self.noises = self.y_data - self.y_data_clean
-        
-        print(f"Parametri aggiornati:")
-        if self.config["polynomial_degree"] == 0:
-            print(f"  y = {self.k:.3f}")
-        elif self.config["polynomial_degree"] == 1:
-            print(f"  y = {self.m:.3f}x + {self.q:.3f}")
-        elif self.config["polynomial_degree"] == 2:
-            print(f"  y = {self.a:.3f}x² + {self.b:.3f}x + {self.c:.3f}")
+        # Riadatta i parametri della famiglia corrente ai dati (minimi quadrati): per le famiglie
+        # lineari nei parametri dalle equazioni normali aggiornate a ogni aggiunta/rimozione (O(d²))
+        family = self.function_family()
+        with self.instrumentation.stage("update_function_parameters"):
+            statistics = self.current_fit_statistics(family)
+            if statistics is not None and statistics.count >= statistics.n_features:
+                fitted = family.from_basis_coefficients(statistics.solve(), self.config, self.function_params)
+            else:
+                fitted = family.fit(self.x_data, self.y_data, self.config, self.function_params)
+            if fitted is not None:
+                self.function_params = fitted
+            if self.function_params is None:
+                return
+            # y_data_clean e noises vengono ricalcolati alla prossima lettura
+            self.derived_stale = True
+
+        if self.instrumentation.enabled(logging.DEBUG):
+            self.instrumentation.emit("parameters_updated", "Parametri aggiornati: %s",
+                                      family.describe(self.function_params), level=logging.DEBUG,
+                                      function_params=self.function_params)
+
+
+
+    def save_dataset(self, path):
+        """
+        Salva dati, config e parametri della funzione in path (formato di dataset_io)
+        """
+        self.refresh_derived_fields()
+        columns = {name: self.points.view(name) for name in self.points.fields}
+        save_dataset(path, columns, self.config, self.function_params)
+        self.instrumentation.emit("dataset_saved", "Dataset salvato in %s (%d punti)", path, len(self.points),
+                                  path=path, size=len(self.points))
 
+    def load_dataset(self, path):
+        """
+        Sostituisce i dati con quelli salvati in path. Le colonne sono memory map copy-on-write:
+        restano su disco finché non vengono lette, e le modifiche non toccano il file. Il primo punto
+        aggiunto copia le colonne in memoria; l'indice spaziale richiede comunque un ordinamento delle x.
+        Per dataset troppo grandi per la memoria usare direttamente dataset_io.load_dataset.
+        """
+        dataset = load_dataset(path, mmap_mode="c")
+        if "x_data" not in dataset or "y_data" not in dataset:
+            raise ValueError(f"Dataset {path} has no x_data/y_data columns")
+        if dataset.config is not None:
+            self.config.update(dataset.config)
+        self.dtype = dataset["x_data"].dtype
+        self.points = PointBuffer(self.POINT_FIELDS, dtype=self.dtype)
+        columns = {name: dataset[name] for name in self.points.fields if name in dataset}
+        if "point_id" not in columns:
+            columns["point_id"] = np.arange(len(dataset), dtype=np.int64)
+        self.points.adopt(**columns)
+
+        self.function_params = dataset.function_params
+        # Colonne derivate assenti nel file: ricalcolate alla prima lettura dalla funzione salvata
+        self.derived_stale = self.function_params is not None and not (
+            "y_data_clean" in dataset and "noises" in dataset)
+        self.invalidate_fit_statistics()
+        point_ids = self.points.view("point_id")
+        self.next_point_id = int(point_ids[-1]) + 1 if len(point_ids) else 0
+        self.spatial_index.build(self.x_data, point_ids)
+        self.instrumentation.emit("dataset_loaded", "Dataset caricato da %s (%d punti)", path, len(dataset),
+                                  path=path, size=len(dataset))
+
+    def refresh_derived_fields(self):
+        """
+        Ricalcola y_data_clean e noises (O(n)) se la funzione è cambiata dall'ultima lettura
+        """
+        if not self.derived_stale:
+            return
+        self.derived_stale = False
+        y_data_clean = self.evaluate_function(self.x_data)
+        self.points.assign("y_data_clean", y_data_clean)
+        self.points.assign("noises", self.y_data - y_data_clean)
+
+    def invalidate_fit_statistics(self):
+        self.fit_statistics = None
+        self.fit_basis_key = None
+
+    def fit_basis_key_for(self, family):
+        if not hasattr(family, "basis"):
+            return None
+        key = family.basis_key(self.config, self.function_params)
+        return None if key is None else (family.name, key)
+
+    def current_fit_statistics(self, family):
+        """
+        Equazioni normali del fit per la famiglia e la base correnti, ricostruite da tutti i punti
+        (O(n d²)) solo se la base è cambiata; None se la famiglia non ha un fit incrementale
+        """
+        key = self.fit_basis_key_for(family)
+        if key is None:
+            return None
+        if self.fit_statistics is None or self.fit_basis_key != key:
+            basis = family.basis(self.x_data, self.config, self.function_params)
+            self.fit_statistics = IncrementalLeastSquares(basis.shape[1])
+            self.fit_statistics.reset(basis, self.y_data)
+            self.fit_basis_key = key
+        return self.fit_statistics
+
+    def track_fit_statistics(self, x, y, remove):
+        """
+        Aggiorna le equazioni normali con i punti aggiunti o rimossi (O(d²) per punto);
+        se nel frattempo la base è cambiata le statistiche vengono scartate e ricostruite al prossimo fit
+        """
+        if self.fit_statistics is None:
+            return
+        family = self.function_family()
+        if self.fit_basis_key_for(family) != self.fit_basis_key:
+            self.invalidate_fit_statistics()
+            return
+        basis = family.basis(x, self.config, self.function_params)
+        if remove:
+            self.fit_statistics.remove(basis, y)
+        else:
+            self.fit_statistics.add(basis, y)
 
-            
     # def delete_datapoints(self):
     #     if hasattr(self, 'x_data'):
     #         del self.x_data
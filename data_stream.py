@@ -0,0 +1,187 @@
+import numpy as np
+
+from function_families import get_function_family
+
+
+
+# Punti per blocco di default: con cinque colonne float64 un blocco occupa circa 40 MiB
+DEFAULT_CHUNK_SIZE = 1 << 20
+STREAM_COLUMNS = ("x_data", "y_data", "y_data_clean", "noises", "standard_noise")
+
+
+class StreamStatistics:
+    """
+    Statistiche dei dati (conteggio, min/max/media di x e y, punti tagliati da y_range) aggiornate
+    blocco per blocco: ogni blocco costa O(chunk) e lo stato è di dimensione costante. Due istanze
+    calcolate su parti diverse dei dati si combinano con merge, con lo stesso risultato di un'unica
+    passata su tutti i punti (le medie sono pesate sui conteggi, senza accumulare somme enormi).
+    """
+    FIELDS = ("count", "x_min", "x_max", "x_mean", "y_min", "y_max", "y_mean", "clipped")
+
+    def __init__(self):
+        self.count = 0
+        self.x_min = np.inf
+        self.x_max = -np.inf
+        self.x_mean = 0.0
+        self.y_min = np.inf
+        self.y_max = -np.inf
+        self.y_mean = 0.0
+        self.clipped = 0
+
+    @classmethod
+    def from_data(cls, x, y, y_range):
+        """
+        Statistiche di un blocco di dati
+        """
+        statistics = cls()
+        if len(x) == 0:
+            return statistics
+        y_min, y_max = y_range
+        statistics.count = len(x)
+        statistics.x_min = float(np.min(x))
+        statistics.x_max = float(np.max(x))
+        statistics.x_mean = float(np.mean(x, dtype=float))
+        statistics.y_min = float(np.min(y))
+        statistics.y_max = float(np.max(y))
+        statistics.y_mean = float(np.mean(y, dtype=float))
+        statistics.clipped = int(np.count_nonzero((y == y_min) | (y == y_max)))
+        return statistics
+
+    def update(self, x, y, y_range):
+        """
+        Aggiunge un blocco di dati
+        """
+        return self.merge(StreamStatistics.from_data(x, y, y_range))
+
+    def merge(self, other):
+        """
+        Combina con le statistiche di altri dati (es. calcolate da un altro processo)
+        """
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        weight = other.count / total
+        self.x_mean += (other.x_mean - self.x_mean) * weight
+        self.y_mean += (other.y_mean - self.y_mean) * weight
+        self.x_min = min(self.x_min, other.x_min)
+        self.x_max = max(self.x_max, other.x_max)
+        self.y_min = min(self.y_min, other.y_min)
+        self.y_max = max(self.y_max, other.y_max)
+        self.clipped += other.clipped
+        self.count = total
+        return self
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+class DataStream:
+    """
+    Generazione a blocchi di un dataset di data_size punti con la configurazione di un DataGenerator,
+    senza mai tenere in memoria più di un blocco: iterando si ottengono dizionari di colonne
+    (STREAM_COLUMNS) di al più chunk_size punti, nel dtype richiesto.
+
+    I parametri della funzione sono estratti subito (function_params), prima del primo blocco, così
+    un sink può salvarli insieme ai dati. x e rumore standard vengono da due stream casuali
+    indipendenti derivati dal seed: il dataset prodotto non dipende da chunk_size.
+    Le statistiche dei blocchi già prodotti sono in statistics.
+    """
+    def __init__(self, config, data_size=None, chunk_size=DEFAULT_CHUNK_SIZE, seed=None, dtype=float,
+                 function_params=None, instrumentation=None):
+        self.config = dict(config)
+        self.data_size = self.config["data_size"] if data_size is None else int(data_size)
+        if self.data_size <= 0:
+            raise ValueError("Data size must be positive")
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+        self.chunk_size = int(chunk_size)
+        self.dtype = np.dtype(dtype)
+        self.instrumentation = instrumentation
+
+        self.family = get_function_family(self.config.get("function_family", "polynomial"))
+        seed = self.config.get("seed") if seed is None else seed
+        parameter_seed, x_seed, noise_seed = np.random.SeedSequence(seed).spawn(3)
+        self.x_rng = np.random.default_rng(x_seed)
+        self.noise_rng = np.random.default_rng(noise_seed)
+        if function_params is None:
+            function_params = self.family.sample_parameters(np.random.default_rng(parameter_seed), self.config)
+        self.function_params = function_params
+
+        self.statistics = StreamStatistics()
+        self.started = False
+
+    def __len__(self):
+        return self.data_size
+
+    @property
+    def n_chunks(self):
+        return -(-self.data_size // self.chunk_size)
+
+    def generate_chunk(self, size):
+        x_min, x_max = self.config["x_range"]
+        y_min, y_max = self.config["y_range"]
+        x_data = self.x_rng.uniform(x_min, x_max, size)
+        standard_noise = self.noise_rng.standard_normal(size)
+        noises = self.config["noise_level"] * standard_noise
+        y_data_clean = self.family.evaluate(x_data, self.function_params)
+        y_data = y_data_clean + noises
+        np.clip(y_data, y_min, y_max, out=y_data)
+        return {
+            "x_data": x_data.astype(self.dtype, copy=False),
+            "y_data": y_data.astype(self.dtype, copy=False),
+            "y_data_clean": y_data_clean.astype(self.dtype, copy=False),
+            "noises": noises.astype(self.dtype, copy=False),
+            "standard_noise": standard_noise.astype(self.dtype, copy=False),
+        }
+
+    def __iter__(self):
+        # Gli stream casuali avanzano con i blocchi: un DataStream si può percorrere una sola volta
+        if self.started:
+            raise RuntimeError("A DataStream can only be iterated once")
+        self.started = True
+        for start in range(0, self.data_size, self.chunk_size):
+            size = min(self.chunk_size, self.data_size - start)
+            if self.instrumentation is None:
+                chunk = self.generate_chunk(size)
+            else:
+                with self.instrumentation.stage("stream.generate"):
+                    chunk = self.generate_chunk(size)
+                self.instrumentation.count("stream_points", size)
+            self.statistics.update(chunk["x_data"], chunk["y_data"], self.config["y_range"])
+            yield chunk
+
+    def write_to(self, *sinks):
+        """
+        Consuma lo stream passando ogni blocco a tutti i sink (oggetti con write(**columns), es.
+        dataset_io.DatasetWriter o SparseGPSink) e chiama close() su quelli che lo definiscono.
+        Restituisce le statistiche finali.
+        """
+        for chunk in self:
+            for sink in sinks:
+                if self.instrumentation is None:
+                    sink.write(**chunk)
+                else:
+                    with self.instrumentation.stage("stream.write"):
+                        sink.write(**chunk)
+        for sink in sinks:
+            close = getattr(sink, "close", None)
+            if close is not None:
+                close()
+        return self.statistics
+
+
+class SparseGPSink:
+    """
+    Sink che addestra un SparseGaussianProcessRegressor sui blocchi di uno stream (partial_fit),
+    senza tenere i dati: la memoria è O(m² + m * chunk) per qualsiasi numero di punti.
+    I punti induttori vanno fissati prima dei dati: se non dati, griglia regolare su x_range.
+    """
+    def __init__(self, model, inducing_points=None, x_range=None):
+        self.model = model
+        self.model.start_stream(inducing_points, x_range)
+
+    def write(self, x_data, y_data, **columns):
+        self.model.partial_fit(x_data, y_data)
+
+    def close(self):
+        self.model.finish_stream()
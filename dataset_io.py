@@ -0,0 +1,190 @@
+import json
+import os
+
+import numpy as np
+
+
+
+FORMAT_NAME = "gaussian_process.dataset"
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+
+
+def _column_file(path, name):
+    return os.path.join(path, name + ".bin")
+
+
+def _to_json(value):
+    """
+    Config e parametri della funzione in forma serializzabile (array -> liste, dtype -> nome)
+    """
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (type, np.dtype)):
+        return np.dtype(value).name
+    return value
+
+
+def _read_meta(path):
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+    if meta.get("format") != FORMAT_NAME:
+        raise ValueError(f"{path} is not a dataset directory")
+    if meta["version"] > FORMAT_VERSION:
+        raise ValueError(f"Dataset format version {meta['version']} is newer than supported ({FORMAT_VERSION})")
+    return meta
+
+
+def _write_meta(path, meta):
+    # Scrittura atomica: un'interruzione lascia il meta precedente, coerente con i dati già scritti
+    tmp = os.path.join(path, META_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, os.path.join(path, META_FILE))
+
+
+class Dataset:
+    """
+    Dataset aperto da load_dataset: columns contiene un array per colonna (memmap se aperto con mmap),
+    config e function_params sono quelli salvati (None se assenti).
+    """
+    def __init__(self, path, size, columns, config, function_params):
+        self.path = path
+        self.size = size
+        self.columns = columns
+        self.config = config
+        self.function_params = function_params
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+
+class DatasetWriter:
+    """
+    Scrittura in coda di un dataset su disco: write() aggiunge un blocco di punti scrivendo i byte
+    delle colonne a partire dalla fine dei dati validi (nessuna riscrittura di quelli esistenti),
+    poi aggiorna size nel meta. Il meta è l'unica fonte della dimensione: se una scrittura si
+    interrompe a metà, i byte in più oltre size vengono ignorati e sovrascritti alla successiva.
+
+    Con create=True la directory viene (ri)creata con le colonne e i dtype dati, altrimenti si apre
+    un dataset esistente per aggiungere punti.
+    """
+    def __init__(self, path, dtypes=None, config=None, function_params=None, create=True):
+        self.path = path
+        if create:
+            if dtypes is None:
+                raise ValueError("Column dtypes are required to create a dataset")
+            os.makedirs(path, exist_ok=True)
+            self.meta = {
+                "format": FORMAT_NAME,
+                "version": FORMAT_VERSION,
+                "size": 0,
+                # Little-endian esplicito: i file restano leggibili su qualsiasi macchina
+                "columns": {name: np.dtype(dtype).newbyteorder("<").str for name, dtype in dtypes.items()},
+                "config": _to_json(config),
+                "function_params": _to_json(function_params),
+            }
+            for name in self.meta["columns"]:
+                open(_column_file(path, name), "wb").close()
+            _write_meta(path, self.meta)
+        else:
+            self.meta = _read_meta(path)
+
+    @property
+    def size(self):
+        return self.meta["size"]
+
+    @property
+    def dtypes(self):
+        return {name: np.dtype(dtype) for name, dtype in self.meta["columns"].items()}
+
+    def write(self, **columns):
+        """
+        Aggiunge un blocco di punti; servono tutte le colonne del dataset, con la stessa lunghezza
+        (le colonne in più vengono ignorate, così un DatasetWriter è un sink per data_stream.DataStream)
+        """
+        missing = set(self.meta["columns"]) - set(columns)
+        if missing:
+            raise ValueError(f"Missing columns: {sorted(missing)}")
+        lengths = {len(np.atleast_1d(columns[name])) for name in self.meta["columns"]}
+        if len(lengths) != 1:
+            raise ValueError("All columns must have the same number of points")
+        count = lengths.pop()
+
+        for name, dtype in self.dtypes.items():
+            values = np.ascontiguousarray(np.atleast_1d(columns[name]), dtype=dtype)
+            with open(_column_file(self.path, name), "r+b") as f:
+                f.seek(self.size * dtype.itemsize)
+                values.tofile(f)
+        self.meta["size"] = self.size + count
+        _write_meta(self.path, self.meta)
+        return count
+
+    def update_metadata(self, config=None, function_params=None):
+        if config is not None:
+            self.meta["config"] = _to_json(config)
+        if function_params is not None:
+            self.meta["function_params"] = _to_json(function_params)
+        _write_meta(self.path, self.meta)
+
+
+def save_dataset(path, columns, config=None, function_params=None):
+    """
+    Salva un dataset colonnare in path (directory): meta.json con dimensione, dtype delle colonne,
+    config e parametri della funzione, più un file binario grezzo per colonna
+    """
+    writer = DatasetWriter(path, {name: np.asarray(values).dtype for name, values in columns.items()},
+                           config, function_params)
+    writer.write(**columns)
+    return writer
+
+
+def append_dataset(path, **columns):
+    """
+    Estende un dataset esistente con nuovi punti, senza riscrivere quelli già salvati
+    """
+    return DatasetWriter(path, create=False).write(**columns)
+
+
+def load_dataset(path, mmap_mode="r"):
+    """
+    Apre un dataset salvato. Con mmap_mode ("r" sola lettura, "c" copy-on-write, "r+" scrittura su
+    file) le colonne sono memory map: l'apertura è immediata per qualsiasi dimensione e i dati
+    vengono letti dal disco solo quando (e dove) servono, per esempio dai GP che lavorano a blocchi.
+    Con mmap_mode=None le colonne sono caricate in memoria.
+    """
+    meta = _read_meta(path)
+    size = meta["size"]
+    columns = {}
+    for name, dtype in meta["columns"].items():
+        dtype = np.dtype(dtype)
+        if mmap_mode is None:
+            columns[name] = np.fromfile(_column_file(path, name), dtype=dtype, count=size)
+        elif size == 0:
+            # np.memmap non accetta mappature vuote
+            columns[name] = np.zeros(0, dtype=dtype)
+        else:
+            columns[name] = np.memmap(_column_file(path, name), dtype=dtype, mode=mmap_mode, shape=(size,))
+
+    config = meta.get("config")
+    if config is not None:
+        for key in ("x_range", "y_range"):
+            if key in config:
+                config[key] = tuple(config[key])
+    function_params = meta.get("function_params")
+    if function_params is not None:
+        function_params = {key: np.asarray(value) if isinstance(value, list) else value
+                           for key, value in function_params.items()}
+    return Dataset(path, size, columns, config, function_params)
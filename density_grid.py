@@ -0,0 +1,60 @@
+import numpy as np
+
+
+
+class DensityGrid:
+    """
+    Istogramma 2-D dei punti su una griglia fissa che copre x_range x y_range.
+
+    build() calcola i conteggi con np.histogram2d in O(n); add() e remove() aggiornano
+    solo i bin dei punti interessati, con la stessa regola di binning di histogram2d
+    (l'ultimo bin include il bordo destro, i punti fuori dalla griglia sono ignorati).
+    """
+    def __init__(self, x_range, y_range, bins=(200, 200)):
+        self.x_edges = np.linspace(x_range[0], x_range[1], bins[0] + 1)
+        self.y_edges = np.linspace(y_range[0], y_range[1], bins[1] + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+
+    @property
+    def extent(self):
+        return (self.x_edges[0], self.x_edges[-1], self.y_edges[0], self.y_edges[-1])
+
+    def build(self, x, y):
+        """
+        Ricalcola da zero tutti i conteggi
+        """
+        counts, _, _ = np.histogram2d(x, y, bins=[self.x_edges, self.y_edges])
+        self.counts = counts.astype(np.int64)
+
+    @staticmethod
+    def _bin_index(values, edges):
+        index = np.searchsorted(edges, values, side="right") - 1
+        # Come histogram2d: il bordo destro appartiene all'ultimo bin
+        index[values == edges[-1]] = len(edges) - 2
+        return index
+
+    def _update(self, x, y, sign):
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        ix = self._bin_index(x, self.x_edges)
+        iy = self._bin_index(y, self.y_edges)
+        inside = (ix >= 0) & (ix < self.counts.shape[0]) & (iy >= 0) & (iy < self.counts.shape[1])
+        np.add.at(self.counts, (ix[inside], iy[inside]), sign)
+
+    def add(self, x, y):
+        """
+        Aggiunge uno o più punti ai conteggi
+        """
+        self._update(x, y, 1)
+
+    def remove(self, x, y):
+        """
+        Toglie uno o più punti dai conteggi
+        """
+        self._update(x, y, -1)
+
+    def image(self):
+        """
+        Conteggi pronti per imshow (righe = y, origin='lower'); i bin vuoti sono mascherati (trasparenti)
+        """
+        return np.ma.masked_equal(self.counts.T, 0)
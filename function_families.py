@@ -0,0 +1,327 @@
+import numpy as np
+from scipy.linalg import cho_solve, cholesky
+
+from solvers import cholesky_update
+
+
+
+class IncrementalLeastSquares:
+    """
+    Minimi quadrati aggiornabili per famiglie lineari nei parametri (y ≈ Φ(x) c).
+
+    Mantiene le statistiche sufficienti G = Φ^T Φ e b = Φ^T y e il fattore di Cholesky di G:
+    aggiungere o togliere un punto costa O(d²) (aggiornamento di rango uno di G, b e del fattore)
+    e risolvere per c altre O(d²) con due sostituzioni triangolari, indipendentemente da n.
+    Se un downdate rende il fattore instabile viene ricalcolato da G alla soluzione successiva.
+    """
+    def __init__(self, n_features):
+        self.n_features = n_features
+        self.reset()
+
+    def reset(self, basis=None, y=None):
+        """
+        Ricalcola le statistiche da zero (O(n d²)); senza argomenti le azzera
+        """
+        if basis is None:
+            self.gram = np.zeros((self.n_features, self.n_features))
+            self.moments = np.zeros(self.n_features)
+            self.count = 0
+        else:
+            self.gram = basis.T @ basis
+            self.moments = basis.T @ np.asarray(y, dtype=float)
+            self.count = len(basis)
+        self.L = None
+
+    def add(self, basis, y):
+        """
+        Aggiunge le righe basis (k, d) con valori y (k,)
+        """
+        self._update(np.atleast_2d(basis), np.atleast_1d(y), 1.0)
+
+    def remove(self, basis, y):
+        self._update(np.atleast_2d(basis), np.atleast_1d(y), -1.0)
+
+    def _update(self, basis, y, sign):
+        self.gram += sign * (basis.T @ basis)
+        self.moments += sign * (basis.T @ np.asarray(y, dtype=float))
+        self.count += int(sign) * len(basis)
+        if self.L is None:
+            return
+        try:
+            for row in basis:
+                cholesky_update(self.L, row, downdate=sign < 0)
+        except np.linalg.LinAlgError:
+            self.L = None
+
+    def solve(self):
+        """
+        Coefficienti c che minimizzano ||Φ c - y||²; richiede count >= n_features
+        """
+        if self.L is None:
+            try:
+                self.L = cholesky(self.gram, lower=True, check_finite=False)
+            except np.linalg.LinAlgError:
+                # G singolare (es. x ripetute): soluzione a norma minima senza fattore
+                return np.linalg.lstsq(self.gram, self.moments, rcond=None)[0]
+        return cho_solve((self.L, True), self.moments, check_finite=False)
+
+
+class PolynomialFamily:
+    """
+    Polinomio di grado qualsiasi (config["polynomial_degree"]) che passa per degree + 1
+    nodi equispaziati in x_range con valori casuali in y_range.
+    Parametri: {"coefficients": array (..., degree + 1)} in potenze crescenti.
+
+    Come tutte le famiglie lineari nei parametri espone basis() e from_basis_coefficients() per
+    il fit incrementale (IncrementalLeastSquares): la base è quella di Legendre su x_range, molto
+    meglio condizionata dei monomi nelle equazioni normali.
+    """
+    name = "polynomial"
+
+    def sample_parameters(self, rng, config, size=None):
+        degree = config["polynomial_degree"]
+        if degree < 0:
+            raise ValueError("Polynomial degree must be non-negative")
+        x_min, x_max = config["x_range"]
+        y_min, y_max = config["y_range"]
+
+        x_nodes = np.linspace(x_min, x_max, degree + 1)
+        shape = (degree + 1,) if size is None else (size, degree + 1)
+        y_nodes = rng.uniform(y_min, y_max, shape)
+
+        # Un'unica soluzione del sistema di Vandermonde anche per un batch di funzioni
+        vandermonde = np.vander(x_nodes, degree + 1, increasing=True)
+        coefficients = np.linalg.solve(vandermonde, y_nodes.T).T
+        return {"coefficients": coefficients}
+
+    def evaluate(self, x, params):
+        coefficients = np.asarray(params["coefficients"], dtype=float)
+        if coefficients.ndim == 1:
+            return np.polynomial.polynomial.polyval(x, coefficients)
+
+        # Batch: Horner con i coefficienti di ogni dataset in broadcasting sulle righe di x
+        y = np.repeat(coefficients[:, -1:], np.shape(x)[-1], axis=1)
+        for power in range(coefficients.shape[1] - 2, -1, -1):
+            y *= x
+            y += coefficients[:, power:power + 1]
+        return y
+
+    def fit(self, x, y, config, params=None):
+        """
+        Minimi quadrati sui dati; con meno punti del necessario riduce il grado effettivo
+        """
+        degree = config["polynomial_degree"]
+        coefficients = np.zeros(degree + 1)
+        effective_degree = min(degree, len(x) - 1)
+        if effective_degree >= 0:
+            coefficients[:effective_degree + 1] = np.polynomial.polynomial.polyfit(x, y, effective_degree)
+        return {"coefficients": coefficients}
+
+    def basis_key(self, config, params):
+        """
+        Identifica la base: le statistiche del fit incrementale valgono finché la chiave non cambia
+        """
+        return (config["polynomial_degree"], tuple(config["x_range"]))
+
+    def basis(self, x, config, params):
+        x_min, x_max = config["x_range"]
+        t = (2.0 * np.asarray(x, dtype=float) - (x_min + x_max)) / (x_max - x_min)
+        return np.polynomial.legendre.legvander(t, config["polynomial_degree"])
+
+    def from_basis_coefficients(self, coefficients, config, params):
+        """
+        Coefficienti di Legendre su x_range convertiti in potenze crescenti di x (O(d²))
+        """
+        power = np.polynomial.Legendre(coefficients, domain=config["x_range"]).convert(
+            kind=np.polynomial.Polynomial).coef
+        result = np.zeros(config["polynomial_degree"] + 1)
+        result[:len(power)] = power
+        return {"coefficients": result}
+
+    def describe(self, params):
+        terms = []
+        for power, c in reversed(list(enumerate(params["coefficients"]))):
+            if power == 0:
+                terms.append(f"{c:.3f}")
+            elif power == 1:
+                terms.append(f"{c:.3f}x")
+            else:
+                terms.append(f"{c:.3f}x^{power}")
+        return "y = " + " + ".join(terms)
+
+
+class StepFamily:
+    """
+    Funzione a gradini con config.get("n_steps", 1) salti in posizioni casuali.
+    Parametri: {"breakpoints": (..., s) ordinati, "levels": (..., s + 1)}.
+    """
+    name = "step"
+
+    def sample_parameters(self, rng, config, size=None):
+        n_steps = config.get("n_steps", 1)
+        x_min, x_max = config["x_range"]
+        y_min, y_max = config["y_range"]
+        lead = () if size is None else (size,)
+        breakpoints = np.sort(rng.uniform(x_min, x_max, lead + (n_steps,)), axis=-1)
+        levels = rng.uniform(y_min, y_max, lead + (n_steps + 1,))
+        return {"breakpoints": breakpoints, "levels": levels}
+
+    def evaluate(self, x, params):
+        breakpoints = np.asarray(params["breakpoints"])
+        levels = np.asarray(params["levels"])
+        if breakpoints.ndim == 1:
+            return levels[np.searchsorted(breakpoints, x, side="right")]
+
+        # Batch: indice del gradino contando i salti superati
+        step_index = np.sum(x[..., None] >= breakpoints[:, None, :], axis=-1)
+        return np.take_along_axis(levels, step_index, axis=1)
+
+    def fit(self, x, y, config, params=None):
+        """
+        Con i salti fissati, il livello ottimo di ogni gradino è la media dei punti che contiene
+        """
+        if params is None:
+            return None
+        step_index = np.searchsorted(params["breakpoints"], x, side="right")
+        n_levels = len(params["levels"])
+        counts = np.bincount(step_index, minlength=n_levels)
+        sums = np.bincount(step_index, weights=y, minlength=n_levels)
+        levels = np.where(counts > 0, sums / np.maximum(counts, 1), params["levels"])
+        return {"breakpoints": params["breakpoints"], "levels": levels}
+
+    def describe(self, params):
+        jumps = ", ".join(f"{b:.3f}" for b in params["breakpoints"])
+        levels = ", ".join(f"{l:.3f}" for l in params["levels"])
+        return f"step function: jumps at [{jumps}], levels [{levels}]"
+
+
+class PeriodicFamily:
+    """
+    Sinusoide y = offset + amplitude * sin(2π x / period + phase) contenuta in y_range.
+    """
+    name = "periodic"
+
+    def sample_parameters(self, rng, config, size=None):
+        x_min, x_max = config["x_range"]
+        y_min, y_max = config["y_range"]
+        y_span = y_max - y_min
+        amplitude = rng.uniform(0.1, 0.4, size) * y_span
+        offset = rng.uniform(y_min + amplitude, y_max - amplitude)
+        period = rng.uniform(0.15, 0.6, size) * (x_max - x_min)
+        phase = rng.uniform(0.0, 2 * np.pi, size)
+        return {"offset": offset, "amplitude": amplitude, "period": period, "phase": phase}
+
+    def evaluate(self, x, params):
+        offset, amplitude, period, phase = (np.asarray(params[key], dtype=float)
+                                            for key in ("offset", "amplitude", "period", "phase"))
+        if offset.ndim == 1:
+            offset, amplitude, period, phase = (p[:, None] for p in (offset, amplitude, period, phase))
+        return offset + amplitude * np.sin(2 * np.pi * x / period + phase)
+
+    def fit(self, x, y, config, params=None):
+        """
+        A periodo e fase fissati, offset e ampiezza sono lineari: minimi quadrati su [1, sin(...)]
+        """
+        if params is None or len(x) < 2:
+            return params
+        basis = np.sin(2 * np.pi * x / params["period"] + params["phase"])
+        A = np.vstack([np.ones(len(x)), basis]).T
+        offset, amplitude = np.linalg.lstsq(A, y, rcond=None)[0]
+        return dict(params, offset=offset, amplitude=amplitude)
+
+    def basis_key(self, config, params):
+        if params is None:
+            return None
+        return (float(params["period"]), float(params["phase"]))
+
+    def basis(self, x, config, params):
+        x = np.asarray(x, dtype=float)
+        return np.stack([np.ones(len(x)), np.sin(2 * np.pi * x / params["period"] + params["phase"])], axis=1)
+
+    def from_basis_coefficients(self, coefficients, config, params):
+        return dict(params, offset=coefficients[0], amplitude=coefficients[1])
+
+    def describe(self, params):
+        return (f"y = {params['offset']:.3f} + {params['amplitude']:.3f} "
+                f"sin(2πx / {params['period']:.3f} + {params['phase']:.3f})")
+
+
+class RBFMixtureFamily:
+    """
+    Somma di config.get("n_components", 3) bump gaussiani su un offset costante.
+    Parametri: offset, weights, centers, widths (gli ultimi tre di forma (..., k)).
+    """
+    name = "rbf_mixture"
+
+    def sample_parameters(self, rng, config, size=None):
+        n_components = config.get("n_components", 3)
+        x_min, x_max = config["x_range"]
+        y_min, y_max = config["y_range"]
+        x_span, y_span = x_max - x_min, y_max - y_min
+        lead = () if size is None else (size,)
+        return {
+            "offset": rng.uniform(y_min + 0.2 * y_span, y_min + 0.5 * y_span, size),
+            "weights": rng.uniform(-0.3, 0.3, lead + (n_components,)) * y_span,
+            "centers": rng.uniform(x_min, x_max, lead + (n_components,)),
+            "widths": rng.uniform(0.03, 0.15, lead + (n_components,)) * x_span,
+        }
+
+    def evaluate(self, x, params):
+        offset = np.asarray(params["offset"], dtype=float)
+        weights, centers, widths = (np.asarray(params[key], dtype=float)
+                                    for key in ("weights", "centers", "widths"))
+        if offset.ndim == 1:
+            offset = offset[:, None]
+            weights, centers, widths = weights[:, None, :], centers[:, None, :], widths[:, None, :]
+        bumps = np.exp(-0.5 * ((np.asarray(x)[..., None] - centers) / widths) ** 2)
+        return offset + np.sum(weights * bumps, axis=-1)
+
+    def fit(self, x, y, config, params=None):
+        """
+        A centri e larghezze fissati, offset e pesi sono lineari nei dati
+        """
+        if params is None or len(x) < len(params["centers"]) + 1:
+            return params
+        bumps = np.exp(-0.5 * ((x[:, None] - params["centers"]) / params["widths"]) ** 2)
+        A = np.hstack([np.ones((len(x), 1)), bumps])
+        solution = np.linalg.lstsq(A, y, rcond=None)[0]
+        return dict(params, offset=solution[0], weights=solution[1:])
+
+    def basis_key(self, config, params):
+        if params is None:
+            return None
+        return (np.asarray(params["centers"], dtype=float).tobytes(), np.asarray(params["widths"], dtype=float).tobytes())
+
+    def basis(self, x, config, params):
+        x = np.asarray(x, dtype=float)
+        bumps = np.exp(-0.5 * ((x[:, None] - params["centers"]) / params["widths"]) ** 2)
+        return np.hstack([np.ones((len(x), 1)), bumps])
+
+    def from_basis_coefficients(self, coefficients, config, params):
+        return dict(params, offset=coefficients[0], weights=coefficients[1:])
+
+    def describe(self, params):
+        return f"RBF mixture: offset {params['offset']:.3f}, centers {np.round(params['centers'], 3).tolist()}"
+
+
+FUNCTION_FAMILIES = {}
+
+
+def register_function_family(family):
+    """
+    Registra una famiglia di funzioni (oggetto con name, sample_parameters, evaluate, fit e describe;
+    le famiglie lineari nei parametri possono aggiungere basis_key, basis e from_basis_coefficients
+    per il fit incrementale)
+    """
+    FUNCTION_FAMILIES[family.name] = family
+    return family
+
+
+def get_function_family(name):
+    if name not in FUNCTION_FAMILIES:
+        raise ValueError(f"Unknown function family '{name}', available: {sorted(FUNCTION_FAMILIES)}")
+    return FUNCTION_FAMILIES[name]
+
+
+for _family in (PolynomialFamily(), StepFamily(), PeriodicFamily(), RBFMixtureFamily()):
+    register_function_family(_family)
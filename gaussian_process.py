@@ -0,0 +1,339 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy.linalg import cholesky, cho_solve, solve_triangular
+from scipy.optimize import minimize
+
+from kernels import RBFKernel
+from solvers import cholesky_update, jittered_cholesky
+
+
+
+class GaussianProcessRegressor:
+    """
+    Regressione GP esatta basata sulla fattorizzazione di Cholesky.
+
+    La matrice K + σ²I viene fattorizzata una sola volta in fit() (O(n³));
+    ogni predizione riusa il fattore L e il vettore alpha = (K + σ²I)^-1 y:
+    la media costa O(n) e la varianza O(n²) per punto di test.
+
+    dtype è la precisione delle valutazioni del kernel e dei prodotti matrice-vettore della media
+    predittiva: con np.float32 le matrici di covarianza incrociate occupano metà memoria, mentre
+    Cholesky, alpha, varianze e log-determinante sono sempre accumulati in float64. Se la
+    fattorizzazione trova una matrice non definita positiva si ritenta con un jitter diagonale
+    crescente (vedi solvers.jittered_cholesky); quello usato resta in self.jitter.
+    """
+    def __init__(self, kernel=None, noise_variance=0.01, normalize_y=True, noise_variance_bounds=(1e-6, 10.0),
+                 dtype=float):
+        self.kernel = kernel if kernel is not None else RBFKernel()
+        self.noise_variance = noise_variance
+        self.normalize_y = normalize_y
+        self.noise_variance_bounds = noise_variance_bounds
+        self.dtype = np.dtype(dtype)
+        # Jitter aggiunto alla diagonale dall'ultima fattorizzazione (0.0 se non è servito)
+        self.jitter = 0.0
+
+        # Risultato dell'ultima ottimizzazione degli iperparametri (None se non ottimizzati)
+        self.optimization_result = None
+
+        self.x_train = None
+        self.y_train = None
+        self.y_mean = 0.0
+        self.L = None
+        self.alpha = None
+        # diag(K^-1) e norme al quadrato delle colonne di K^-1, per LOO e influenza (vedi _inverse_statistics)
+        self._inverse_cache = None
+
+    @property
+    def is_fitted(self):
+        return self.L is not None
+
+    def fit(self, x, y):
+        """
+        Fattorizza K(x, x) + σ²I e calcola alpha
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        if len(x) == 0:
+            raise ValueError("Cannot fit a GP on an empty dataset")
+        if len(x) != len(y):
+            raise ValueError("x and y must have the same length")
+
+        K = self.kernel(x, dtype=self.dtype)
+        K[np.diag_indices_from(K)] += self.noise_variance
+
+        self.x_train = x.copy()
+        self.y_train = y.copy()
+        self.L, self.jitter = jittered_cholesky(K)
+        self._update_alpha()
+        return self
+
+    @property
+    def theta(self):
+        """
+        Tutti gli iperparametri in scala logaritmica: quelli del kernel seguiti da log σ²
+        """
+        return np.append(self.kernel.theta, np.log(self.noise_variance))
+
+    @theta.setter
+    def theta(self, theta):
+        self.kernel.theta = theta[:-1]
+        self.noise_variance = float(np.exp(theta[-1]))
+
+    @property
+    def bounds(self):
+        return np.vstack([self.kernel.bounds, np.log(self.noise_variance_bounds)])
+
+    def _log_marginal_likelihood(self, theta, x, y):
+        """
+        log p(y | x, theta) e gradiente rispetto a theta con una sola fattorizzazione (O(n³)):
+        d lml / d theta_i = 0.5 tr((alpha alpha^T - K^-1) dK/dtheta_i)
+        """
+        kernel = self.kernel.clone_with_theta(theta[:-1])
+        noise_variance = np.exp(theta[-1])
+        K, K_gradients = kernel.gradient(x)
+        K[np.diag_indices_from(K)] += noise_variance
+
+        L = cholesky(K, lower=True, check_finite=False)
+        alpha = cho_solve((L, True), y, check_finite=False)
+        lml = -0.5 * y @ alpha - np.sum(np.log(np.diag(L))) - 0.5 * len(y) * np.log(2 * np.pi)
+
+        # W = alpha alpha^T - K^-1; per matrici simmetriche tr(W dK) = somma degli elementi di W * dK
+        W = np.outer(alpha, alpha)
+        W -= cho_solve((L, True), np.eye(len(y)), check_finite=False)
+        gradient = [0.5 * np.sum(W * dK) for dK in K_gradients]
+        # dK/dlog σ² = σ² I
+        gradient.append(0.5 * noise_variance * np.trace(W))
+        return lml, np.array(gradient)
+
+    def log_marginal_likelihood(self, theta=None, eval_gradient=False):
+        """
+        Log verosimiglianza marginale dei dati di training (con il theta corrente se non specificato)
+        """
+        if not self.is_fitted:
+            raise RuntimeError("GP not fitted yet, call fit() first")
+        theta = self.theta if theta is None else np.asarray(theta, dtype=float)
+        lml, gradient = self._log_marginal_likelihood(theta, self.x_train, self.y_train - self.y_mean)
+        return (lml, gradient) if eval_gradient else lml
+
+    def starting_points(self, n_restarts=5, warm_start=False, seed=None):
+        """
+        Punti di partenza dell'ottimizzazione: il theta corrente (dentro i bounds) seguito, se non
+        warm_start, da n_restarts punti uniformi nei bounds estratti con il seed dato
+        """
+        bounds = self.bounds
+        starts = [np.clip(self.theta, bounds[:, 0], bounds[:, 1])]
+        if not warm_start:
+            rng = np.random.default_rng(seed)
+            starts += list(rng.uniform(bounds[:, 0], bounds[:, 1], size=(n_restarts, len(bounds))))
+        return starts
+
+    def local_optimization(self, theta0, x, y_centered, max_iter=100):
+        """
+        Una singola ricerca L-BFGS-B di massimo della log verosimiglianza marginale partendo da theta0.
+        Restituisce (-lml, theta, iterazioni).
+        """
+        def negative_lml(theta):
+            try:
+                lml, gradient = self._log_marginal_likelihood(theta, x, y_centered)
+            except np.linalg.LinAlgError:
+                # Matrice non definita positiva: punto pessimo ma finito per L-BFGS
+                return 1e25, np.zeros_like(theta)
+            return -lml, -gradient
+
+        result = minimize(negative_lml, theta0, jac=True, method="L-BFGS-B", bounds=self.bounds,
+                          options={"maxiter": max_iter})
+        return float(result.fun), result.x, int(result.nit)
+
+    def apply_best_result(self, results):
+        """
+        Imposta il theta migliore fra i risultati di local_optimization; a parità di valore vince
+        la ripartenza con indice minore, così il risultato non dipende dall'ordine di esecuzione
+        """
+        best = min(range(len(results)), key=lambda i: (results[i][0], i))
+        value, theta, iterations = results[best]
+        self.theta = theta
+        self.optimization_result = {
+            "log_marginal_likelihood": -value,
+            "theta": np.array(theta),
+            "n_starts": len(results),
+            "iterations": iterations,
+        }
+
+    def optimize_hyperparameters(self, x, y, n_restarts=5, warm_start=False, max_iter=100, n_jobs=None, seed=None):
+        """
+        Stima lengthscale, varianza del segnale e varianza del rumore massimizzando la log verosimiglianza
+        marginale con L-BFGS-B e gradienti analitici.
+
+        Oltre al theta corrente si parte da n_restarts punti casuali nei bounds; le ripartenze sono
+        indipendenti e girano in parallelo su n_jobs thread (Cholesky e prodotti di matrici rilasciano il GIL).
+        Con warm_start=True (es. dopo aver aggiunto o tolto pochi punti) si parte solo dal theta corrente.
+        Il risultato è deterministico dato il seed. Al termine il GP viene addestrato con il theta migliore.
+        Per distribuire le ripartenze su più processi vedi parallel.parallel_optimize_hyperparameters.
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        if len(x) == 0:
+            raise ValueError("Cannot fit a GP on an empty dataset")
+        if len(x) != len(y):
+            raise ValueError("x and y must have the same length")
+
+        y_centered = y - (np.mean(y) if self.normalize_y else 0.0)
+        starts = self.starting_points(n_restarts, warm_start, seed)
+
+        def run(theta0):
+            return self.local_optimization(theta0, x, y_centered, max_iter)
+
+        n_jobs = n_jobs if n_jobs is not None else min(len(starts), os.cpu_count() or 1)
+        if n_jobs > 1 and len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                results = list(executor.map(run, starts))
+        else:
+            results = [run(theta0) for theta0 in starts]
+
+        self.apply_best_result(results)
+        return self.fit(x, y)
+
+    def _update_alpha(self):
+        """
+        Ricalcola alpha dal fattore corrente con due sostituzioni triangolari (O(n²))
+        """
+        self.y_mean = np.mean(self.y_train) if self.normalize_y else 0.0
+        self.alpha = cho_solve((self.L, True), self.y_train - self.y_mean, check_finite=False)
+        self._inverse_cache = None
+
+    def add_observation(self, x_new, y_new):
+        """
+        Aggiunge un punto al GP estendendo il fattore di Cholesky con una nuova riga (O(n²))
+        """
+        if not self.is_fitted:
+            return self.fit([x_new], [y_new])
+
+        x_new = float(np.ravel(x_new)[0])
+        y_new = float(np.ravel(y_new)[0])
+        n = len(self.x_train)
+
+        # Nuova riga: l = L^-1 k(X, x_new), d = sqrt(k(x_new, x_new) + σ² - l^T l)
+        k_new = self.kernel(self.x_train, [x_new], dtype=self.dtype)[:, 0]
+        l_row = solve_triangular(self.L, k_new, lower=True, check_finite=False)
+        d_sq = self.kernel.diag([x_new])[0] + self.noise_variance + self.jitter - l_row @ l_row
+        if d_sq <= 0:
+            raise np.linalg.LinAlgError("Kernel matrix is not positive definite after adding the point")
+
+        # Ordine Fortran: le colonne restano contigue per LAPACK e per gli aggiornamenti di rango uno
+        L = np.zeros((n + 1, n + 1), order="F")
+        L[:n, :n] = self.L
+        L[n, :n] = l_row
+        L[n, n] = np.sqrt(d_sq)
+
+        self.L = L
+        self.x_train = np.append(self.x_train, x_new)
+        self.y_train = np.append(self.y_train, y_new)
+        self._update_alpha()
+        return self
+
+    def remove_observation(self, index):
+        """
+        Rimuove il punto di indice index aggiornando il fattore di Cholesky in O(n²):
+        il blocco in basso a destra riceve un aggiornamento di rango uno con la colonna eliminata
+        """
+        if not self.is_fitted:
+            raise RuntimeError("GP not fitted yet, call fit() first")
+
+        n = len(self.x_train)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError(f"Observation index {index} out of range for {n} points")
+
+        if n == 1:
+            self.x_train = None
+            self.y_train = None
+            self.L = None
+            self.alpha = None
+            self.y_mean = 0.0
+            return self
+
+        keep = np.arange(n) != index
+        removed_column = self.L[index + 1:, index].copy()
+
+        # Copia a blocchi del fattore senza riga e colonna index (il blocco in alto a destra è nullo)
+        L = np.zeros((n - 1, n - 1), order="F")
+        L[:index, :index] = self.L[:index, :index]
+        L[index:, :index] = self.L[index + 1:, :index]
+        L[index:, index:] = self.L[index + 1:, index + 1:]
+        if index < n - 1:
+            cholesky_update(L[index:, index:], removed_column)
+
+        self.L = L
+        self.x_train = self.x_train[keep]
+        self.y_train = self.y_train[keep]
+        self._update_alpha()
+        return self
+
+    def _inverse_statistics(self):
+        """
+        diag(K^-1) e ||K^-1 e_i||² dal fattore di Cholesky: K^-1 = L^-T L^-1 costa O(n³) una volta
+        per modello (la cache si invalida quando cambiano i dati)
+        """
+        if self._inverse_cache is None:
+            L_inv = solve_triangular(self.L, np.eye(len(self.x_train)), lower=True, check_finite=False)
+            K_inv = L_inv.T @ L_inv
+            self._inverse_cache = (np.diag(K_inv).copy(), np.einsum("ij,ij->j", K_inv, K_inv))
+        return self._inverse_cache
+
+    def leave_one_out(self):
+        """
+        Predizioni leave-one-out di tutti i punti in forma chiusa (un solo passo O(n³) invece di n fit):
+        mu_-i = y_i - alpha_i / [K^-1]_ii, σ²_-i = 1 / [K^-1]_ii (varianza predittiva delle osservazioni).
+        La media di normalizzazione di y non viene ricalcolata senza il punto i.
+        """
+        if not self.is_fitted:
+            raise RuntimeError("GP not fitted yet, call fit() first")
+
+        K_inv_diag, _ = self._inverse_statistics()
+        residual = self.alpha / K_inv_diag
+        variance = 1.0 / K_inv_diag
+        log_density = -0.5 * (np.log(2 * np.pi * variance) + residual ** 2 / variance)
+        return {
+            "mean": self.y_train - residual,
+            "variance": variance,
+            "log_predictive_density": log_density,
+            "mean_log_predictive_density": float(np.mean(log_density)),
+            "rmse": float(np.sqrt(np.mean(residual ** 2))),
+        }
+
+    def influence_scores(self):
+        """
+        Di quanto cambierebbe il fit rimuovendo ciascun punto: variazione RMS della media a posteriori
+        sugli input di training. Con c_i = K^-1 e_i la rimozione del punto i sposta la media di
+        -(alpha_i / c_ii) (e_i - σ² c_i), quindi basta K^-1 e il costo è lo stesso del LOO.
+        """
+        if not self.is_fitted:
+            raise RuntimeError("GP not fitted yet, call fit() first")
+
+        K_inv_diag, K_inv_column_sq = self._inverse_statistics()
+        scale = self.alpha / K_inv_diag
+        s2 = self.noise_variance + self.jitter
+        squared_change = scale ** 2 * ((1 - s2 * K_inv_diag) ** 2 + s2 ** 2 * (K_inv_column_sq - K_inv_diag ** 2))
+        return np.sqrt(squared_change / len(self.x_train))
+
+    def predict(self, x, return_std=False):
+        """
+        Media (e opzionalmente deviazione standard) predittiva nei punti x
+        """
+        if not self.is_fitted:
+            raise RuntimeError("GP not fitted yet, call fit() first")
+
+        x = np.asarray(x, dtype=float).ravel()
+        K_cross = self.kernel(self.x_train, x, dtype=self.dtype)
+        mean = (K_cross.T @ self.alpha.astype(self.dtype, copy=False)).astype(float) + self.y_mean
+
+        if not return_std:
+            return mean
+
+        # v = L^-1 K(x_train, x): una sola sostituzione in avanti per tutti i punti
+        v = solve_triangular(self.L, K_cross, lower=True, check_finite=False)
+        variance = self.kernel.diag(x) - np.einsum("ij,ij->j", v, v)
+        return mean, np.sqrt(np.maximum(variance, 0.0))
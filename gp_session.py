@@ -0,0 +1,427 @@
+import numpy as np
+
+from data_generator import DataGenerator
+from gaussian_process import GaussianProcessRegressor
+from noise_sweep import noise_sweep
+from online_gp import OnlineGaussianProcessRegressor
+from sparse_gp import SparseGaussianProcessRegressor
+from kernels import MaternKernel, PeriodicKernel, RBFKernel
+
+
+
+class GPSession:
+    """
+    Controller senza interfaccia grafica della pipeline generatore + GP.
+
+    Contiene tutto lo stato (dataset, famiglia di funzioni, livello di rumore, modello GP e
+    ultima predizione) e le stesse operazioni dei bottoni di Interactive2DPlotter come metodi puri,
+    utilizzabili in script e job batch senza display. Questo modulo non importa matplotlib:
+    viene caricato solo da attach_view(), quando serve davvero una finestra.
+    """
+    GP_MODES = ['Exact', 'Sparse', 'Online']
+
+    # Ogni voce: (etichetta, famiglia nel registro di function_families.py, grado del polinomio)
+    FUNCTION_FAMILY_OPTIONS = [('Poly 0°', 'polynomial', 0), ('Poly 1°', 'polynomial', 1),
+                               ('Poly 2°', 'polynomial', 2), ('Poly 3°', 'polynomial', 3),
+                               ('Poly 5°', 'polynomial', 5), ('Step', 'step', None),
+                               ('Periodic', 'periodic', None), ('RBF mix', 'rbf_mixture', None)]
+
+    def __init__(self, data_config = {
+                        "polynomial_degree": 2,
+                        "data_size": 100,
+                        "noise_level": 0.1,
+                        "seed": 42,
+                        "x_range": (0, 1),
+                        "y_range": (0, 1)
+                        },
+                 n_prediction_points=200):
+        self.data_config = data_config
+        # Copia dei valori originali per il reset
+        self.original_data_config = data_config.copy()
+        self.data_generator = DataGenerator(config=self.data_config)
+
+        # Stato del GP: modello addestrato e ultima predizione sulla griglia x_line
+        self.gp = None
+        self.gp_prediction = None
+        self.gp_mode_index = 0
+        # Il GP esatto stima lengthscale, varianza del segnale e del rumore dai dati
+        self.learn_hyperparameters = True
+        self.n_restarts = 5
+        # Diagnostica LOO e influenza dei punti solo per il GP esatto e fino a questa dimensione (O(n³))
+        self.diagnostics_max_points = 2000
+        # Punti base del GP online: ogni punto aggiunto costa O(online_budget²) qualunque sia n
+        self.online_budget = 30
+        self.x_line = np.linspace(self.data_config["x_range"][0], self.data_config["x_range"][1],
+                                  n_prediction_points)
+
+        self.function_families = [label for label, _, _ in self.FUNCTION_FAMILY_OPTIONS]
+        self.current_family_index = self.family_index_from_config(self.data_config)
+
+    @property
+    def data_size(self):
+        return len(self.data_generator.x_data)
+
+    @property
+    def noise_level(self):
+        return self.data_generator.config["noise_level"]
+
+    @property
+    def gp_mode(self):
+        return self.GP_MODES[self.gp_mode_index]
+
+    @property
+    def function_family_label(self):
+        return self.function_families[self.current_family_index]
+
+    def attach_view(self, plot_config=None, show=True):
+        """
+        Crea la finestra interattiva su questa sessione; matplotlib viene importato solo qui
+        """
+        from plotter2d import Interactive2DPlotter
+        if plot_config is None:
+            return Interactive2DPlotter(session=self, show=show)
+        return Interactive2DPlotter(plot_config=plot_config, session=self, show=show)
+
+    def sync_data_size(self):
+        self.data_config["data_size"] = self.data_size
+
+    # ------------------------------------------------------------------ dati
+
+    def generate_data(self):
+        """
+        Rigenera il dataset con la configurazione corrente
+        """
+        self.data_generator.generate_datapoints()
+        self.reset_gp()
+
+    def family_index_from_config(self, config):
+        """
+        Indice in FUNCTION_FAMILY_OPTIONS corrispondente a famiglia e grado della configurazione
+        """
+        family = config.get("function_family", "polynomial")
+        for index, (_, option_family, degree) in enumerate(self.FUNCTION_FAMILY_OPTIONS):
+            if option_family == family and (degree is None or degree == config["polynomial_degree"]):
+                return index
+        return 0
+
+    def set_function_family(self, index):
+        """
+        Seleziona la famiglia di funzioni di indice index e rigenera i dati
+        """
+        if not 0 <= index < len(self.FUNCTION_FAMILY_OPTIONS):
+            return False
+        self.current_family_index = index
+        _, family, degree = self.FUNCTION_FAMILY_OPTIONS[index]
+
+        self.data_generator.config["function_family"] = family
+        self.data_config["function_family"] = family
+        if degree is not None:
+            self.data_generator.config["polynomial_degree"] = degree
+            self.data_config["polynomial_degree"] = degree
+
+        # Rigenera i dati con la nuova funzione
+        self.generate_data()
+        return True
+
+    def next_function_family(self):
+        return self.set_function_family(self.current_family_index + 1)
+
+    def previous_function_family(self):
+        return self.set_function_family(self.current_family_index - 1)
+
+    def resample_noise(self):
+        """
+        Rigenera il rumore dei dati esistenti con il livello corrente (la funzione pulita non cambia)
+        """
+        self.data_generator.resample_noise()
+        self.reset_gp()
+
+    def set_noise_level(self, noise_level):
+        """
+        Nuovo livello di rumore: il generatore riscala in place il rumore dei dati esistenti
+        (la funzione pulita non cambia) e il GP va riaddestrato
+        """
+        self.data_generator.set_noise_level(noise_level)
+        self.data_config["noise_level"] = self.noise_level
+        self.reset_gp()
+
+    def increase_noise(self):
+        """
+        Aumenta il livello di rumore e aggiorna solo il rumore nei dati esistenti
+        """
+        success = self.data_generator.increase_noise_level()
+        if success:
+            self.data_config["noise_level"] = self.noise_level
+            self.reset_gp()
+        return success
+
+    def decrease_noise(self):
+        """
+        Diminuisce il livello di rumore e aggiorna solo il rumore nei dati esistenti
+        """
+        success = self.data_generator.decrease_noise_level()
+        if success:
+            self.data_config["noise_level"] = self.noise_level
+            self.reset_gp()
+        return success
+
+    def add_random_point(self):
+        """
+        Aggiunge un punto casuale sulla funzione corrente
+        """
+        success = self.data_generator.add_datapoint()
+        if success:
+            self.sync_data_size()
+            self.update_gp_after_add()
+        return success
+
+    def remove_first_point(self):
+        success = self.data_generator.remove_datapoint()
+        if success:
+            self.sync_data_size()
+            self.update_gp_after_remove(self.data_generator.last_removed_index)
+        return success
+
+    def add_point(self, x, y):
+        """
+        Aggiunge il punto (x, y) al dataset
+        """
+        success = self.data_generator.add_selected_point(x, y)
+        if success:
+            self.sync_data_size()
+            self.update_gp_after_add()
+        return success
+
+    def remove_point_near(self, x, y, tolerance=0.05):
+        """
+        Rimuove il punto più vicino a (x, y) entro tolerance
+        """
+        success = self.data_generator.remove_selected_point(x, y, tolerance)
+        if success:
+            self.sync_data_size()
+            self.update_gp_after_remove(self.data_generator.last_removed_index)
+        return success
+
+    def remove_points_in_rectangle(self, x_min, x_max, y_min, y_max):
+        """
+        Rimuove tutti i punti nel rettangolo; restituisce le posizioni dei punti rimossi
+        """
+        removed = self.data_generator.remove_points_in_rectangle(x_min, x_max, y_min, y_max)
+        if len(removed) > 0:
+            self.sync_data_size()
+            self.update_gp_after_remove_many(removed)
+        return removed
+
+    def reset(self):
+        """
+        Resetta completamente il DataGenerator, la famiglia di funzioni e il GP ai valori originali
+        """
+        self.data_config = self.original_data_config.copy()
+        self.data_generator = DataGenerator(config=self.data_config)
+        self.current_family_index = self.family_index_from_config(self.original_data_config)
+        self.reset_gp()
+
+    def save_dataset(self, path):
+        """
+        Salva il dataset corrente su disco (vedi DataGenerator.save_dataset)
+        """
+        if self.data_size == 0:
+            print("Nessun dato da salvare")
+            return False
+        self.data_generator.save_dataset(path)
+        return True
+
+    def load_dataset(self, path):
+        """
+        Carica un dataset salvato (memory map, vedi DataGenerator.load_dataset) con la sua configurazione
+        """
+        self.data_generator.load_dataset(path)
+        self.current_family_index = self.family_index_from_config(self.data_config)
+        self.reset_gp()
+        return True
+
+    # ------------------------------------------------------------------ GP
+
+    def create_kernel(self):
+        """
+        Kernel adatto alla famiglia di funzioni corrente: periodico per "periodic", Matérn 1/2
+        (funzioni non derivabili) per "step", RBF altrimenti
+        """
+        family = self.data_generator.config.get("function_family", "polynomial")
+        if family == "periodic":
+            return PeriodicKernel(lengthscale=1.0, period=0.3, signal_variance=0.1)
+        if family == "step":
+            return MaternKernel(lengthscale=0.1, signal_variance=0.1, nu=0.5)
+        return RBFKernel(lengthscale=0.1, signal_variance=0.1)
+
+    def create_gp(self):
+        """
+        Crea il modello GP (esatto, sparso o online) secondo la modalità selezionata
+        """
+        noise_variance = max(self.noise_level ** 2, 1e-6)
+        kernel = self.create_kernel()
+        if self.gp_mode == 'Online':
+            return OnlineGaussianProcessRegressor(kernel=kernel, noise_variance=noise_variance,
+                                                  budget=self.online_budget)
+        if self.gp_mode == 'Sparse':
+            return SparseGaussianProcessRegressor(kernel=kernel, noise_variance=noise_variance,
+                                                  n_inducing=20, method="vfe", inducing="kmeans",
+                                                  x_range=self.data_generator.config["x_range"])
+        # Il kernel è valutato nella stessa precisione del dataset (config["dtype"])
+        return GaussianProcessRegressor(kernel=kernel, noise_variance=noise_variance,
+                                        dtype=self.data_generator.dtype)
+
+    def fit_gp(self):
+        """
+        Addestra il GP sui dati correnti (una sola fattorizzazione di Cholesky)
+        """
+        if self.data_size == 0:
+            print("Nessun dato su cui addestrare il GP")
+            return False
+
+        previous_gp = self.gp
+        self.gp = self.create_gp()
+        if self.learn_hyperparameters and isinstance(self.gp, GaussianProcessRegressor):
+            # Se il GP precedente è sopravvissuto alle modifiche (solo punti aggiunti/rimossi)
+            # si riparte dal suo ottimo senza ripartenze casuali
+            warm_start = (isinstance(previous_gp, GaussianProcessRegressor)
+                          and previous_gp.optimization_result is not None)
+            if warm_start:
+                self.gp.theta = previous_gp.theta
+            self.gp.optimize_hyperparameters(self.data_generator.x_data, self.data_generator.y_data,
+                                             n_restarts=self.n_restarts, warm_start=warm_start,
+                                             seed=self.data_generator.config.get("seed"))
+            print(f"Iperparametri stimati: {self.gp.kernel}, noise_variance={self.gp.noise_variance:.3g} "
+                  f"(log marginal likelihood {self.gp.optimization_result['log_marginal_likelihood']:.3f})")
+        else:
+            self.gp.fit(self.data_generator.x_data, self.data_generator.y_data)
+        self.gp_prediction = None
+        print(f"GP ({self.gp_mode}) addestrato su {self.data_size} punti")
+        return True
+
+    def predict_gp(self):
+        """
+        Calcola media e deviazione standard del GP sulla griglia x_line
+        """
+        if self.gp is None or not self.gp.is_fitted:
+            print("GP non ancora addestrato")
+            return None
+
+        self.gp_prediction = self.gp.predict(self.x_line, return_std=True)
+        return self.gp_prediction
+
+    def toggle_gp_mode(self):
+        """
+        Alterna tra GP esatto e GP sparso; se un GP era addestrato viene riaddestrato nella nuova modalità
+        """
+        self.gp_mode_index = (self.gp_mode_index + 1) % len(self.GP_MODES)
+        if self.gp is not None and self.gp.is_fitted:
+            show_prediction = self.gp_prediction is not None
+            self.fit_gp()
+            if show_prediction:
+                self.predict_gp()
+        return self.gp_mode
+
+    def reset_gp(self):
+        """
+        Scarta il GP e la predizione quando i dati cambiano
+        """
+        self.gp = None
+        self.gp_prediction = None
+
+    def update_gp_after_add(self):
+        """
+        Aggiunge al GP l'ultimo punto del dataset senza rifattorizzare
+        (O(n²) per il GP esatto, O(m²) per quello online)
+        """
+        if self.gp is None or not self.gp.is_fitted:
+            return
+        if hasattr(self.gp, 'add_observation'):
+            self.gp.add_observation(self.data_generator.x_data[-1], self.data_generator.y_data[-1])
+        else:
+            # Il GP sparso si riaddestra in O(n m²)
+            self.gp.fit(self.data_generator.x_data, self.data_generator.y_data)
+        self.refresh_gp_prediction()
+
+    def update_gp_after_remove(self, index):
+        """
+        Rimuove dal GP il punto di indice index con un aggiornamento di rango uno (O(n²));
+        i GP sparso e online, che non separano i singoli punti, si riaddestrano da capo
+        """
+        if self.gp is None or not self.gp.is_fitted:
+            return
+        if hasattr(self.gp, 'remove_observation'):
+            self.gp.remove_observation(index)
+        elif self.data_size > 0:
+            self.gp.fit(self.data_generator.x_data, self.data_generator.y_data)
+        else:
+            self.reset_gp()
+        if self.gp is None or not self.gp.is_fitted:
+            self.reset_gp()
+            return
+        self.refresh_gp_prediction()
+
+    def update_gp_after_remove_many(self, indices):
+        """
+        Rimuove dal GP più punti: aggiornamenti di rango uno in ordine decrescente di indice
+        (gli indici ancora da rimuovere restano validi), oppure un nuovo fit se conviene
+        """
+        if self.gp is None or not self.gp.is_fitted:
+            return
+        remaining = self.data_size
+        # Ogni rimozione costa O(n²): oltre circa n/3 punti un fit O(n³) da zero è più rapido
+        if hasattr(self.gp, 'remove_observation') and len(indices) <= (remaining + len(indices)) // 3:
+            for index in sorted(indices, reverse=True):
+                self.gp.remove_observation(int(index))
+        elif remaining > 0:
+            self.gp.fit(self.data_generator.x_data, self.data_generator.y_data)
+        else:
+            self.reset_gp()
+        if self.gp is None or not self.gp.is_fitted:
+            self.reset_gp()
+            return
+        self.refresh_gp_prediction()
+
+    def gp_diagnostics(self, n_influential=5):
+        """
+        Bontà del fit con il leave-one-out in forma chiusa e posizioni (nel dataset) degli n_influential
+        punti la cui rimozione cambierebbe di più il fit; None se non disponibile
+        """
+        if not isinstance(self.gp, GaussianProcessRegressor) or not self.gp.is_fitted:
+            return None
+        if len(self.gp.x_train) > self.diagnostics_max_points:
+            return None
+
+        loo = self.gp.leave_one_out()
+        influence = self.gp.influence_scores()
+        # Gli osservati del GP sono nello stesso ordine del dataset (le rimozioni lo mantengono)
+        most_influential = np.argsort(influence)[::-1][:n_influential]
+        return {
+            "loo_mean_log_predictive_density": loo["mean_log_predictive_density"],
+            "loo_rmse": loo["rmse"],
+            "influence": influence,
+            "most_influential": most_influential,
+        }
+
+    def noise_sweep(self, noise_levels, rescale_data=True):
+        """
+        GP esatto sul dataset corrente per tutta la griglia di livelli di rumore, predetto su x_line
+        (vedi noise_sweep.noise_sweep). Usa il kernel del GP esatto addestrato, se c'è, altrimenti
+        quello di create_kernel; il GP corrente non viene modificato.
+        """
+        if self.data_size == 0:
+            print("Nessun dato per la scansione del rumore")
+            return None
+        if isinstance(self.gp, GaussianProcessRegressor) and self.gp.is_fitted:
+            kernel = self.gp.kernel
+        else:
+            kernel = self.create_kernel()
+        return noise_sweep(self.data_generator, noise_levels, kernel=kernel, x_test=self.x_line,
+                           rescale_data=rescale_data)
+
+    def refresh_gp_prediction(self):
+        """
+        Ricalcola la predizione sulla griglia solo se era già stata calcolata
+        """
+        if self.gp_prediction is not None:
+            self.gp_prediction = self.gp.predict(self.x_line, return_std=True)
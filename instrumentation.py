@@ -0,0 +1,107 @@
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+
+class Instrumentation:
+    """
+    Punto unico di osservazione di un componente (es. DataGenerator), con tre canali opzionali:
+
+    - logging: i messaggi passano dal logger dato, con i livelli standard (DEBUG per le operazioni
+      ripetute come l'aggiunta di un punto, INFO per le azioni dell'utente, WARNING per i limiti);
+    - listener: callback listener(name, fields) chiamate a ogni evento, utili come tracer;
+    - statistiche: con collect_stats=True stage() accumula i tempi per fase e count() i contatori.
+
+    Il chiamante controlla enabled(level) prima di preparare messaggi e statistiche: se nessun canale
+    è attivo il costo è un solo controllo, anche in cicli con milioni di chiamate.
+    """
+    def __init__(self, logger=None, collect_stats=False):
+        self.logger = logger if logger is not None else logging.getLogger("gaussian_process")
+        self.listeners = []
+        self.collect_stats = collect_stats
+        # Secondi totali e numero di esecuzioni per fase; contatori per nome
+        self.timers = defaultdict(float)
+        self.timer_calls = defaultdict(int)
+        self.counters = defaultdict(int)
+
+    @property
+    def collect_stats(self):
+        return self._collect_stats
+
+    @collect_stats.setter
+    def collect_stats(self, value):
+        self._collect_stats = bool(value)
+        self._update_active()
+
+    def _update_active(self):
+        # Attributo semplice (non una property): è l'unica cosa letta nei cicli caldi
+        self.active = self._collect_stats or bool(self.listeners)
+
+    def enabled(self, level=logging.INFO):
+        """
+        True se un evento di questo livello verrebbe registrato da almeno un canale
+        """
+        return self.active or self.logger.isEnabledFor(level)
+
+    def add_listener(self, listener):
+        """
+        Registra una callback listener(name, fields); restituisce la callback per poterla rimuovere
+        """
+        self.listeners.append(listener)
+        self._update_active()
+        return listener
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+        self._update_active()
+
+    def emit(self, name, message, *args, level=logging.INFO, **fields):
+        """
+        Evento name: message % args va al logger (se il livello è abilitato), fields ai listener
+        """
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, message, *args)
+        for listener in self.listeners:
+            listener(name, fields)
+
+    def count(self, name, n=1):
+        if self._collect_stats:
+            self.counters[name] += n
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Misura la durata del blocco se le statistiche o i listener sono attivi; i listener ricevono
+        un evento "stage" con nome e secondi
+        """
+        if not self.active:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if self._collect_stats:
+                self.timers[name] += elapsed
+                self.timer_calls[name] += 1
+            for listener in self.listeners:
+                listener("stage", {"stage": name, "seconds": elapsed})
+
+    def reset_stats(self):
+        self.timers.clear()
+        self.timer_calls.clear()
+        self.counters.clear()
+
+    def summary(self):
+        """
+        Tempi (totale e medio per chiamata) e contatori raccolti finora
+        """
+        return {
+            "timers": {name: {"total": total, "calls": self.timer_calls[name],
+                              "mean": total / self.timer_calls[name]}
+                       for name, total in self.timers.items()},
+            "counters": dict(self.counters),
+        }
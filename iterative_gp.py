@@ -0,0 +1,161 @@
+import numpy as np
+
+from kernels import RBFKernel
+from solvers import LowRankPreconditioner, conjugate_gradient, pivoted_cholesky, stochastic_lanczos_logdet
+
+
+
+class BlockedKernelOperator:
+    """
+    Operatore (K(X, X) + σ²I) che non viene mai costruito per intero:
+    ogni prodotto matrice-vettore calcola il kernel a blocchi di righe,
+    con memoria O(block_size * n) invece di O(n²).
+
+    Blocchi del kernel e prodotti sono calcolati in dtype (float32 dimezza memoria e banda);
+    il risultato, il termine di rumore e i vettori del gradiente coniugato restano in float64.
+    """
+    def __init__(self, kernel, x, noise_variance, block_size=512, dtype=float):
+        self.kernel = kernel
+        self.x = x
+        self.noise_variance = noise_variance
+        self.block_size = block_size
+        self.dtype = np.dtype(dtype)
+        self.size = len(x)
+
+    def matvec(self, v):
+        """
+        (K + σ²I) v; v può avere forma (n,) o (n, k)
+        """
+        out = np.empty_like(v, dtype=float)
+        v_low = v.astype(self.dtype, copy=False)
+        for start in range(0, self.size, self.block_size):
+            stop = min(start + self.block_size, self.size)
+            out[start:stop] = self.kernel(self.x[start:stop], self.x, dtype=self.dtype) @ v_low
+        out += self.noise_variance * v
+        return out
+
+    def cross_matvec(self, x_test, v):
+        """
+        K(x_test, X) v calcolato a blocchi di punti di test
+        """
+        out = np.empty((len(x_test),) + np.shape(v)[1:])
+        v_low = np.asarray(v).astype(self.dtype, copy=False)
+        for start in range(0, len(x_test), self.block_size):
+            stop = min(start + self.block_size, len(x_test))
+            out[start:stop] = self.kernel(x_test[start:stop], self.x, dtype=self.dtype) @ v_low
+        return out
+
+    def column(self, i):
+        """
+        Colonna i-esima di K (senza rumore), usata dal pivoted Cholesky
+        """
+        return self.kernel(self.x, self.x[i:i + 1])[:, 0]
+
+
+class IterativeGaussianProcessRegressor:
+    """
+    GP senza matrici dense: (K + σ²I) alpha = y è risolto con gradiente coniugato
+    precondizionato (precondizionatore pivoted Cholesky di rango basso) e log|K + σ²I|
+    è stimato con la quadratura stocastica di Lanczos.
+
+    cg_tol e cg_max_iter regolano il compromesso tra accuratezza e velocità;
+    la memoria è O(n * (block_size + preconditioner_rank)).
+    Con dtype=np.float32 i prodotti con il kernel sono in singola precisione, mentre CG, Lanczos e
+    precondizionatore accumulano in float64: l'accuratezza raggiungibile è limitata a cg_tol ~ 1e-5.
+    """
+    def __init__(self, kernel=None, noise_variance=0.01, block_size=512, preconditioner_rank=50,
+                 cg_tol=1e-6, cg_max_iter=1000, n_probes=10, lanczos_steps=30, normalize_y=True, seed=None,
+                 dtype=float):
+        self.kernel = kernel if kernel is not None else RBFKernel()
+        self.noise_variance = noise_variance
+        self.block_size = block_size
+        self.preconditioner_rank = preconditioner_rank
+        self.cg_tol = cg_tol
+        self.cg_max_iter = cg_max_iter
+        self.n_probes = n_probes
+        self.lanczos_steps = lanczos_steps
+        self.normalize_y = normalize_y
+        self.seed = seed
+        self.dtype = np.dtype(dtype)
+
+        self.x_train = None
+        self.y_train = None
+        self.y_mean = 0.0
+        self.operator = None
+        self.preconditioner = None
+        self.alpha = None
+        self.cg_info = None
+
+    @property
+    def is_fitted(self):
+        return self.alpha is not None
+
+    def _build(self, x):
+        """
+        Costruisce operatore e precondizionatore per gli input x e gli iperparametri correnti
+        """
+        self.operator = BlockedKernelOperator(self.kernel, x, self.noise_variance, self.block_size, self.dtype)
+        L = pivoted_cholesky(self.kernel.diag(x), self.operator.column, self.preconditioner_rank)
+        self.preconditioner = LowRankPreconditioner(L, self.noise_variance)
+
+    def _solve(self, b):
+        return conjugate_gradient(self.operator.matvec, b, tol=self.cg_tol, max_iter=self.cg_max_iter,
+                                  preconditioner=self.preconditioner.solve)
+
+    def fit(self, x, y):
+        """
+        Risolve (K + σ²I) alpha = y con PCG
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        if len(x) == 0:
+            raise ValueError("Cannot fit a GP on an empty dataset")
+        if len(x) != len(y):
+            raise ValueError("x and y must have the same length")
+
+        self.x_train = x
+        self.y_train = y
+        self.y_mean = np.mean(y) if self.normalize_y else 0.0
+        self._build(x)
+        self.alpha, self.cg_info = self._solve(y - self.y_mean)
+        return self
+
+    def log_determinant(self):
+        """
+        Stima SLQ di log|K + σ²I| = log|P| + log|P^-1/2 (K + σ²I) P^-1/2|:
+        il precondizionatore rende l'operatore ben condizionato e la quadratura più accurata
+        """
+        def preconditioned_matvec(v):
+            return self.preconditioner.inv_sqrt(self.operator.matvec(self.preconditioner.inv_sqrt(v)))
+
+        return self.preconditioner.logdet() + stochastic_lanczos_logdet(
+            preconditioned_matvec, self.operator.size, n_probes=self.n_probes,
+            n_steps=self.lanczos_steps, rng=self.seed)
+
+    def log_marginal_likelihood(self):
+        """
+        log p(y | X) = -1/2 y^T alpha - 1/2 log|K + σ²I| - n/2 log 2π, senza fattorizzare K
+        """
+        if not self.is_fitted:
+            raise RuntimeError("GP not fitted yet, call fit() first")
+        y_centered = self.y_train - self.y_mean
+        n = len(y_centered)
+        return -0.5 * (y_centered @ self.alpha + self.log_determinant() + n * np.log(2 * np.pi))
+
+    def predict(self, x, return_std=False):
+        """
+        Media predittiva (prodotto a blocchi con alpha) e, opzionalmente, deviazione standard:
+        la varianza richiede una risoluzione PCG con un termine noto per ogni punto di test
+        """
+        if not self.is_fitted:
+            raise RuntimeError("GP not fitted yet, call fit() first")
+
+        x = np.asarray(x, dtype=float).ravel()
+        mean = self.operator.cross_matvec(x, self.alpha) + self.y_mean
+        if not return_std:
+            return mean
+
+        K_cross = self.kernel(self.x_train, x)
+        solution, _ = self._solve(K_cross)
+        variance = self.kernel.diag(x) - np.einsum("ij,ij->j", K_cross, solution)
+        return mean, np.sqrt(np.maximum(variance, 0.0))
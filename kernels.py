@@ -0,0 +1,347 @@
+import copy
+
+import numpy as np
+
+
+
+def _as_1d(x):
+    return np.asarray(x, dtype=float).ravel()
+
+
+class Kernel:
+    """
+    Base dei kernel per input monodimensionali.
+
+    La matrice di Gram k(x1, x2) è calcolata a blocchi di righe scritti direttamente nella matrice
+    di uscita: i temporanei di ogni blocco (esponenziali, fattori dei kernel composti, ...) occupano
+    al più block_memory byte, indipendentemente da len(x1). Ogni sottoclasse implementa
+    _evaluate_block e dichiara in temporaries quanti temporanei grandi come il blocco alloca.
+
+    Con dtype=np.float32 la matrice (e i temporanei) sono calcolati in singola precisione: metà
+    memoria e banda, utile per prodotti matrice-vettore su n grandi; le fattorizzazioni dei modelli
+    restano in float64.
+
+    Gli iperparametri sono esposti in scala logaritmica come theta (con i relativi bounds) e
+    gradient(x) restituisce K(x, x) (sempre in float64) e le sue derivate rispetto a theta.
+    I kernel si combinano con + e * (SumKernel, ProductKernel).
+    """
+    # Memoria massima (byte) dei temporanei di un blocco; modificabile per istanza
+    block_memory = 64 * 2 ** 20
+    # Dipende solo da x - x' (necessario per esempio alla griglia di Toeplitz del GP SKI)
+    stationary = False
+    temporaries = 0
+
+    def __call__(self, x1, x2=None, dtype=None):
+        """
+        Matrice di covarianza tra x1 e x2 (se x2 è None, tra x1 e se stesso), nel dtype dato (float64 di default)
+        """
+        dtype = np.dtype(float if dtype is None else dtype)
+        x1 = _as_1d(x1).astype(dtype, copy=False)
+        x2 = x1 if x2 is None else _as_1d(x2).astype(dtype, copy=False)
+        out = np.empty((len(x1), len(x2)), dtype=dtype)
+        rows = max(1, int(self.block_memory // (dtype.itemsize * max(len(x2), 1) * max(self.temporaries, 1))))
+        for start in range(0, len(x1), rows):
+            self._evaluate_block(x1[start:start + rows], x2, out[start:start + rows])
+        return out
+
+    def _evaluate_block(self, x1, x2, out):
+        raise NotImplementedError
+
+    def diag(self, x):
+        """
+        Diagonale di k(x, x) senza costruire la matrice completa
+        """
+        raise NotImplementedError
+
+    def gradient(self, x):
+        """
+        K(x, x) e le sue derivate rispetto a theta (una matrice n x n per iperparametro)
+        """
+        raise NotImplementedError
+
+    @property
+    def theta(self):
+        return np.log([getattr(self, name) for name in self.hyperparameters])
+
+    @theta.setter
+    def theta(self, theta):
+        for name, value in zip(self.hyperparameters, np.exp(theta)):
+            setattr(self, name, float(value))
+
+    @property
+    def bounds(self):
+        """
+        Limiti (in scala logaritmica) usati dall'ottimizzazione degli iperparametri
+        """
+        return np.log([self.hyperparameter_bounds[name] for name in self.hyperparameters]).reshape(-1, 2)
+
+    def clone_with_theta(self, theta):
+        kernel = copy.deepcopy(self)
+        kernel.theta = theta
+        return kernel
+
+    def __add__(self, other):
+        return SumKernel(self, other)
+
+    def __mul__(self, other):
+        return ProductKernel(self, other)
+
+    def __repr__(self):
+        params = ", ".join(f"{name}={getattr(self, name):.3g}" for name in self.hyperparameters)
+        return f"{type(self).__name__}({params})"
+
+
+class StationaryKernel(Kernel):
+    """
+    Kernel che dipendono solo da d = x - x': ogni blocco parte dalle differenze via broadcasting 1-D,
+    scritte nel blocco di uscita e trasformate in place da _from_difference
+    """
+    stationary = True
+    hyperparameter_bounds = {"lengthscale": (1e-3, 1e2), "signal_variance": (1e-4, 1e2), "period": (1e-2, 1e2)}
+
+    def _evaluate_block(self, x1, x2, out):
+        np.subtract(x1[:, None], x2[None, :], out=out)
+        self._from_difference(out)
+
+    def _from_difference(self, d):
+        raise NotImplementedError
+
+    def _gradient_from_difference(self, d):
+        raise NotImplementedError
+
+    def gradient(self, x):
+        x = _as_1d(x)
+        return self._gradient_from_difference(x[:, None] - x[None, :])
+
+    def diag(self, x):
+        return np.full(np.asarray(x).size, float(self.signal_variance))
+
+
+class RBFKernel(StationaryKernel):
+    """
+    Kernel squared exponential (RBF):
+    k(x, x') = s² exp(-(x - x')² / (2 l²))
+    """
+    hyperparameters = ("lengthscale", "signal_variance")
+
+    def __init__(self, lengthscale=0.1, signal_variance=1.0):
+        self.lengthscale = lengthscale
+        self.signal_variance = signal_variance
+
+    def _from_difference(self, d):
+        d *= d
+        d *= -0.5 / self.lengthscale ** 2
+        np.exp(d, out=d)
+        d *= self.signal_variance
+
+    def _gradient_from_difference(self, d):
+        # dK/dlog l = K (x - x')² / l², dK/dlog s² = K
+        scaled_sq_dist = d ** 2 / self.lengthscale ** 2
+        K = self.signal_variance * np.exp(-0.5 * scaled_sq_dist)
+        return K, [K * scaled_sq_dist, K.copy()]
+
+
+class MaternKernel(StationaryKernel):
+    """
+    Kernel di Matérn con nu in {1/2, 3/2, 5/2}, con r = |x - x'| / l:
+    nu = 1/2: s² exp(-r)
+    nu = 3/2: s² (1 + √3 r) exp(-√3 r)
+    nu = 5/2: s² (1 + √5 r + 5 r² / 3) exp(-√5 r)
+    """
+    hyperparameters = ("lengthscale", "signal_variance")
+    temporaries = 2
+
+    def __init__(self, lengthscale=0.1, signal_variance=1.0, nu=2.5):
+        if nu not in (0.5, 1.5, 2.5):
+            raise ValueError("Matérn kernel supports nu = 0.5, 1.5 or 2.5")
+        self.lengthscale = lengthscale
+        self.signal_variance = signal_variance
+        self.nu = nu
+
+    def _from_difference(self, d):
+        # d diventa c r con c = 1, √3, √5; il temporaneo exp(-c r) ha la dimensione del blocco
+        c = np.sqrt(2 * self.nu)
+        np.abs(d, out=d)
+        d *= c / self.lengthscale
+        decay = np.exp(-d)
+        if self.nu == 0.5:
+            d[...] = decay
+        elif self.nu == 1.5:
+            d += 1.0
+            d *= decay
+        else:
+            polynomial = d * d
+            polynomial /= 3.0
+            polynomial += d
+            polynomial += 1.0
+            np.multiply(polynomial, decay, out=d)
+        d *= self.signal_variance
+
+    def _gradient_from_difference(self, d):
+        c = np.sqrt(2 * self.nu)
+        scaled = c * np.abs(d) / self.lengthscale
+        decay = np.exp(-scaled)
+        if self.nu == 0.5:
+            K = self.signal_variance * decay
+            dK_dlog_l = K * scaled
+        elif self.nu == 1.5:
+            K = self.signal_variance * (1 + scaled) * decay
+            dK_dlog_l = self.signal_variance * scaled ** 2 * decay
+        else:
+            K = self.signal_variance * (1 + scaled + scaled ** 2 / 3) * decay
+            dK_dlog_l = self.signal_variance * scaled ** 2 * (1 + scaled) / 3 * decay
+        return K, [dK_dlog_l, K.copy()]
+
+    def __repr__(self):
+        return (f"MaternKernel(nu={self.nu}, lengthscale={self.lengthscale:.3g}, "
+                f"signal_variance={self.signal_variance:.3g})")
+
+
+class PeriodicKernel(StationaryKernel):
+    """
+    Kernel periodico (exp-sine-squared), adatto alla famiglia "periodic" di function_families:
+    k(x, x') = s² exp(-2 sin²(π |x - x'| / p) / l²)
+    """
+    hyperparameters = ("lengthscale", "period", "signal_variance")
+
+    def __init__(self, lengthscale=1.0, period=0.3, signal_variance=1.0):
+        self.lengthscale = lengthscale
+        self.period = period
+        self.signal_variance = signal_variance
+
+    def _from_difference(self, d):
+        d *= np.pi / self.period
+        np.sin(d, out=d)
+        d *= d
+        d *= -2.0 / self.lengthscale ** 2
+        np.exp(d, out=d)
+        d *= self.signal_variance
+
+    def _gradient_from_difference(self, d):
+        phase = np.pi * d / self.period
+        sin_sq = np.sin(phase) ** 2
+        K = self.signal_variance * np.exp(-2 * sin_sq / self.lengthscale ** 2)
+        dK_dlog_l = K * 4 * sin_sq / self.lengthscale ** 2
+        dK_dlog_p = K * 2 * phase * np.sin(2 * phase) / self.lengthscale ** 2
+        return K, [dK_dlog_l, dK_dlog_p, K.copy()]
+
+
+class LinearKernel(Kernel):
+    """
+    Kernel lineare k(x, x') = s² (x - c)(x' - c), con offset c fisso
+    """
+    hyperparameters = ("signal_variance",)
+    hyperparameter_bounds = {"signal_variance": (1e-4, 1e2)}
+
+    def __init__(self, signal_variance=1.0, offset=0.0):
+        self.signal_variance = signal_variance
+        self.offset = offset
+
+    def _evaluate_block(self, x1, x2, out):
+        np.multiply((x1 - self.offset)[:, None], (x2 - self.offset)[None, :], out=out)
+        out *= self.signal_variance
+
+    def diag(self, x):
+        return self.signal_variance * (_as_1d(x) - self.offset) ** 2
+
+    def gradient(self, x):
+        K = self(x)
+        return K, [K.copy()]
+
+
+class PolynomialKernel(Kernel):
+    """
+    Kernel polinomiale k(x, x') = s² (x x' + c)^degree, con grado intero fisso
+    """
+    hyperparameters = ("signal_variance", "bias")
+    hyperparameter_bounds = {"signal_variance": (1e-4, 1e2), "bias": (1e-4, 1e2)}
+
+    def __init__(self, degree=2, signal_variance=1.0, bias=1.0):
+        self.degree = int(degree)
+        self.signal_variance = signal_variance
+        self.bias = bias
+
+    def _evaluate_block(self, x1, x2, out):
+        np.multiply(x1[:, None], x2[None, :], out=out)
+        out += self.bias
+        np.power(out, self.degree, out=out)
+        out *= self.signal_variance
+
+    def diag(self, x):
+        return self.signal_variance * (_as_1d(x) ** 2 + self.bias) ** self.degree
+
+    def gradient(self, x):
+        x = _as_1d(x)
+        base = np.outer(x, x) + self.bias
+        K = self.signal_variance * base ** self.degree
+        dK_dlog_bias = self.signal_variance * self.degree * base ** (self.degree - 1) * self.bias
+        return K, [K.copy(), dK_dlog_bias]
+
+    def __repr__(self):
+        return (f"PolynomialKernel(degree={self.degree}, signal_variance={self.signal_variance:.3g}, "
+                f"bias={self.bias:.3g})")
+
+
+class _CompositeKernel(Kernel):
+    """
+    Combinazione di due kernel: theta e bounds sono la concatenazione di quelli delle parti
+    """
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+        self.stationary = left.stationary and right.stationary
+        # Il fattore destro occupa un blocco mentre una delle due parti calcola il proprio
+        self.temporaries = 1 + max(left.temporaries, right.temporaries)
+
+    @property
+    def theta(self):
+        return np.concatenate([self.left.theta, self.right.theta])
+
+    @theta.setter
+    def theta(self, theta):
+        split = len(self.left.theta)
+        self.left.theta = theta[:split]
+        self.right.theta = theta[split:]
+
+    @property
+    def bounds(self):
+        return np.vstack([self.left.bounds, self.right.bounds])
+
+
+class SumKernel(_CompositeKernel):
+    def _evaluate_block(self, x1, x2, out):
+        self.left._evaluate_block(x1, x2, out)
+        right = np.empty_like(out)
+        self.right._evaluate_block(x1, x2, right)
+        out += right
+
+    def diag(self, x):
+        return self.left.diag(x) + self.right.diag(x)
+
+    def gradient(self, x):
+        K_left, gradients_left = self.left.gradient(x)
+        K_right, gradients_right = self.right.gradient(x)
+        return K_left + K_right, gradients_left + gradients_right
+
+    def __repr__(self):
+        return f"{self.left!r} + {self.right!r}"
+
+
+class ProductKernel(_CompositeKernel):
+    def _evaluate_block(self, x1, x2, out):
+        self.left._evaluate_block(x1, x2, out)
+        right = np.empty_like(out)
+        self.right._evaluate_block(x1, x2, right)
+        out *= right
+
+    def diag(self, x):
+        return self.left.diag(x) * self.right.diag(x)
+
+    def gradient(self, x):
+        K_left, gradients_left = self.left.gradient(x)
+        K_right, gradients_right = self.right.gradient(x)
+        return (K_left * K_right,
+                [dK * K_right for dK in gradients_left] + [K_left * dK for dK in gradients_right])
+
+    def __repr__(self):
+        return f"({self.left!r}) * ({self.right!r})"
@@ -0,0 +1,88 @@
+import numpy as np
+from scipy.linalg import eigh
+
+from kernels import RBFKernel
+
+
+
+def noise_sweep(generator, noise_levels, kernel=None, x_test=None, rescale_data=True, normalize_y=True,
+                min_noise_variance=1e-6):
+    """
+    GP esatto per un'intera griglia di livelli di rumore sullo stesso dataset di un DataGenerator.
+
+    K(x, x) non dipende dal rumore: con una sola decomposizione K = Q diag(λ) Q^T (O(n³)) ogni
+    (K + σ²I)^-1 = Q diag(1 / (λ + σ²)) Q^T e log|K + σ²I| = Σ log(λ + σ²), quindi per ogni livello
+    bastano prodotti O(n²) invece di una nuova fattorizzazione. Tutti i livelli sono elaborati insieme
+    con prodotti matrice-matrice.
+
+    Per ogni livello σ la varianza del rumore del GP è max(σ², min_noise_variance); con
+    rescale_data=True anche i dati sono quelli che il generatore produrrebbe a quel livello,
+    y = clip(y_data_clean + σ standard_noise) (vedi DataGenerator.set_noise_level), altrimenti si usa
+    sempre y_data corrente. Gli iperparametri del kernel restano fissi.
+
+    Restituisce array impilati con i livelli sulla prima dimensione: media e deviazione standard
+    predittive su x_test (L, m), log verosimiglianza marginale, LOO (log densità predittiva media e
+    RMSE) e, se la funzione generatrice è nota, l'RMSE della media rispetto alla funzione pulita.
+    """
+    noise_levels = np.atleast_1d(np.asarray(noise_levels, dtype=float))
+    if np.any(noise_levels < 0):
+        raise ValueError("Noise levels must be non-negative")
+    x = np.asarray(generator.x_data, dtype=float)
+    n = len(x)
+    if n == 0:
+        raise ValueError("Cannot run a noise sweep on an empty dataset")
+    kernel = kernel if kernel is not None else RBFKernel()
+    if x_test is None:
+        x_test = np.linspace(generator.config["x_range"][0], generator.config["x_range"][1], 200)
+    x_test = np.asarray(x_test, dtype=float).ravel()
+
+    # Dati per ogni livello, una colonna per livello (n, L)
+    if rescale_data:
+        y_min, y_max = generator.config["y_range"]
+        y = np.asarray(generator.y_data_clean, dtype=float)[:, None] + \
+            np.asarray(generator.standard_noise, dtype=float)[:, None] * noise_levels[None, :]
+        np.clip(y, y_min, y_max, out=y)
+    else:
+        y = np.repeat(np.asarray(generator.y_data, dtype=float)[:, None], len(noise_levels), axis=1)
+    y_mean = np.mean(y, axis=0) if normalize_y else np.zeros(len(noise_levels))
+    y -= y_mean
+
+    # Parte comune a tutti i livelli: autovalori/autovettori di K e proiezioni su Q
+    eigenvalues, Q = eigh(kernel(x), overwrite_a=True, check_finite=False)
+    eigenvalues = np.maximum(eigenvalues, 0.0)
+    cross_projection = kernel(x_test, x) @ Q
+    y_projection = Q.T @ y
+
+    noise_variance = np.maximum(noise_levels ** 2, min_noise_variance)
+    # inverse[j, l] = 1 / (λ_j + σ_l²)
+    inverse = 1.0 / (eigenvalues[:, None] + noise_variance[None, :])
+    weighted = y_projection * inverse
+
+    mean = (cross_projection @ weighted).T + y_mean[:, None]
+    variance = kernel.diag(x_test)[None, :] - ((cross_projection ** 2) @ inverse).T
+    std = np.sqrt(np.maximum(variance, 0.0))
+
+    log_det = np.sum(np.log(eigenvalues[:, None] + noise_variance[None, :]), axis=0)
+    log_marginal_likelihood = -0.5 * (np.sum(y_projection * weighted, axis=0) + log_det + n * np.log(2 * np.pi))
+
+    # LOO in forma chiusa come GaussianProcessRegressor.leave_one_out: alpha_i / [K^-1]_ii
+    alpha = Q @ weighted
+    K_inv_diag = (Q ** 2) @ inverse
+    loo_residual = alpha / K_inv_diag
+    loo_variance = 1.0 / K_inv_diag
+    loo_log_density = -0.5 * (np.log(2 * np.pi * loo_variance) + loo_residual ** 2 / loo_variance)
+
+    result = {
+        "noise_levels": noise_levels,
+        "noise_variance": noise_variance,
+        "x_test": x_test,
+        "mean": mean,
+        "std": std,
+        "log_marginal_likelihood": log_marginal_likelihood,
+        "loo_mean_log_predictive_density": np.mean(loo_log_density, axis=0),
+        "loo_rmse": np.sqrt(np.mean(loo_residual ** 2, axis=0)),
+    }
+    clean = generator.evaluate_function(x_test)
+    if clean is not None:
+        result["test_rmse"] = np.sqrt(np.mean((mean - clean[None, :]) ** 2, axis=1))
+    return result
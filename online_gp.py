@@ -0,0 +1,190 @@
+import numpy as np
+
+from kernels import RBFKernel
+
+
+
+class OnlineGaussianProcessRegressor:
+    """
+    GP sparso online (Csató e Opper) con un budget fisso di m punti base.
+
+    Il posterior è rappresentato sui punti base B come mean(x) = k(x, B) alpha e
+    var(x) = k(x, x) + k(x, B) C k(B, x); Q = K(B, B)^-1 è mantenuta per proiettare sui punti base.
+    Ogni osservazione viene assorbita in O(m²) con un aggiornamento di rango uno:
+
+    - se k(x, x) - k^T Q k (la parte di k(x, ·) non rappresentabile sui punti base) è sotto
+      novelty_tol * k(x, x), l'osservazione aggiorna solo alpha e C proiettata sui punti esistenti;
+    - altrimenti x diventa un nuovo punto base, e se il budget è superato si elimina quello meno
+      informativo, cioè quello con punteggio alpha_i² / (Q_ii + C_ii) minimo (la perdita di
+      informazione della sua rimozione), ridistribuendone il contributo sugli altri.
+
+    Tutti gli array sono preallocati per budget + 1 punti: il costo e la memoria per punto non
+    dipendono da quanti punti sono già stati osservati. Le osservazioni assorbite non si possono
+    rimuovere singolarmente (fit ricomincia da capo).
+    """
+    def __init__(self, kernel=None, noise_variance=0.01, budget=30, novelty_tol=1e-3, normalize_y=True):
+        if budget < 1:
+            raise ValueError("Budget must be at least one basis point")
+        self.kernel = kernel if kernel is not None else RBFKernel()
+        self.noise_variance = noise_variance
+        self.budget = budget
+        self.novelty_tol = novelty_tol
+        self.normalize_y = normalize_y
+        self.reset()
+
+    def reset(self):
+        """
+        Svuota il modello (prior del GP)
+        """
+        capacity = self.budget + 1
+        self.basis = np.zeros(capacity)
+        self.alpha = np.zeros(capacity)
+        self.C = np.zeros((capacity, capacity))
+        self.Q = np.zeros((capacity, capacity))
+        self.size = 0
+        # Media di y sottratta alle osservazioni: fissata da fit, resta costante negli aggiornamenti
+        self.y_mean = 0.0
+        # Osservazioni assorbite e punti base eliminati dall'ultimo reset
+        self.n_observed = 0
+        self.n_evicted = 0
+
+    @property
+    def is_fitted(self):
+        return self.size > 0
+
+    @property
+    def inducing_points(self):
+        """
+        Punti base correnti (come i punti induttori del GP sparso)
+        """
+        return self.basis[:self.size]
+
+    def fit(self, x, y):
+        """
+        Ricomincia da capo e assorbe i punti in ordine, in O(n m²)
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        if len(x) == 0:
+            raise ValueError("Cannot fit a GP on an empty dataset")
+        if len(x) != len(y):
+            raise ValueError("x and y must have the same length")
+        self.reset()
+        self.y_mean = np.mean(y) if self.normalize_y else 0.0
+        return self.partial_fit(x, y)
+
+    def partial_fit(self, x, y):
+        """
+        Assorbe i punti in ordine senza ricominciare (per blocchi di uno stream di dati)
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        if len(x) != len(y):
+            raise ValueError("x and y must have the same length")
+        for x_new, y_new in zip(x, y):
+            self._absorb(x_new, y_new)
+        return self
+
+    def add_observation(self, x_new, y_new):
+        """
+        Assorbe un punto in O(m²)
+        """
+        self._absorb(float(np.ravel(x_new)[0]), float(np.ravel(y_new)[0]))
+        return self
+
+    def _absorb(self, x_new, y_new):
+        m = self.size
+        alpha = self.alpha[:m]
+        C = self.C[:m, :m]
+        Q = self.Q[:m, :m]
+
+        k = self.kernel(self.basis[:m], [x_new])[:, 0]
+        k_self = self.kernel.diag([x_new])[0]
+
+        # Predizione corrente in x_new e aggiornamento della verosimiglianza gaussiana
+        Ck = C @ k
+        denominator = k_self + k @ Ck + self.noise_variance
+        q = (y_new - self.y_mean - k @ alpha) / denominator
+        r = -1.0 / denominator
+
+        # Proiezione di k(x_new, ·) sui punti base e parte residua (novità)
+        e = Q @ k
+        novelty = k_self - k @ e
+        self.n_observed += 1
+
+        if novelty <= self.novelty_tol * k_self:
+            s = Ck + e
+            alpha += q * s
+            C += r * np.outer(s, s)
+            return
+
+        # Nuovo punto base in posizione m: Q cresce con la formula dell'inversa a blocchi
+        self.basis[m] = x_new
+        self.alpha[m] = 0.0
+        self.C[m, :m + 1] = 0.0
+        self.C[:m, m] = 0.0
+        Q += np.outer(e, e) / novelty
+        self.Q[m, :m] = -e / novelty
+        self.Q[:m, m] = -e / novelty
+        self.Q[m, m] = 1.0 / novelty
+        self.size = m + 1
+
+        s = np.append(Ck, 1.0)
+        self.alpha[:m + 1] += q * s
+        self.C[:m + 1, :m + 1] += r * np.outer(s, s)
+
+        if self.size > self.budget:
+            self._evict(int(np.argmin(self.scores())))
+
+    def scores(self):
+        """
+        Informazione persa eliminando ciascun punto base: alpha_i² / (Q_ii + C_ii)
+        """
+        m = self.size
+        diagonal = np.diag(self.Q)[:m] + np.diag(self.C)[:m]
+        return self.alpha[:m] ** 2 / np.maximum(diagonal, np.finfo(float).tiny)
+
+    def _evict(self, index):
+        """
+        Elimina il punto base index in O(m²), riproiettandone il contributo sugli altri
+        """
+        last = self.size - 1
+        if index != last:
+            # Scambio con l'ultimo: l'ordine dei punti base non conta
+            for array in (self.basis, self.alpha):
+                array[[index, last]] = array[[last, index]]
+            for matrix in (self.C, self.Q):
+                matrix[[index, last], :] = matrix[[last, index], :]
+                matrix[:, [index, last]] = matrix[:, [last, index]]
+
+        alpha_star = self.alpha[last]
+        c_star = self.C[last, last]
+        q_star = self.Q[last, last]
+        Q_column = self.Q[:last, last].copy()
+        C_column = self.C[:last, last].copy()
+
+        self.alpha[:last] -= alpha_star / q_star * Q_column
+        QQ = np.outer(Q_column, Q_column)
+        QC = np.outer(Q_column, C_column)
+        self.C[:last, :last] += c_star / q_star ** 2 * QQ - (QC + QC.T) / q_star
+        self.Q[:last, :last] -= QQ / q_star
+        self.size = last
+        self.n_evicted += 1
+
+    def predict(self, x, return_std=False):
+        """
+        Media (O(m) per punto) e opzionalmente deviazione standard (O(m²) per punto)
+        """
+        if not self.is_fitted:
+            raise RuntimeError("GP not fitted yet, call fit() first")
+
+        m = self.size
+        x = np.asarray(x, dtype=float).ravel()
+        K_bx = self.kernel(self.basis[:m], x)
+        mean = K_bx.T @ self.alpha[:m] + self.y_mean
+
+        if not return_std:
+            return mean
+
+        variance = self.kernel.diag(x) + np.einsum("ij,ij->j", K_bx, self.C[:m, :m] @ K_bx)
+        return mean, np.sqrt(np.maximum(variance, 0.0))
@@ -0,0 +1,162 @@
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+
+class SharedArrays:
+    """
+    Copia una volta sola gli array dati in blocchi di memoria condivisa.
+
+    spec descrive i blocchi (nome, forma, dtype) ed è l'unica cosa da passare ai processi worker,
+    che con attach_shared_arrays ottengono viste numpy sugli stessi dati senza copie né pickling.
+    Il processo principale è il proprietario dei blocchi: close() (o l'uscita dal with) li libera.
+    """
+    def __init__(self, **arrays):
+        self._blocks = {}
+        self.spec = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self._blocks[name] = block
+            self.spec[name] = (block.name, array.shape, array.dtype.str)
+
+    def close(self):
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self._blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def attach_shared_arrays(spec):
+    """
+    Viste numpy sui blocchi descritti da spec; restituisce anche i blocchi, da tenere in vita
+    finché le viste vengono usate
+    """
+    arrays, blocks = {}, []
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return arrays, blocks
+
+
+# Stato di ogni processo worker, impostato una volta sola dall'initializer del pool
+_worker_state = {}
+
+
+def _init_worker(spec, template):
+    arrays, blocks = attach_shared_arrays(spec)
+    _worker_state.update(arrays=arrays, blocks=blocks, template=template)
+
+
+def _unfitted_copy(model):
+    """
+    Copia del modello senza i dati di training e i fattori (n² per il GP esatto): ai worker servono
+    solo kernel e impostazioni, e il modello viene serializzato una volta per processo
+    """
+    template = copy.copy(model)
+    for name in ("x_train", "y_train", "L", "alpha", "operator", "preconditioner", "_W", "_grid_covariance"):
+        if getattr(template, name, None) is not None:
+            setattr(template, name, None)
+    return template
+
+
+def _default_workers(n_tasks, max_workers):
+    return max(1, min(n_tasks, max_workers if max_workers is not None else os.cpu_count() or 1))
+
+
+def _restart_task(theta0, max_iter):
+    x, y_centered = _worker_state["arrays"]["x"], _worker_state["arrays"]["y_centered"]
+    return _worker_state["template"].local_optimization(theta0, x, y_centered, max_iter)
+
+
+def parallel_optimize_hyperparameters(gp, x, y, n_restarts=8, max_iter=100, max_workers=None, seed=None):
+    """
+    Come GaussianProcessRegressor.optimize_hyperparameters, ma le ripartenze sono distribuite su un
+    pool di processi. x e y sono condivisi in memoria (non vengono serializzati a ogni task); ogni task
+    riceve solo il proprio theta iniziale. I punti di partenza dipendono solo dal seed e il migliore
+    è scelto con lo stesso criterio della versione seriale: il risultato non dipende da max_workers.
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    if len(x) == 0:
+        raise ValueError("Cannot fit a GP on an empty dataset")
+    if len(x) != len(y):
+        raise ValueError("x and y must have the same length")
+
+    y_centered = y - (np.mean(y) if gp.normalize_y else 0.0)
+    starts = gp.starting_points(n_restarts, warm_start=False, seed=seed)
+    max_workers = _default_workers(len(starts), max_workers)
+
+    with SharedArrays(x=x, y_centered=y_centered) as shared:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(shared.spec, _unfitted_copy(gp))) as executor:
+            results = list(executor.map(_restart_task, starts, [max_iter] * len(starts)))
+
+    gp.apply_best_result(results)
+    return gp.fit(x, y)
+
+
+def _fold_task(fold, optimize_hyperparameters):
+    arrays = _worker_state["arrays"]
+    x, y, fold_ids = arrays["x"], arrays["y"], arrays["fold_ids"]
+    train, test = fold_ids != fold, fold_ids == fold
+
+    model = copy.deepcopy(_worker_state["template"])
+    if optimize_hyperparameters:
+        model.optimize_hyperparameters(x[train], y[train], warm_start=True)
+    else:
+        model.fit(x[train], y[train])
+
+    mean, std = model.predict(x[test], return_std=True)
+    # Predittiva delle osservazioni: varianza latente + rumore
+    variance = std ** 2 + getattr(model, "noise_variance", 0.0)
+    residual = y[test] - mean
+    log_density = -0.5 * (np.log(2 * np.pi * variance) + residual ** 2 / variance)
+    return float(np.mean(log_density)), float(np.sqrt(np.mean(residual ** 2)))
+
+
+def parallel_cross_validation(gp, x, y, n_folds=5, optimize_hyperparameters=False, max_workers=None, seed=None):
+    """
+    Validazione incrociata k-fold con un fold per task su un pool di processi.
+
+    gp fa da modello di partenza (copiato in ogni fold, non viene modificato); con
+    optimize_hyperparameters=True ogni fold riottimizza gli iperparametri partendo da quelli di gp.
+    L'assegnazione dei punti ai fold dipende solo dal seed. Restituisce per ogni fold la log densità
+    predittiva media e l'RMSE sui punti esclusi, più le medie sui fold.
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    if len(x) != len(y):
+        raise ValueError("x and y must have the same length")
+    if not 2 <= n_folds <= len(x):
+        raise ValueError(f"n_folds must be between 2 and the number of points ({len(x)})")
+
+    fold_ids = np.random.default_rng(seed).permutation(len(x)) % n_folds
+    max_workers = _default_workers(n_folds, max_workers)
+
+    with SharedArrays(x=x, y=y, fold_ids=fold_ids) as shared:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(shared.spec, _unfitted_copy(gp))) as executor:
+            results = list(executor.map(_fold_task, range(n_folds), [optimize_hyperparameters] * n_folds))
+
+    log_densities = np.array([r[0] for r in results])
+    rmses = np.array([r[1] for r in results])
+    return {
+        "fold_log_predictive_density": log_densities,
+        "fold_rmse": rmses,
+        "mean_log_predictive_density": float(np.mean(log_densities)),
+        "mean_rmse": float(np.mean(rmses)),
+        "fold_ids": fold_ids,
+    }
@@ -1,6 +1,10 @@
 import matplotlib.pyplot as plt
-from matplotlib.widgets import Button
-from data_generator import DataGenerator
+from matplotlib.colors import LogNorm
+from matplotlib.widgets import Button, RectangleSelector
+from gp_session import GPSession
+from sparse_gp import SparseGaussianProcessRegressor
+from online_gp import OnlineGaussianProcessRegressor
+from density_grid import DensityGrid
 import numpy as np  
 
 class Interactive2DPlotter:
@@ -19,32 +23,66 @@ class Interactive2DPlotter:
                         "seed": 42,
                         "x_range": (0,1),
                         "y_range": (0,1)
-                        }):
+                        },
+                 session = None,
+                 show = True):
               
 
             self.plot_config = plot_config
-            self.data_config = data_config
-            # Salva una copia dei valori originali per il reset
-            self.original_data_config = data_config.copy()
-
-            # Inizializza il DataGenerator
-            self.data_generator = DataGenerator(config=self.data_config)
+            # Tutto lo stato (dati, famiglia, rumore, GP) vive nella sessione headless:
+            # il plotter è solo una vista che ne disegna lo stato e ne chiama le operazioni
+            self.session = session if session is not None else GPSession(data_config=data_config)
+            self.x_line = self.session.x_line
+
+            # Livello di dettaglio: oltre density_threshold punti lo scatter è sostituito da un'immagine
+            # di densità (istogramma 2-D con bin aggiornati in modo incrementale); i punti vicini al
+            # cursore e al punto selezionato restano disegnati singolarmente
+            self.density_threshold = 100000
+            self.density_grid = DensityGrid(self.plot_config["x_range"], self.plot_config["y_range"])
+            self.density_mode = False
+            self.density_synced = False
+            self.cursor_point = None
+            self.highlight_radius = 0.01 * (self.plot_config["x_range"][1] - self.plot_config["x_range"][0])
 
             # init finestra interattiva
             self.set_window()
             self.set_subplot()
             self.set_control_panel()
 
-            # Variabili per la selezione del punto
+            # Variabili per la selezione del punto (il marker è un artista persistente, vedi create_data_artists)
             self.selected_point = None
-            self.point_marker = None
+            # Sfondi salvati per il blitting (vedi on_draw)
+            self.setup_blitting()
             # Aggiungi event handler per il click sul subplot
             self.cid = self.ax.figure.canvas.mpl_connect('button_press_event', self.on_click)
+            self.motion_cid = self.ax.figure.canvas.mpl_connect('motion_notify_event', self.on_motion)
+            # Trascinando col tasto destro si seleziona un rettangolo: i punti al suo interno vengono rimossi
+            self.brush = RectangleSelector(self.ax, self.remove_brushed_points, button=[3],
+                                           useblit=True, interactive=False)
 
             # Genera i dati iniziali e plottali
             # self.generate_data(None)
 
-            plt.show()
+            # Con show=False (es. backend non interattivi o test) la finestra non blocca l'esecuzione
+            if show:
+                plt.show()
+
+        # Lo stato è della sessione: queste proprietà lo espongono ai metodi di disegno
+        @property
+        def data_generator(self):
+            return self.session.data_generator
+
+        @property
+        def data_config(self):
+            return self.session.data_config
+
+        @property
+        def gp(self):
+            return self.session.gp
+
+        @property
+        def gp_prediction(self):
+            return self.session.gp_prediction
 
         def set_window(self):
             # Crea la finestra con sfondo chiaro
@@ -78,7 +116,115 @@ class Interactive2DPlotter:
             for spine in self.ax.spines.values():
                 spine.set_edgecolor('#333333')
                 spine.set_linewidth(2)
-            
+
+            self.create_data_artists()
+
+        def create_data_artists(self):
+            """
+            Crea una volta sola gli artisti dei dati: a ogni evento se ne aggiornano solo i valori
+            (set_offsets/set_data/set_verts) e vengono ridisegnati con il blitting.
+            Sono animated, quindi esclusi dal ridisegno completo e dallo sfondo salvato.
+            """
+            self.density_image = self.ax.imshow(np.ma.masked_all((1, 1)), extent=self.density_grid.extent,
+                                                origin='lower', aspect='auto', cmap='Blues', norm=LogNorm(),
+                                                interpolation='nearest', animated=True, visible=False)
+            self.scatter = self.ax.scatter(np.zeros(0), np.zeros(0), color='blue', s=50, alpha=0.4,
+                                           edgecolors='darkblue', linewidth=1, animated=True)
+            # Punti disegnati singolarmente sopra l'immagine di densità
+            self.highlight_scatter = self.ax.scatter(np.zeros(0), np.zeros(0), color='blue', s=50, alpha=0.6,
+                                                     edgecolors='darkblue', linewidth=1, animated=True)
+            self.function_line, = self.ax.plot([], [], color="orange", linestyle='dashed', linewidth=2,
+                                               animated=True, visible=False)
+            self.gp_band = self.ax.fill_between(self.x_line, 0, 0, color='green', alpha=0.2, linewidth=0,
+                                                animated=True, visible=False)
+            self.gp_mean_line, = self.ax.plot([], [], color='darkgreen', linewidth=2, animated=True, visible=False)
+            # Posizioni dei punti induttori del GP sparso, disegnate sull'asse x
+            self.inducing_markers, = self.ax.plot([], [], '^', color='purple', markersize=8,
+                                                  transform=self.ax.get_xaxis_transform(), clip_on=False,
+                                                  animated=True, visible=False)
+            self.point_marker, = self.ax.plot([], [], 'ro', markersize=10, markeredgecolor='darkred',
+                                              markeredgewidth=2, alpha=0.7, animated=True, visible=False)
+            # Punti la cui rimozione cambierebbe di più il fit e punteggio LOO del GP
+            self.influence_markers, = self.ax.plot([], [], 'o', markersize=14, markerfacecolor='none',
+                                                   markeredgecolor='red', markeredgewidth=1.5,
+                                                   animated=True, visible=False)
+            self.gp_score_text = self.ax.text(0.02, 0.97, '', transform=self.ax.transAxes, ha='left', va='top',
+                                              fontsize=10, animated=True, visible=False,
+                                              bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+            self.data_artists = [self.density_image, self.scatter, self.function_line, self.gp_band,
+                                 self.gp_mean_line, self.inducing_markers, self.influence_markers,
+                                 self.gp_score_text]
+            # Artisti ridisegnati anche quando cambiano solo cursore o selezione
+            self.overlay_artists = [self.highlight_scatter, self.point_marker]
+
+        def setup_blitting(self):
+            """
+            Anche i testi del pannello che cambiano (contatori e punto selezionato) sono animated:
+            vengono ridisegnati ciascuno nella propria area senza un ridisegno completo della figura
+            """
+            self.text_artists = [self.counter_text, self.poly_counter_text, self.noise_counter_text,
+                                 self.selected_text]
+            for text in self.text_artists:
+                text.set_animated(True)
+            self.static_background = None
+            self.data_background = None
+            self.text_backgrounds = []
+            # Va collegato prima del RectangleSelector, che salva il proprio sfondo dopo il nostro disegno
+            self.draw_cid = self.fig.canvas.mpl_connect('draw_event', self.on_draw)
+
+        def data_region(self):
+            # Area del subplot con un margine per i marker degli induttori disegnati sul bordo
+            return self.ax.bbox.padded(self.fig.dpi / 72 * 8)
+
+        def on_draw(self, event):
+            """
+            Dopo ogni ridisegno completo (apertura, resize, ...) salva gli sfondi statici e vi disegna
+            sopra gli artisti animated
+            """
+            canvas = self.fig.canvas
+            self.static_background = canvas.copy_from_bbox(self.data_region())
+            self.text_backgrounds = [(text, canvas.copy_from_bbox(text.axes.bbox)) for text in self.text_artists]
+            self.draw_data_layer()
+            for text in self.text_artists:
+                text.axes.draw_artist(text)
+
+        def draw_data_layer(self):
+            """
+            Disegna gli artisti dei dati, salva il risultato (sfondo per i soli spostamenti del marker)
+            e disegna sopra il marker del punto selezionato
+            """
+            for artist in self.data_artists:
+                self.ax.draw_artist(artist)
+            self.data_background = self.fig.canvas.copy_from_bbox(self.data_region())
+            for artist in self.overlay_artists:
+                self.ax.draw_artist(artist)
+
+        def redraw(self, data_changed=True):
+            """
+            Ridisegno incrementale con blitting. Se i dati sono cambiati gli artisti dei dati vengono
+            ridisegnati sullo sfondo statico; altrimenti (es. un click) si ripristina lo strato dei dati
+            già disegnato e si ridisegna solo il marker. I testi del pannello si aggiornano nella loro area.
+            """
+            canvas = self.fig.canvas
+            if self.static_background is None or not canvas.supports_blit:
+                # Nessun ridisegno completo ancora avvenuto (o backend senza blitting)
+                canvas.draw_idle()
+                return
+
+            if data_changed or self.data_background is None:
+                canvas.restore_region(self.static_background)
+                self.draw_data_layer()
+            else:
+                canvas.restore_region(self.data_background)
+                for artist in self.overlay_artists:
+                    self.ax.draw_artist(artist)
+            canvas.blit(self.data_region())
+
+            for text, background in self.text_backgrounds:
+                canvas.restore_region(background)
+                text.axes.draw_artist(text)
+                canvas.blit(text.axes.bbox)
+
         def set_control_panel(self):
             self.control_panel_x = 0.81
             self.control_panel_width = 0.16
@@ -90,7 +236,7 @@ class Interactive2DPlotter:
             self.start_x = self.control_panel_x + (self.control_panel_width - total_width) / 2
             self.button_gen_width = self.control_panel_width 
             # Modificato: spostati fit_gp e pred_gp più in alto e aggiunto spazio per reset
-            self.contro_panel_ys = [0.62, 0.71, 0.53, 0.46, 0.11, 0.05, 0.40, 0.84, 0.88, 0.80]  
+            self.contro_panel_ys = [0.62, 0.71, 0.53, 0.46, 0.11, 0.05, 0.40, 0.84, 0.88, 0.80, 0.17]  
             self.add_datagenerator_controls()
 
 
@@ -111,6 +257,7 @@ class Interactive2DPlotter:
             self.add_generation_button()
             self.add_fit_gp_button()
             self.add_pred_gp_button()
+            self.add_gp_mode_button()
             self.add_reset_button()  # Aggiungi questa linea
 
         def add_point_selection_controls(self):
@@ -162,10 +309,6 @@ class Interactive2DPlotter:
                         ha='center', va='center', fontsize=11, weight='bold')
             ax_label2.axis('off')
             
-            # Lista delle famiglie di funzioni
-            self.function_families = ['Poly 0°', 'Poly 1°', 'Poly 2°', 'Step', 'Periodic']
-            self.current_family_index = self.data_config["polynomial_degree"]  # Inizia con l'indice corrispondente al grado
-            
             # Bottone decrease (-)
             self.ax_minus_poly = plt.axes([self.start_x +0.01, self.contro_panel_ys[1], self.button_width, 0.04])
             self.button_minus_poly = Button(self.ax_minus_poly, '◄', 
@@ -178,7 +321,7 @@ class Interactive2DPlotter:
                                             self.counter_width + 0.02, 0.04], facecolor='white')  # Aumentato la larghezza
             self.ax_poly_counter.axis('off')
             self.poly_counter_text = self.ax_poly_counter.text(0.5, 0.5, 
-                                                            self.function_families[self.current_family_index],
+                                                            self.session.function_family_label,
                                                             transform=self.ax_poly_counter.transAxes,
                                                             ha='center', va='center', 
                                                             fontsize=11, weight='bold')  # Font leggermente più piccolo
@@ -239,7 +382,7 @@ class Interactive2DPlotter:
                                         color='#eeff99', hovercolor="#fca7a3")
             self.button_fit_gp.label.set_fontsize(12)
             self.button_fit_gp.label.set_weight('bold')
-            # self.button_fit_gp.on_clicked(self.generate_data)
+            self.button_fit_gp.on_clicked(self.fit_gp)
 
         def add_pred_gp_button(self):
             self.ax_pred_gp = plt.axes([self.control_panel_x + 0.01, self.contro_panel_ys[5], self.button_gen_width, 0.05])
@@ -247,7 +390,15 @@ class Interactive2DPlotter:
                                         color='#eeff99', hovercolor='#fca7a3')
             self.button_pred_gp.label.set_fontsize(12)
             self.button_pred_gp.label.set_weight('bold')
-            # self.button_pred.on_clicked(self.generate_data)
+            self.button_pred_gp.on_clicked(self.predict_gp)
+
+        def add_gp_mode_button(self):
+            self.ax_gp_mode = plt.axes([self.control_panel_x + 0.01, self.contro_panel_ys[10], self.button_gen_width, 0.05])
+            self.button_gp_mode = Button(self.ax_gp_mode, f'GP mode: {self.session.gp_mode}', 
+                                        color='#e6e6ff', hovercolor='#b3b3ff')
+            self.button_gp_mode.label.set_fontsize(12)
+            self.button_gp_mode.label.set_weight('bold')
+            self.button_gp_mode.on_clicked(self.toggle_gp_mode)
 
         def add_reset_button(self):
             self.ax_reset = plt.axes([self.control_panel_x + 0.01, self.contro_panel_ys[6], self.button_gen_width, 0.05])
@@ -274,19 +425,15 @@ class Interactive2DPlotter:
                 self.ax_selected.spines[spine].set_linewidth(1)
 
         def on_click(self, event):
+            # Il tasto destro è riservato alla selezione rettangolare
+            if event.button == 3:
+                return
+
             # Se il click è dentro il subplot principale
             if event.inaxes == self.ax:
-                # Salva le coordinate del punto selezionato
+                # Salva le coordinate del punto selezionato e sposta il marker
                 self.selected_point = (event.xdata, event.ydata)
-                
-                # Rimuovi il marker precedente se esiste
-                if self.point_marker is not None:
-                    self.point_marker.remove()
-                
-                # Aggiungi un nuovo marker per il punto selezionato
-                self.point_marker, = self.ax.plot(event.xdata, event.ydata, 'ro', 
-                                                 markersize=10, markeredgecolor='darkred', 
-                                                 markeredgewidth=2, alpha=0.7)
+                self.update_overlay()
                 
                 # Aggiorna il testo con le coordinate del punto
                 self.selected_text.set_text(f'Selected point: ({event.xdata:.3f}, {event.ydata:.3f})')
@@ -295,62 +442,136 @@ class Interactive2DPlotter:
             
             elif event.inaxes not in [self.ax_minus_data, self.ax_plus_data, self.ax_minus_poly, 
                                 self.ax_plus_poly, self.ax_minus_noise, self.ax_plus_noise,
-                                self.ax_generate, self.ax_fit_gp, self.ax_pred_gp, self.ax_reset,
+                                self.ax_generate, self.ax_fit_gp, self.ax_pred_gp, self.ax_gp_mode, self.ax_reset,
                                 self.ax_counter, self.ax_poly_counter, self.ax_noise_counter,
                                 self.ax_selected, self.ax_remove_point, self.ax_add_point]:
-                # Deseleziona il punto
+                # Deseleziona il punto e nascondi il marker
                 self.selected_point = None
-                
-                # Rimuovi il marker se esiste
-                if self.point_marker is not None:
-                    self.point_marker.remove()
-                    self.point_marker = None
+                self.update_overlay()
                 
                 # Ripristina il testo di default
                 self.selected_text.set_text('No point selected')
                 self.selected_text.set_style('italic')
                 self.selected_text.set_weight('normal')
             
-            # Ridisegna il canvas
-            plt.draw()
+            # Ridisegna solo il marker e il testo: i dati non sono cambiati
+            self.redraw(data_changed=False)
 
         def plot_data(self):
-            # Pulisci il subplot dai dati precedenti (mantieni griglia e labels)
-            self.ax.clear()
-            self.ax.set_xlim(self.plot_config["x_range"][0], self.plot_config["x_range"][1])
-            self.ax.set_ylim(self.plot_config["y_range"][0], self.plot_config["y_range"][1])
-            self.ax.set_xlabel(self.plot_config["x_label"], fontsize=12)
-            self.ax.set_ylabel(self.plot_config["y_label"], fontsize=12)
-            self.ax.grid(True, alpha=0.3, linestyle='--')
-            
-            # Plotta i nuovi punti se esistono
-            if hasattr(self.data_generator, 'x_data') and self.data_generator.x_data is not None and len(self.data_generator.x_data) > 0:
-                self.ax.scatter(self.data_generator.x_data, self.data_generator.y_data, 
-                            color='blue', s=50, alpha=0.4, edgecolors='darkblue', linewidth=1)
-            
-            # Plotta la funzione continua sottostante (se i parametri esistono)
-            x_line = np.linspace(self.plot_config["x_range"][0], self.plot_config["x_range"][1], 200)
-            
-            if self.data_generator.config["polynomial_degree"] == 0 and self.data_generator.k is not None:
-                y_line = np.ones(len(x_line)) * self.data_generator.k
-                self.ax.plot(x_line, y_line, color="orange", linestyle='dashed', linewidth=2)
-                
-            elif self.data_generator.config["polynomial_degree"] == 1 and self.data_generator.m is not None and self.data_generator.q is not None:
-                y_line = self.data_generator.m * x_line + self.data_generator.q
-                self.ax.plot(x_line, y_line, color="orange", linestyle='dashed', linewidth=2)
-                
-            elif self.data_generator.config["polynomial_degree"] == 2 and hasattr(self.data_generator, 'a') and hasattr(self.data_generator, 'b') and hasattr(self.data_generator, 'c'):
-                y_line = self.data_generator.a * x_line**2 + self.data_generator.b * x_line + self.data_generator.c
-                self.ax.plot(x_line, y_line, color="orange", linestyle='dashed', linewidth=2)
-            
-            # Ridisegna il marker del punto selezionato se esiste
+            """
+            Aggiorna i valori degli artisti persistenti e ridisegna col blitting (niente ax.clear())
+            """
+            self.update_data_artists()
+            self.redraw()
+
+        def update_data_artists(self):
+            # Punti del dataset: scatter o, sopra la soglia, immagine di densità
+            x_data, y_data = self.data_generator.x_data, self.data_generator.y_data
+            self.density_mode = len(x_data) > self.density_threshold
+            if self.density_mode:
+                if not self.density_synced:
+                    self.density_grid.build(x_data, y_data)
+                    self.density_synced = True
+                self.density_image.set_data(self.density_grid.image())
+                self.density_image.set_clim(1, max(int(self.density_grid.counts.max()), 2))
+            else:
+                # I bin non vengono mantenuti sotto la soglia
+                self.density_synced = False
+                self.scatter.set_offsets(np.column_stack([x_data, y_data]))
+            self.density_image.set_visible(self.density_mode)
+            self.scatter.set_visible(not self.density_mode)
+            
+            # Funzione continua sottostante (se i parametri esistono)
+            x_line = self.x_line
+            y_line = self.data_generator.evaluate_function(x_line)
+            if y_line is not None:
+                self.function_line.set_data(x_line, y_line)
+            self.function_line.set_visible(y_line is not None)
+
+            # Media predittiva del GP e banda di confidenza al 95%
+            if self.gp_prediction is not None:
+                gp_mean, gp_std = self.gp_prediction
+                lower = np.column_stack([x_line, gp_mean - 1.96 * gp_std])
+                upper = np.column_stack([x_line, gp_mean + 1.96 * gp_std])
+                self.gp_band.set_verts([np.concatenate([lower, upper[::-1]])])
+                self.gp_mean_line.set_data(x_line, gp_mean)
+            self.gp_band.set_visible(self.gp_prediction is not None)
+            self.gp_mean_line.set_visible(self.gp_prediction is not None)
+
+            # Punti induttori del GP sparso e punti base del GP online
+            show_inducing = (isinstance(self.gp, (SparseGaussianProcessRegressor, OnlineGaussianProcessRegressor))
+                             and self.gp.is_fitted)
+            if show_inducing:
+                inducing = self.gp.inducing_points
+                self.inducing_markers.set_data(inducing, np.zeros(len(inducing)))
+            self.inducing_markers.set_visible(show_inducing)
+
+            # Bontà del fit (leave-one-out in forma chiusa) e punti più influenti
+            diagnostics = self.session.gp_diagnostics()
+            if diagnostics is not None:
+                positions = diagnostics["most_influential"]
+                self.influence_markers.set_data(x_data[positions], y_data[positions])
+                self.gp_score_text.set_text(f"LOO log pred. density: {diagnostics['loo_mean_log_predictive_density']:.3f}"
+                                            f"   LOO RMSE: {diagnostics['loo_rmse']:.3f}")
+            self.influence_markers.set_visible(diagnostics is not None)
+            self.gp_score_text.set_visible(diagnostics is not None)
+
+            self.update_overlay()
+
+        def update_overlay(self):
+            """
+            Aggiorna il marker del punto selezionato e, in modalità densità, i punti vicini
+            al cursore e alla selezione (ricerca nell'indice spaziale, O(log n) + vicini)
+            """
             if self.selected_point is not None:
-                self.point_marker, = self.ax.plot(self.selected_point[0], self.selected_point[1], 'ro', 
-                                                markersize=10, markeredgecolor='darkred', 
-                                                markeredgewidth=2, alpha=0.7)
-            
-            # Ridisegna il canvas
-            plt.draw()
+                self.point_marker.set_data([self.selected_point[0]], [self.selected_point[1]])
+            self.point_marker.set_visible(self.selected_point is not None)
+
+            near_ids = []
+            if self.density_mode:
+                for center in (self.selected_point, self.cursor_point):
+                    if center is not None:
+                        ids, _ = self.data_generator.spatial_index.query_radius(
+                            center[0], center[1], self.highlight_radius, self.data_generator.y_of)
+                        near_ids.append(ids)
+            if near_ids and sum(len(ids) for ids in near_ids) > 0:
+                positions = self.data_generator.positions_of(np.unique(np.concatenate(near_ids)))
+                self.highlight_scatter.set_offsets(np.column_stack([self.data_generator.x_data[positions],
+                                                                    self.data_generator.y_data[positions]]))
+                self.highlight_scatter.set_visible(True)
+            else:
+                self.highlight_scatter.set_visible(False)
+
+        def on_motion(self, event):
+            """
+            In modalità densità ridisegna singolarmente i punti vicini al cursore
+            """
+            if not self.density_mode:
+                return
+            cursor_point = (event.xdata, event.ydata) if event.inaxes == self.ax else None
+            if cursor_point is None and self.cursor_point is None:
+                return
+            self.cursor_point = cursor_point
+            self.update_overlay()
+            self.redraw(data_changed=False)
+
+        def invalidate_density(self):
+            # Il dataset è stato sostituito: i bin verranno ricalcolati al prossimo disegno
+            self.density_synced = False
+
+        def update_density_after_add(self):
+            """
+            Aggiunge ai bin l'ultimo punto del dataset (O(1))
+            """
+            if self.density_synced:
+                self.density_grid.add(self.data_generator.x_data[-1], self.data_generator.y_data[-1])
+
+        def update_density_after_remove(self):
+            """
+            Toglie dai bin i punti dell'ultima rimozione
+            """
+            if self.density_synced and self.data_generator.last_removed_points is not None:
+                self.density_grid.remove(*self.data_generator.last_removed_points)
 
         def add_remove_point_button(self):
             self.ax_remove_point = plt.axes([self.control_panel_x + 0.01, self.contro_panel_ys[8], self.button_gen_width, 0.04])
@@ -370,9 +591,37 @@ class Interactive2DPlotter:
 
         def generate_data(self, event):
             """Wrapper per gestire l'evento del bottone"""
-            self.data_generator.generate_datapoints()
+            self.session.generate_data()
+            self.invalidate_density()
             self.plot_data()
 
+        def fit_gp(self, event):
+            """
+            Addestra il GP sui dati correnti (una sola fattorizzazione di Cholesky)
+            """
+            if self.session.fit_gp():
+                self.plot_data()
+
+        def toggle_gp_mode(self, event):
+            """
+            Alterna tra GP esatto e GP sparso; se un GP era addestrato viene riaddestrato nella nuova modalità
+            """
+            gp_mode = self.session.toggle_gp_mode()
+            self.button_gp_mode.label.set_text(f'GP mode: {gp_mode}')
+            self.plot_data()
+            # L'etichetta del bottone non fa parte degli artisti aggiornati col blitting
+            self.fig.canvas.draw_idle()
+
+        def predict_gp(self, event):
+            """
+            Calcola media e incertezza del GP sulla griglia x_line e le disegna
+            """
+            if self.session.predict_gp() is not None:
+                self.plot_data()
+
+        def update_counter(self):
+            self.counter_text.set_text(str(self.session.data_size))
+
         def add_selected_point(self, event):
             """
             Aggiunge il punto selezionato al dataset
@@ -381,20 +630,12 @@ class Interactive2DPlotter:
                 print("Nessun punto selezionato da aggiungere")
                 return
             
-            # Aggiunge il punto usando il metodo del data_generator
-            success = self.data_generator.add_selected_point(
-                self.selected_point[0], 
-                self.selected_point[1]
-            )
-            
-            if success:
-                # Aggiorna il counter
-                self.data_config["data_size"] = len(self.data_generator.x_data)
-                self.counter_text.set_text(str(self.data_config["data_size"]))
+            if self.session.add_point(self.selected_point[0], self.selected_point[1]):
+                self.update_counter()
                 
                 # Ridisegna il plot
+                self.update_density_after_add()
                 self.plot_data()
-            
 
         def remove_selected_point(self, event):
             """
@@ -404,22 +645,11 @@ class Interactive2DPlotter:
                 print("Nessun punto selezionato da rimuovere")
                 return
             
-            # Prova a rimuovere il punto selezionato
-            success = self.data_generator.remove_selected_point(
-                self.selected_point[0], 
-                self.selected_point[1]
-            )
-            
-            if success:
-                # Aggiorna il counter
-                self.data_config["data_size"] = len(self.data_generator.x_data)
-                self.counter_text.set_text(str(self.data_config["data_size"]))
+            if self.session.remove_point_near(self.selected_point[0], self.selected_point[1]):
+                self.update_counter()
                 
-                # Deseleziona il punto
+                # Deseleziona il punto (il marker viene nascosto da plot_data)
                 self.selected_point = None
-                if self.point_marker is not None:
-                    self.point_marker.remove()
-                    self.point_marker = None
                 
                 # Ripristina il testo di default
                 self.selected_text.set_text('No point selected')
@@ -427,158 +657,101 @@ class Interactive2DPlotter:
                 self.selected_text.set_weight('normal')
                 
                 # Ridisegna il plot
+                self.update_density_after_remove()
                 self.plot_data()
 
+        def remove_brushed_points(self, press_event, release_event):
+            """
+            Rimuove tutti i punti nel rettangolo selezionato col tasto destro
+            """
+            if press_event.xdata is None or release_event.xdata is None:
+                return
+            removed = self.session.remove_points_in_rectangle(
+                press_event.xdata, release_event.xdata,
+                press_event.ydata, release_event.ydata
+            )
+            if len(removed) == 0:
+                return
+
+            self.update_counter()
+            self.update_density_after_remove()
+            self.plot_data()
+
         def decrease_datapoints(self, event):
             """
             Rimuove un punto dal dataset e aggiorna l'interfaccia
             """
-            success = self.data_generator.remove_datapoint()
-            
-            if success:
-                # Aggiorna il counter
-                if hasattr(self.data_generator, 'x_data') and self.data_generator.x_data is not None:
-                    self.data_config["data_size"] = len(self.data_generator.x_data)
-                else:
-                    self.data_config["data_size"] = 0
-                
-                self.counter_text.set_text(str(self.data_config["data_size"]))
-                
-                # Ridisegna il plot
+            if self.session.remove_first_point():
+                self.update_counter()
+                self.update_density_after_remove()
                 self.plot_data()
 
         def increase_datapoints(self, event):
             """
             Aggiunge un nuovo punto casuale al dataset e aggiorna l'interfaccia
             """
-            success = self.data_generator.add_datapoint()
-            
-            if success:
-                # Aggiorna il counter
-                self.data_config["data_size"] = len(self.data_generator.x_data)
-                self.counter_text.set_text(str(self.data_config["data_size"]))
-                
-                # Ridisegna il plot
+            if self.session.add_random_point():
+                self.update_counter()
+                self.update_density_after_add()
+                self.plot_data()
+
+        def set_function_family(self, index):
+            """
+            Seleziona la famiglia di funzioni di indice index e rigenera i dati
+            """
+            if self.session.set_function_family(index):
+                self.poly_counter_text.set_text(self.session.function_family_label)
+                self.invalidate_density()
                 self.plot_data()
 
         def increase_poly_degree(self, event):
             """
             Cambia alla prossima famiglia di funzioni
             """
-            if self.current_family_index < len(self.function_families) - 1:
-                self.current_family_index += 1
-                self.poly_counter_text.set_text(self.function_families[self.current_family_index])
-                
-                # Se siamo ancora nei polinomi (indici 0, 1, 2), aggiorna il grado
-                if self.current_family_index <= 2:
-                    self.data_generator.config["polynomial_degree"] = self.current_family_index
-                    self.data_config["polynomial_degree"] = self.current_family_index
-                    
-                    # Rigenera i dati con il nuovo grado
-                    self.data_generator.generate_datapoints()
-                    self.plot_data()
-                else:
-                    # Per step e periodic, per ora non fare nulla
-                    print(f"Funzione {self.function_families[self.current_family_index]} non ancora implementata")
-                
-                plt.draw()
+            self.set_function_family(self.session.current_family_index + 1)
 
         def decrease_poly_degree(self, event):
             """
             Cambia alla precedente famiglia di funzioni
             """
-            if self.current_family_index > 0:
-                self.current_family_index -= 1
-                self.poly_counter_text.set_text(self.function_families[self.current_family_index])
-                
-                # Se siamo ancora nei polinomi (indici 0, 1, 2), aggiorna il grado
-                if self.current_family_index <= 2:
-                    self.data_generator.config["polynomial_degree"] = self.current_family_index
-                    self.data_config["polynomial_degree"] = self.current_family_index
-                    
-                    # Rigenera i dati con il nuovo grado
-                    self.data_generator.generate_datapoints()
-                    self.plot_data()
-                else:
-                    # Per step e periodic, per ora non fare nulla
-                    print(f"Funzione {self.function_families[self.current_family_index]} non ancora implementata")
-                
-                plt.draw()
+            self.set_function_family(self.session.current_family_index - 1)
 
+        def noise_changed(self):
+            """
+            Il generatore ha già aggiornato i dati in place: restano da aggiornare contatore e grafico
+            """
+            self.noise_counter_text.set_text(f"{self.session.noise_level:.3f}")
+            self.invalidate_density()
+            self.plot_data()
 
         def increase_noise(self, event):
             """
             Aumenta il livello di rumore e aggiorna solo il rumore nei dati esistenti
             """
-            old_noise_level = self.data_generator.config["noise_level"]
-            success = self.data_generator.increase_noise_level()
-            
-            if success:
-                # Aggiorna il counter nel data_config
-                self.data_config["noise_level"] = self.data_generator.config["noise_level"]
-                self.noise_counter_text.set_text(f"{self.data_config['noise_level']:.3f}")
-                
-                # Se ci sono dati, aggiorna solo il rumore
-                if hasattr(self.data_generator, 'x_data') and len(self.data_generator.x_data) > 0:
-                    # Rigenera il rumore con il nuovo livello
-                    new_noises = np.random.normal(0.0, self.data_generator.config["noise_level"], len(self.data_generator.x_data))
-                    self.data_generator.noises = new_noises
-                    
-                    # Ricalcola y_data con il nuovo rumore
-                    self.data_generator.y_data = self.data_generator.y_data_clean + self.data_generator.noises
-                    self.data_generator.y_data = np.clip(self.data_generator.y_data, 
-                                                        self.data_generator.config["y_range"][0], 
-                                                        self.data_generator.config["y_range"][1])
-                
-                self.plot_data()
+            if self.session.increase_noise():
+                self.noise_changed()
 
         def decrease_noise(self, event):
             """
             Diminuisce il livello di rumore e aggiorna solo il rumore nei dati esistenti
             """
-            old_noise_level = self.data_generator.config["noise_level"]
-            success = self.data_generator.decrease_noise_level()
-            
-            if success:
-                # Aggiorna il counter nel data_config
-                self.data_config["noise_level"] = self.data_generator.config["noise_level"]
-                self.noise_counter_text.set_text(f"{self.data_config['noise_level']:.3f}")
-                
-                # Se ci sono dati, aggiorna solo il rumore
-                if hasattr(self.data_generator, 'x_data') and len(self.data_generator.x_data) > 0:
-                    # Rigenera il rumore con il nuovo livello
-                    new_noises = np.random.normal(0.0, self.data_generator.config["noise_level"], len(self.data_generator.x_data))
-                    self.data_generator.noises = new_noises
-                    
-                    # Ricalcola y_data con il nuovo rumore
-                    self.data_generator.y_data = self.data_generator.y_data_clean + self.data_generator.noises
-                    self.data_generator.y_data = np.clip(self.data_generator.y_data, 
-                                                        self.data_generator.config["y_range"][0], 
-                                                        self.data_generator.config["y_range"][1])
-                
-                self.plot_data()
+            if self.session.decrease_noise():
+                self.noise_changed()
 
         def reset_all(self, event):
             """
             Resetta completamente il DataGenerator e il grafico ai valori originali
             """
-            # Ripristina i valori originali di data_config
-            self.data_config = self.original_data_config.copy()
-            
-            # Resetta il DataGenerator con la configurazione originale
-            self.data_generator = DataGenerator(config=self.data_config)
+            self.session.reset()
+            original_data_config = self.session.original_data_config
             
             # Resetta i contatori nell'interfaccia con i valori originali
-            self.counter_text.set_text(str(self.original_data_config["data_size"]))
-            self.noise_counter_text.set_text(f"{self.original_data_config['noise_level']:.3f}")
-            self.current_family_index = self.original_data_config["polynomial_degree"]
-            self.poly_counter_text.set_text(self.function_families[self.current_family_index])
+            self.counter_text.set_text(str(original_data_config["data_size"]))
+            self.noise_counter_text.set_text(f"{original_data_config['noise_level']:.3f}")
+            self.poly_counter_text.set_text(self.session.function_family_label)
             
-            # Deseleziona qualsiasi punto selezionato
+            # Deseleziona qualsiasi punto selezionato (il marker viene nascosto da plot_data)
             self.selected_point = None
-            if self.point_marker is not None:
-                self.point_marker.remove()
-                self.point_marker = None
             
             # Ripristina il testo di default per il punto selezionato
             self.selected_text.set_text('No point selected')
@@ -586,18 +759,13 @@ class Interactive2DPlotter:
             self.selected_text.set_weight('normal')
             
             # Pulisci e ridisegna il plot
+            self.invalidate_density()
             self.plot_data()
             
             print(f"Reset completato - Ripristinati valori originali:")
-            print(f"  Data size: {self.original_data_config['data_size']}")
-            print(f"  Polynomial degree: {self.original_data_config['polynomial_degree']}")
-            print(f"  Noise level: {self.original_data_config['noise_level']:.3f}")
-
-            
-
-
-
-
+            print(f"  Data size: {original_data_config['data_size']}")
+            print(f"  Polynomial degree: {original_data_config['polynomial_degree']}")
+            print(f"  Noise level: {original_data_config['noise_level']:.3f}")
 
 
 
@@ -605,10 +773,12 @@ class Interactive2DPlotter:
 
 
 
+if __name__ == "__main__":
+    import logging
 
+    # Nell'applicazione interattiva i messaggi del generatore vanno in console come prima
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
 
-if __name__ == "__main__":
-    
     plot_config = {
         "title": "Gaussian Process Regression in 2D: prediction and uncertainty", 
         "x_label": "X-axis", 
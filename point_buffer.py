@@ -0,0 +1,230 @@
+import numpy as np
+
+
+
+class PointBuffer:
+    """
+    Archivio struct-of-arrays dei punti con capacità preallocata.
+
+    Ogni campo (es. x_data, y_data, ...) è una colonna numpy con la stessa capacità:
+    append è O(1) ammortizzato (la capacità raddoppia quando serve), rimuovere il primo
+    o l'ultimo punto è O(1) (si spostano solo gli estremi della finestra valida) e
+    swap_remove è O(1) per qualsiasi indice. view() restituisce viste senza copia.
+    Le viste restano valide finché il buffer non viene riallocato: vanno rilette dopo ogni modifica.
+
+    fields è una sequenza di nomi o di coppie (nome, dtype); dtype è il tipo di default.
+    """
+    def __init__(self, fields, capacity=16, dtype=float):
+        self.dtype = np.dtype(dtype)
+        self.dtypes = {}
+        for field in fields:
+            name, field_dtype = field if isinstance(field, tuple) else (field, self.dtype)
+            self.dtypes[name] = np.dtype(field_dtype)
+        self.fields = tuple(self.dtypes)
+        self._start = 0
+        self._size = 0
+        self._columns = {name: np.empty(max(capacity, 1), dtype=self.dtypes[name]) for name in self.fields}
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self):
+        return len(self._columns[self.fields[0]])
+
+    def view(self, name):
+        """
+        Vista (senza copia) dei valori validi del campo name
+        """
+        return self._columns[name][self._start:self._start + self._size]
+
+    def _reserve(self, extra):
+        """
+        Garantisce spazio per extra punti in coda: prima compatta lo spazio liberato in testa,
+        poi, se non basta, raddoppia la capacità
+        """
+        needed = self._size + extra
+        if self._start + needed <= self.capacity:
+            return
+
+        if needed <= self.capacity and self._start >= self.capacity // 2:
+            # Metà del buffer è libera in testa: basta riportare i dati all'inizio
+            for name in self.fields:
+                column = self._columns[name]
+                column[:self._size] = column[self._start:self._start + self._size]
+        else:
+            new_capacity = self.capacity
+            while new_capacity < needed:
+                new_capacity *= 2
+            for name in self.fields:
+                column = np.empty(new_capacity, dtype=self.dtypes[name])
+                column[:self._size] = self.view(name)
+                self._columns[name] = column
+        self._start = 0
+
+    def append(self, **values):
+        """
+        Aggiunge un punto; i campi non specificati valgono 0
+        """
+        self._reserve(1)
+        position = self._start + self._size
+        for name in self.fields:
+            self._columns[name][position] = values.get(name, 0.0)
+        self._size += 1
+
+    def insert(self, index, **values):
+        """
+        Inserisce un punto in posizione index spostando in place la coda (nessuna riallocazione
+        se la capacità basta); usato per mantenere array ordinati
+        """
+        if index < 0:
+            index += self._size
+        if not 0 <= index <= self._size:
+            raise IndexError(f"Insert position {index} out of range for {self._size} points")
+
+        self._reserve(1)
+        begin = self._start + index
+        end = self._start + self._size
+        for name in self.fields:
+            column = self._columns[name]
+            column[begin + 1:end + 1] = column[begin:end]
+            column[begin] = values.get(name, 0)
+        self._size += 1
+
+    def extend(self, **arrays):
+        """
+        Aggiunge più punti in blocco; tutti gli array devono avere la stessa lunghezza
+        """
+        lengths = {len(np.atleast_1d(a)) for a in arrays.values()}
+        if len(lengths) != 1:
+            raise ValueError("All fields must have the same number of points")
+        count = lengths.pop()
+        self._reserve(count)
+        position = self._start + self._size
+        for name in self.fields:
+            self._columns[name][position:position + count] = arrays.get(name, 0.0)
+        self._size += count
+
+    def reset(self, **arrays):
+        """
+        Sostituisce tutto il contenuto con i nuovi array (la capacità viene riusata se basta)
+        """
+        self._start = 0
+        self._size = 0
+        if arrays:
+            self.extend(**arrays)
+
+    def adopt(self, **columns):
+        """
+        Usa direttamente gli array dati come colonne, senza copiarli (es. memmap copy-on-write di
+        dataset_io): la capacità coincide con la lunghezza, quindi il primo inserimento rialloca
+        le colonne in memoria. I campi mancanti o con dtype diverso vengono creati o convertiti.
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) != 1:
+            raise ValueError("All fields must have the same number of points")
+        size = lengths.pop()
+        for name in self.fields:
+            values = columns.get(name)
+            if values is None:
+                values = np.zeros(max(size, 1), dtype=self.dtypes[name])
+            elif size == 0:
+                # Capacità minima 1, come nel costruttore
+                values = np.empty(1, dtype=self.dtypes[name])
+            elif values.dtype != self.dtypes[name]:
+                values = values.astype(self.dtypes[name])
+            self._columns[name] = values
+        self._start = 0
+        self._size = size
+
+    def assign(self, name, values):
+        """
+        Sovrascrive in place i valori del campo name (stessa lunghezza del buffer)
+        """
+        values = np.asarray(values)
+        if values.ndim != 0 and len(values) != self._size:
+            raise ValueError(f"Cannot assign {len(values)} values to field '{name}' of {self._size} points")
+        self.view(name)[:] = values
+
+    def remove(self, index):
+        """
+        Rimuove il punto index mantenendo l'ordine: O(1) per il primo e l'ultimo punto,
+        altrimenti uno spostamento in place della coda (nessuna riallocazione)
+        """
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError(f"Point index {index} out of range for {self._size} points")
+
+        if index == 0:
+            self._start += 1
+        elif index < self._size - 1:
+            begin = self._start + index
+            end = self._start + self._size
+            for name in self.fields:
+                column = self._columns[name]
+                column[begin:end - 1] = column[begin + 1:end]
+        self._size -= 1
+        if self._size == 0:
+            self._start = 0
+
+    def swap_remove(self, index):
+        """
+        Rimuove il punto index in O(1) spostando l'ultimo punto al suo posto (l'ordine cambia)
+        """
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError(f"Point index {index} out of range for {self._size} points")
+
+        last = self._start + self._size - 1
+        for name in self.fields:
+            column = self._columns[name]
+            column[self._start + index] = column[last]
+        self._size -= 1
+
+    def remove_mask(self, mask):
+        """
+        Rimuove in un solo passaggio tutti i punti con mask True, mantenendo l'ordine
+        """
+        keep = ~np.asarray(mask, dtype=bool)
+        count = int(np.count_nonzero(keep))
+        for name in self.fields:
+            self.view(name)[:count] = self.view(name)[keep]
+        self._size = count
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+
+
+class BufferField:
+    """
+    Descrittore che espone un campo del PointBuffer (attributo points del proprietario)
+    come attributo numpy: la lettura restituisce una vista, l'assegnazione scrive in place.
+
+    before_access e on_assign sono nomi opzionali di metodi del proprietario: il primo è chiamato
+    prima di ogni lettura o assegnazione (es. per calcolare la colonna solo quando serve), il secondo
+    dopo ogni assegnazione (es. per invalidare statistiche che dipendono dal campo). Le scritture
+    in place su una vista (obj.field[i] = ...) non passano dal descrittore.
+    """
+    def __init__(self, before_access=None, on_assign=None):
+        self.before_access = before_access
+        self.on_assign = on_assign
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        if self.before_access is not None:
+            getattr(obj, self.before_access)()
+        return obj.points.view(self.name)
+
+    def __set__(self, obj, values):
+        if self.before_access is not None:
+            getattr(obj, self.before_access)()
+        obj.points.assign(self.name, values)
+        if self.on_assign is not None:
+            getattr(obj, self.on_assign)()
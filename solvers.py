@@ -0,0 +1,239 @@
+import numpy as np
+from scipy.linalg import cholesky, eigh_tridiagonal
+
+
+
+def cholesky_update(L, v, downdate=False):
+    """
+    Aggiornamento (o downdate) di rango uno in-place del fattore triangolare inferiore L:
+    restituisce L' tale che L' L'^T = L L^T ± v v^T, in O(n²)
+    """
+    v = np.array(v, dtype=float)
+    sign = -1.0 if downdate else 1.0
+    n = len(v)
+    for k in range(n):
+        r_sq = L[k, k] ** 2 + sign * v[k] ** 2
+        if r_sq <= 0:
+            raise np.linalg.LinAlgError("Cholesky downdate would make the matrix non positive definite")
+        r = np.sqrt(r_sq)
+        c = r / L[k, k]
+        s = v[k] / L[k, k]
+        L[k, k] = r
+        if k + 1 < n:
+            L[k + 1:, k] = (L[k + 1:, k] + sign * s * v[k + 1:]) / c
+            v[k + 1:] = c * v[k + 1:] - s * L[k + 1:, k]
+    return L
+
+
+def jittered_cholesky(A, initial_jitter=1e-10, max_tries=8):
+    """
+    Fattore di Cholesky inferiore di A, sempre calcolato e accumulato in float64.
+
+    Se A non risulta definita positiva (errori di arrotondamento con kernel valutati in float32,
+    punti quasi coincidenti, rumore molto piccolo) si ritenta aggiungendo alla diagonale
+    jitter * mean(diag(A)), con jitter che parte da initial_jitter e cresce di 10 volte a ogni
+    tentativo. Restituisce L e il jitter assoluto aggiunto alla diagonale (0.0 se non è servito).
+    Se A è già float64 la sua diagonale può essere modificata in place.
+    """
+    A = np.asarray(A, dtype=float)
+    diagonal = np.diag_indices_from(A)
+    scale = np.mean(A[diagonal]) if len(A) > 0 else 1.0
+    added = 0.0
+    for attempt in range(max_tries + 1):
+        try:
+            return cholesky(A, lower=True, check_finite=False), added
+        except np.linalg.LinAlgError:
+            if attempt == max_tries:
+                raise
+            jitter = initial_jitter * 10.0 ** attempt * scale
+            A[diagonal] += jitter - added
+            added = jitter
+
+
+def conjugate_gradient(matvec, b, tol=1e-6, max_iter=1000, preconditioner=None, x0=None):
+    """
+    Gradiente coniugato (opzionalmente precondizionato) per sistemi simmetrici definiti positivi.
+
+    matvec(v) deve restituire A v; b può essere un vettore (n,) o una matrice (n, k):
+    in quel caso le k colonne vengono risolte insieme, ciascuna con i propri passi.
+    preconditioner(r), se presente, restituisce M^-1 r.
+    Restituisce la soluzione e un dizionario con iterazioni, residuo relativo e convergenza.
+    """
+    b = np.asarray(b, dtype=float)
+    x = np.zeros_like(b) if x0 is None else np.array(x0, dtype=float)
+    r = b - matvec(x) if x0 is not None else b.copy()
+    z = preconditioner(r) if preconditioner is not None else r
+    p = z.copy()
+
+    b_norm = np.linalg.norm(b, axis=0)
+    b_norm = np.where(b_norm > 0, b_norm, 1.0)
+    rz = np.sum(r * z, axis=0)
+
+    iterations = 0
+    residual = np.linalg.norm(r, axis=0) / b_norm
+    while iterations < max_iter and np.any(residual > tol):
+        Ap = matvec(p)
+        pAp = np.sum(p * Ap, axis=0)
+        # Le colonne già convergenti non vengono più aggiornate
+        active = residual > tol
+        step = np.where(active, rz / np.where(pAp != 0, pAp, 1.0), 0.0)
+
+        x += step * p
+        r -= step * Ap
+        z = preconditioner(r) if preconditioner is not None else r
+        rz_new = np.sum(r * z, axis=0)
+        beta = np.where(active, rz_new / np.where(rz != 0, rz, 1.0), 0.0)
+        p = z + beta * p
+        rz = rz_new
+
+        iterations += 1
+        residual = np.linalg.norm(r, axis=0) / b_norm
+
+    info = {
+        "iterations": iterations,
+        "residual": float(np.max(residual)),
+        "converged": bool(np.all(residual <= tol)),
+    }
+    return x, info
+
+
+class ToeplitzOperator:
+    """
+    Matrice di Toeplitz simmetrica m x m definita dalla sua prima colonna.
+    Il prodotto matrice-vettore usa l'embedding circolante e la FFT: O(m log m).
+    """
+    def __init__(self, first_column):
+        self.first_column = np.asarray(first_column, dtype=float)
+        self.size = len(self.first_column)
+
+        # Embedding circolante di dimensione 2m - 2 (almeno 1)
+        circulant = np.concatenate([self.first_column, self.first_column[-2:0:-1]])
+        self.fft_size = len(circulant)
+        self.eigenvalues = np.fft.rfft(circulant)
+
+    def matvec(self, v):
+        """
+        Calcola T v; v può avere forma (m,) o (m, k)
+        """
+        v = np.asarray(v, dtype=float)
+        v_hat = np.fft.rfft(v, n=self.fft_size, axis=0)
+        if v.ndim == 2:
+            v_hat *= self.eigenvalues[:, None]
+        else:
+            v_hat *= self.eigenvalues
+        return np.fft.irfft(v_hat, n=self.fft_size, axis=0)[:self.size]
+
+    def to_dense(self):
+        """
+        Matrice densa (solo per griglie di dimensione moderata)
+        """
+        idx = np.abs(np.arange(self.size)[:, None] - np.arange(self.size)[None, :])
+        return self.first_column[idx]
+
+
+def pivoted_cholesky(diagonal, column, rank, tol=1e-10):
+    """
+    Cholesky parziale con pivoting: approssimazione di rango basso A ≈ L L^T (L di forma n x k)
+    che richiede solo la diagonale di A e k sue colonne, in O(n k²) tempo e O(n k) memoria.
+    column(i) deve restituire la colonna i-esima di A.
+    """
+    residual_diag = np.array(diagonal, dtype=float)
+    n = len(residual_diag)
+    rank = min(rank, n)
+    L = np.zeros((n, rank))
+    trace = np.sum(residual_diag)
+
+    for k in range(rank):
+        pivot = int(np.argmax(residual_diag))
+        pivot_value = residual_diag[pivot]
+        if pivot_value <= tol * max(trace, 1.0):
+            return L[:, :k]
+        L[:, k] = (column(pivot) - L[:, :k] @ L[pivot, :k]) / np.sqrt(pivot_value)
+        residual_diag -= L[:, k] ** 2
+        residual_diag[pivot] = 0.0
+    return L
+
+
+class LowRankPreconditioner:
+    """
+    Precondizionatore P = L L^T + σ²I con L di rango basso (es. da pivoted_cholesky).
+    Tramite la SVD sottile di L, P = U (S + σ²) U^T + σ² (I - U U^T): inversa, radice inversa
+    e log-determinante costano O(n k).
+    """
+    def __init__(self, L, noise_variance):
+        self.noise_variance = noise_variance
+        if L.shape[1] > 0:
+            U, singular_values, _ = np.linalg.svd(L, full_matrices=False)
+        else:
+            U, singular_values = L, np.zeros(0)
+        self.U = U
+        self.eigenvalues = singular_values ** 2 + noise_variance
+        self.size = L.shape[0]
+
+    def _apply_power(self, r, power):
+        # Componente nello spazio di U scalata con gli autovalori, il complemento con σ²
+        projection = self.U.T @ r
+        scale = self.eigenvalues ** power
+        if r.ndim == 2:
+            scale = scale[:, None]
+        return self.U @ (scale * projection) + self.noise_variance ** power * (r - self.U @ projection)
+
+    def solve(self, r):
+        """
+        P^-1 r
+        """
+        return self._apply_power(r, -1.0)
+
+    def inv_sqrt(self, r):
+        """
+        P^-1/2 r
+        """
+        return self._apply_power(r, -0.5)
+
+    def logdet(self):
+        return np.sum(np.log(self.eigenvalues)) + (self.size - len(self.eigenvalues)) * np.log(self.noise_variance)
+
+
+def lanczos_tridiagonal(matvec, probes, n_steps):
+    """
+    Lanczos a blocchi di vettori indipendenti: per ogni colonna di probes restituisce le diagonali
+    (alpha, beta) della matrice tridiagonale di Lanczos, con n_steps prodotti matrice-vettore
+    """
+    q = probes / np.linalg.norm(probes, axis=0)
+    q_prev = np.zeros_like(q)
+    beta_prev = np.zeros(q.shape[1])
+    alphas, betas = [], []
+
+    for step in range(n_steps):
+        w = matvec(q) - beta_prev * q_prev
+        alpha = np.sum(q * w, axis=0)
+        w -= alpha * q
+        beta = np.linalg.norm(w, axis=0)
+        alphas.append(alpha)
+        if step == n_steps - 1 or np.all(beta < 1e-10):
+            break
+        betas.append(beta)
+        q_prev, q = q, w / np.where(beta > 0, beta, 1.0)
+        beta_prev = beta
+    return np.array(alphas), np.array(betas).reshape(-1, probes.shape[1])
+
+
+def stochastic_lanczos_logdet(matvec, size, n_probes=10, n_steps=30, rng=None):
+    """
+    Stima di log|A| con la quadratura stocastica di Lanczos (SLQ):
+    log|A| = tr(log A) ≈ size * media_z [ Σ_i τ_i² log θ_i ] con sonde di Rademacher z,
+    dove θ_i e τ_i sono autovalori e prime componenti degli autovettori della tridiagonale
+    """
+    rng = np.random.default_rng(rng)
+    probes = rng.choice([-1.0, 1.0], size=(size, n_probes))
+    alphas, betas = lanczos_tridiagonal(matvec, probes, n_steps)
+
+    estimates = np.zeros(n_probes)
+    for j in range(n_probes):
+        # Tronca la tridiagonale al primo breakdown della sonda j
+        off = betas[:, j] if len(betas) else np.zeros(0)
+        breakdown = np.flatnonzero(off < 1e-10)
+        steps = breakdown[0] + 1 if len(breakdown) else len(alphas)
+        theta, vectors = eigh_tridiagonal(alphas[:steps, j], off[:steps - 1])
+        estimates[j] = np.sum(vectors[0] ** 2 * np.log(np.maximum(theta, 1e-300)))
+    return size * np.mean(estimates)
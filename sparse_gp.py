@@ -0,0 +1,280 @@
+import numpy as np
+from scipy.linalg import cholesky, cho_solve, solve_triangular
+from scipy.optimize import minimize
+
+from kernels import RBFKernel
+from solvers import jittered_cholesky
+
+
+
+SPARSE_METHODS = ("sor", "fitc", "vfe")
+INDUCING_SELECTIONS = ("kmeans", "grid", "learned")
+
+
+def kmeans_1d(x, n_clusters, n_iter=20):
+    """
+    K-means (Lloyd) su dati monodimensionali: i centri restano ordinati, quindi
+    l'assegnazione è un searchsorted sui punti medi (O(n log m) per iterazione)
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    n_clusters = min(n_clusters, len(np.unique(x)))
+    centers = np.quantile(x, (np.arange(n_clusters) + 0.5) / n_clusters)
+
+    for _ in range(n_iter):
+        labels = np.searchsorted((centers[1:] + centers[:-1]) / 2, x)
+        counts = np.bincount(labels, minlength=n_clusters)
+        sums = np.bincount(labels, weights=x, minlength=n_clusters)
+        new_centers = np.where(counts > 0, sums / np.maximum(counts, 1), centers)
+        new_centers.sort()
+        if np.allclose(new_centers, centers):
+            break
+        centers = new_centers
+    return centers
+
+
+class SparseGaussianProcessRegressor:
+    """
+    GP sparso con m punti induttori (m << n).
+
+    Metodi supportati: "sor" (Subset of Regressors), "fitc" e "vfe" (Titsias).
+    L'addestramento scorre i dati a blocchi e costa O(n m²) con memoria O(m² + m * block_size);
+    la media predittiva costa O(m) e la varianza O(m²) per punto di test.
+    """
+    def __init__(self, kernel=None, noise_variance=0.01, n_inducing=30, method="vfe",
+                 inducing="kmeans", x_range=None, normalize_y=True, jitter=1e-8,
+                 block_size=65536, learn_max_iter=50, learn_subset=5000, seed=None):
+        if method not in SPARSE_METHODS:
+            raise ValueError(f"Unknown sparse method '{method}', expected one of {SPARSE_METHODS}")
+        if inducing not in INDUCING_SELECTIONS:
+            raise ValueError(f"Unknown inducing selection '{inducing}', expected one of {INDUCING_SELECTIONS}")
+
+        self.kernel = kernel if kernel is not None else RBFKernel()
+        self.noise_variance = noise_variance
+        self.n_inducing = n_inducing
+        self.method = method
+        self.inducing = inducing
+        self.x_range = x_range
+        self.normalize_y = normalize_y
+        self.jitter = jitter
+        self.block_size = block_size
+        self.learn_max_iter = learn_max_iter
+        self.learn_subset = learn_subset
+        self.seed = seed
+
+        self.inducing_points = None
+        self.y_mean = 0.0
+        self.L_uu = None
+        self.L_b = None
+        self.w = None
+        self.log_marginal_likelihood_value = None
+        # Statistiche dell'addestramento a blocchi in corso (start_stream / partial_fit)
+        self.stream_state = None
+
+    @property
+    def is_fitted(self):
+        return self.w is not None
+
+    def select_inducing_points(self, x, y=None):
+        """
+        Sceglie le posizioni dei punti induttori secondo self.inducing
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        m = min(self.n_inducing, len(x))
+
+        if self.inducing == "grid":
+            low, high = self.x_range if self.x_range is not None else (np.min(x), np.max(x))
+            return np.linspace(low, high, m)
+
+        z = kmeans_1d(x, m)
+        if self.inducing == "learned" and y is not None:
+            z = self._learn_inducing_points(x, np.asarray(y, dtype=float).ravel(), z)
+        return z
+
+    def _learn_inducing_points(self, x, y, z_init):
+        """
+        Ottimizza le posizioni dei punti induttori massimizzando la log marginal likelihood
+        (il bound variazionale per VFE) su un sottoinsieme dei dati
+        """
+        if len(x) > self.learn_subset:
+            rng = np.random.default_rng(self.seed)
+            subset = rng.choice(len(x), self.learn_subset, replace=False)
+            x, y = x[subset], y[subset]
+
+        bounds = None
+        if self.x_range is not None:
+            bounds = [tuple(self.x_range)] * len(z_init)
+
+        y_centered = y - (np.mean(y) if self.normalize_y else 0.0)
+
+        def objective(z):
+            try:
+                return -self._posterior(x, y_centered, z)["log_marginal_likelihood"]
+            except np.linalg.LinAlgError:
+                return np.inf
+
+        result = minimize(objective, z_init, method="L-BFGS-B", bounds=bounds,
+                          options={"maxiter": self.learn_max_iter})
+        return np.sort(result.x)
+
+    def _start_posterior(self, z):
+        """
+        Stato iniziale dell'accumulo delle statistiche del posterior sparso per i punti induttori z
+        """
+        m = len(z)
+        K_uu = self.kernel(z)
+        K_uu[np.diag_indices_from(K_uu)] += self.jitter * np.mean(np.diag(K_uu))
+        # Induttori quasi coincidenti: il jitter fisso può non bastare, si ritenta aumentandolo
+        L_uu, _ = jittered_cholesky(K_uu)
+        # Oltre a A = Σ V Λ^-1 V^T si tengono i termini che servono per centrare y alla fine
+        # (b, Σ y²/λ rispetto a y non centrato, Σ V/λ, Σ y/λ, Σ 1/λ) e la somma di y
+        return {"z": z, "L_uu": L_uu, "A": np.zeros((m, m)), "b": np.zeros(m), "b_ones": np.zeros(m),
+                "quad_y": 0.0, "y_over_lambda": 0.0, "inv_lambda_sum": 0.0, "log_lambda_sum": 0.0,
+                "trace_term": 0.0, "n": 0, "y_sum": 0.0}
+
+    def _accumulate_posterior(self, state, x_block, y_block):
+        """
+        Aggiunge allo stato un blocco di dati in O(block m²)
+        """
+        V = solve_triangular(state["L_uu"], self.kernel(state["z"], x_block), lower=True, check_finite=False)
+        k_diag = self.kernel.diag(x_block)
+        q_diag = np.einsum("ij,ij->j", V, V)
+
+        if self.method == "fitc":
+            lam = k_diag - q_diag + self.noise_variance
+        else:
+            lam = np.full(len(x_block), float(self.noise_variance))
+        if self.method == "vfe":
+            state["trace_term"] += np.sum(k_diag - q_diag)
+
+        V_scaled = V / lam
+        state["A"] += V_scaled @ V.T
+        state["b"] += V_scaled @ y_block
+        state["b_ones"] += np.sum(V_scaled, axis=1)
+        state["quad_y"] += np.sum(y_block ** 2 / lam)
+        state["y_over_lambda"] += np.sum(y_block / lam)
+        state["inv_lambda_sum"] += np.sum(1.0 / lam)
+        state["log_lambda_sum"] += np.sum(np.log(lam))
+        state["n"] += len(x_block)
+        state["y_sum"] += np.sum(y_block)
+
+    def _finish_posterior(self, state, y_offset=0.0):
+        """
+        Posterior per y - y_offset dalle statistiche accumulate: centrare y dopo l'accumulo
+        è esatto, b e Σ y²/λ sono lineari e quadratiche nello spostamento
+        """
+        b = state["b"] - y_offset * state["b_ones"]
+        quad_y = state["quad_y"] - 2.0 * y_offset * state["y_over_lambda"] + y_offset ** 2 * state["inv_lambda_sum"]
+
+        B = state["A"].copy()
+        B[np.diag_indices_from(B)] += 1.0
+        L_b = cholesky(B, lower=True, check_finite=False)
+        c = solve_triangular(L_b, b, lower=True, check_finite=False)
+
+        log_det = 2.0 * np.sum(np.log(np.diag(L_b))) + state["log_lambda_sum"]
+        lml = -0.5 * (quad_y - c @ c + log_det + state["n"] * np.log(2 * np.pi))
+        if self.method == "vfe":
+            lml -= 0.5 * state["trace_term"] / self.noise_variance
+
+        return {"L_uu": state["L_uu"], "L_b": L_b, "c": c, "log_marginal_likelihood": lml}
+
+    def _posterior(self, x, y, z, y_offset=0.0):
+        """
+        Accumula a blocchi le statistiche O(m²) del posterior sparso per i punti induttori z.
+        y_offset viene sottratto blocco per blocco: x e y (anche memory map) non vengono mai copiati
+        per intero.
+        """
+        state = self._start_posterior(z)
+        for start in range(0, len(x), self.block_size):
+            self._accumulate_posterior(state, x[start:start + self.block_size],
+                                       y[start:start + self.block_size] - y_offset)
+        return self._finish_posterior(state)
+
+    def _set_posterior(self, posterior):
+        self.L_uu = posterior["L_uu"]
+        self.L_b = posterior["L_b"]
+        self.log_marginal_likelihood_value = posterior["log_marginal_likelihood"]
+
+        # Pesi della media predittiva: mean(x*) = k(x*, Z) w
+        self.w = solve_triangular(self.L_uu,
+                                  solve_triangular(self.L_b, posterior["c"], lower=True, trans="T", check_finite=False),
+                                  lower=True, trans="T", check_finite=False)
+
+    def fit(self, x, y):
+        """
+        Sceglie i punti induttori e calcola il posterior sparso in O(n m²)
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        if len(x) == 0:
+            raise ValueError("Cannot fit a GP on an empty dataset")
+        if len(x) != len(y):
+            raise ValueError("x and y must have the same length")
+
+        self.y_mean = np.mean(y) if self.normalize_y else 0.0
+        self.inducing_points = self.select_inducing_points(x, y)
+
+        self._set_posterior(self._posterior(x, y, self.inducing_points, self.y_mean))
+        return self
+
+    def start_stream(self, inducing_points=None, x_range=None):
+        """
+        Inizia un addestramento a blocchi (partial_fit): i punti induttori devono essere noti prima
+        dei dati, quindi sono quelli dati, oppure una griglia di n_inducing punti su x_range
+        (o self.x_range)
+        """
+        if inducing_points is None:
+            x_range = x_range if x_range is not None else self.x_range
+            if x_range is None:
+                raise ValueError("Streaming fit needs inducing_points or an x_range")
+            inducing_points = np.linspace(x_range[0], x_range[1], self.n_inducing)
+        self.inducing_points = np.sort(np.asarray(inducing_points, dtype=float).ravel())
+        self.stream_state = self._start_posterior(self.inducing_points)
+        return self
+
+    def partial_fit(self, x, y):
+        """
+        Aggiunge un blocco di dati all'addestramento a blocchi, in O(len(x) m²) e senza conservarli
+        """
+        if self.stream_state is None:
+            self.start_stream()
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        if len(x) != len(y):
+            raise ValueError("x and y must have the same length")
+        for start in range(0, len(x), self.block_size):
+            self._accumulate_posterior(self.stream_state, x[start:start + self.block_size],
+                                       y[start:start + self.block_size])
+        return self
+
+    def finish_stream(self):
+        """
+        Calcola il posterior dai blocchi ricevuti; la media di y per normalize_y è quella di tutti i dati
+        """
+        state = self.stream_state
+        if state is None or state["n"] == 0:
+            raise ValueError("Cannot fit a GP on an empty dataset")
+        self.y_mean = state["y_sum"] / state["n"] if self.normalize_y else 0.0
+        self._set_posterior(self._finish_posterior(state, self.y_mean))
+        self.stream_state = None
+        return self
+
+    def predict(self, x, return_std=False):
+        """
+        Media (O(m) per punto) e opzionalmente deviazione standard (O(m²) per punto)
+        """
+        if not self.is_fitted:
+            raise RuntimeError("GP not fitted yet, call fit() first")
+
+        x = np.asarray(x, dtype=float).ravel()
+        K_ux = self.kernel(self.inducing_points, x)
+        mean = K_ux.T @ self.w + self.y_mean
+
+        if not return_std:
+            return mean
+
+        V = solve_triangular(self.L_uu, K_ux, lower=True, check_finite=False)
+        W = solve_triangular(self.L_b, V, lower=True, check_finite=False)
+        variance = np.einsum("ij,ij->j", W, W)
+        if self.method != "sor":
+            variance += self.kernel.diag(x) - np.einsum("ij,ij->j", V, V)
+        return mean, np.sqrt(np.maximum(variance, 0.0))
@@ -0,0 +1,88 @@
+import numpy as np
+
+from point_buffer import PointBuffer
+
+
+
+class SortedPointIndex:
+    """
+    Indice spaziale per dati 1-D + valore: le coordinate x sono mantenute ordinate
+    (con l'id stabile di ogni punto) e ogni ricerca è una bisezione O(log n) sulla finestra
+    [x - r, x + r], seguita dal controllo su y dei soli candidati nella finestra.
+
+    Le y non sono memorizzate nell'indice (possono cambiare, es. col rumore): vengono lette
+    dal chiamante tramite la funzione y_lookup(ids).
+    """
+    def __init__(self):
+        self.entries = PointBuffer((("x", float), ("id", np.int64)))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def build(self, x, ids):
+        """
+        Ricostruisce l'indice da zero in O(n log n)
+        """
+        order = np.argsort(x, kind="stable")
+        self.entries.reset(x=np.asarray(x)[order], id=np.asarray(ids)[order])
+
+    def add(self, x, point_id):
+        """
+        Inserisce un punto mantenendo l'ordine: bisezione + spostamento in place della coda
+        """
+        position = int(np.searchsorted(self.entries.view("x"), x, side="right"))
+        self.entries.insert(position, x=x, id=point_id)
+
+    def remove(self, x, point_id):
+        """
+        Rimuove il punto con id point_id e coordinata x
+        """
+        xs = self.entries.view("x")
+        low = int(np.searchsorted(xs, x, side="left"))
+        high = int(np.searchsorted(xs, x, side="right"))
+        matches = np.flatnonzero(self.entries.view("id")[low:high] == point_id)
+        if len(matches) == 0:
+            raise KeyError(f"Point {point_id} not in index")
+        self.entries.remove(low + int(matches[0]))
+
+    def remove_ids(self, point_ids):
+        """
+        Rimuove più punti in un solo passaggio
+        """
+        self.entries.remove_mask(np.isin(self.entries.view("id"), point_ids))
+
+    def _window(self, x_min, x_max):
+        xs = self.entries.view("x")
+        low = int(np.searchsorted(xs, x_min, side="left"))
+        high = int(np.searchsorted(xs, x_max, side="right"))
+        return self.entries.view("x")[low:high], self.entries.view("id")[low:high]
+
+    def query_radius(self, x, y, radius, y_lookup):
+        """
+        Id e distanze dei punti entro radius da (x, y)
+        """
+        xs, ids = self._window(x - radius, x + radius)
+        if len(ids) == 0:
+            return ids, np.zeros(0)
+        distances = np.sqrt((xs - x) ** 2 + (y_lookup(ids) - y) ** 2)
+        inside = distances <= radius
+        return ids[inside], distances[inside]
+
+    def nearest(self, x, y, radius, y_lookup):
+        """
+        Id del punto più vicino a (x, y) entro radius, oppure None
+        """
+        ids, distances = self.query_radius(x, y, radius, y_lookup)
+        if len(ids) == 0:
+            return None
+        return int(ids[np.argmin(distances)])
+
+    def query_rectangle(self, x_min, x_max, y_min, y_max, y_lookup):
+        """
+        Id dei punti nel rettangolo [x_min, x_max] x [y_min, y_max]
+        """
+        xs, ids = self._window(x_min, x_max)
+        if len(ids) == 0:
+            return ids
+        ys = y_lookup(ids)
+        return ids[(ys >= y_min) & (ys <= y_max)]